@@ -3,33 +3,90 @@
 Scan Namer - Automatically rename scanned documents in Google Drive
 using LLM analysis of document content.
 """
+from __future__ import annotations
+
 import argparse
+import atexit
+import contextlib
+import functools
+import hashlib
 import io
 import json
 import logging
+import logging.handlers
 import os
+import queue
+import random
 import re
 import socket
+import sqlite3
 import sys
 import tempfile
-
-# from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+import threading
+import time
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ThreadPoolExecutor,
+    as_completed,
+    wait,
+)
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Dict, FrozenSet, Iterable, Iterator, List, Optional, Tuple, Union
 import base64
 from datetime import datetime
 
 # ignore lint errors related to unresolved imports; using uv to avoid using venv
-import requests
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
+#
+# Heavy dependencies (requests, the Drive discovery client, pypdf, PDFium,
+# OCR) are imported inside the methods that use them, so informational
+# commands such as --list-models start without paying for them. Provider
+# SDKs are likewise imported only by the selected client's _setup_client.
 from googleapiclient.errors import HttpError
-from googleapiclient.http import MediaIoBaseDownload, MediaFileUpload
-import pypdf
 from dotenv import load_dotenv
-import pytesseract
-from pdf2image import convert_from_path
+
+try:
+    # orjson parses and serializes 2-5x faster than json with fewer
+    # allocations. It is a declared dependency; the stdlib fallback only
+    # covers installs that skipped it.
+    import orjson
+except ImportError:
+    orjson = None
+
+if TYPE_CHECKING:
+    import pypdf
+    import requests
+
+# PDFium is not thread-safe; every call into it must hold this lock.
+_PDFIUM_LOCK = threading.Lock()
+
+
+@functools.lru_cache(maxsize=None)
+def _load_pdfium() -> Any:
+    """Import pypdfium2 on first use, or return None if it is not installed.
+
+    PDFium's C++ text extractor is several times faster than pypdf's
+    pure-Python one; pypdf remains the fallback if it is unavailable.
+    """
+    try:
+        import pypdfium2
+    except ImportError:
+        return None
+    return pypdfium2
+
+
+def loads_json(data: Union[str, bytes]) -> Any:
+    """Parse JSON text or bytes, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps_json(obj: Any) -> bytes:
+    """Serialize to compact UTF-8 JSON bytes, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(",", ":")).encode("utf-8")
 
 
 def prefer_ipv4() -> None:
@@ -59,22 +116,159 @@ def prefer_ipv4() -> None:
     socket.getaddrinfo = _ipv4_first  # type: ignore[assignment]
 
 
+# HTTP statuses worth retrying: rate limits, transient server errors, and
+# Anthropic's 529 "overloaded".
+RETRYABLE_STATUS_CODES = frozenset({408, 429, 500, 502, 503, 504, 529})
+# Provider SDK exceptions that signal a transient failure without a status.
+RETRYABLE_ERROR_NAMES = frozenset({
+    "APIConnectionError",
+    "APITimeoutError",
+    "RateLimitError",
+    "ResourceExhausted",
+    "ServiceUnavailable",
+})
+
+
+def _error_status(exc: BaseException) -> Optional[int]:
+    """Best-effort HTTP status of a provider SDK or requests exception."""
+    for attr in ("status_code", "code"):
+        value = getattr(exc, attr, None)
+        if isinstance(value, int):
+            return value
+    response = getattr(exc, "response", None)
+    value = getattr(response, "status_code", None)
+    return value if isinstance(value, int) else None
+
+
+def is_retryable_error(exc: BaseException) -> bool:
+    """True if `exc` looks like a rate limit or transient provider failure."""
+    if type(exc).__name__ in RETRYABLE_ERROR_NAMES:
+        return True
+    return _error_status(exc) in RETRYABLE_STATUS_CODES
+
+
+def retry_after_seconds(exc: BaseException) -> Optional[float]:
+    """Return the server's Retry-After delay in seconds, if it sent one."""
+    headers = getattr(getattr(exc, "response", None), "headers", None)
+    if headers is None:
+        return None
+    try:
+        value = headers.get("retry-after") or headers.get("Retry-After")
+        return max(0.0, float(value)) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+class RateLimiter:
+    """Thread-safe token bucket: sustains `rate_per_sec`, bursting to `burst`.
+
+    Callers that find the bucket empty reserve the next token and sleep
+    until it is due, so concurrent callers are spaced evenly instead of
+    stampeding together into a 429.
+    """
+
+    def __init__(self, rate_per_sec: float, burst: Optional[int] = None):
+        self.rate = float(rate_per_sec)
+        self.capacity = float(burst if burst and burst > 0 else max(1.0, self.rate))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, rate: Any, burst: Any = None) -> Optional["RateLimiter"]:
+        """Build a limiter from config values, or None if `rate` is unset/<= 0."""
+        if isinstance(rate, bool) or not isinstance(rate, (int, float)) or rate <= 0:
+            return None
+        return cls(rate, burst if isinstance(burst, int) else None)
+
+    def acquire(self) -> None:
+        """Take one token, sleeping until one is available."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.capacity, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait > 0:
+            time.sleep(wait)
+
+
 APP_DIR = os.path.dirname(os.path.abspath(__file__))
 
+# Characters not allowed in filenames, and runs of separators to collapse.
+_INVALID_FILENAME_CHARS_RE = re.compile(r'[<>:"/\\|?*]')
+_SEPARATOR_RUN_RE = re.compile(r"[_\s]+")
+
+
+def _flatten_config(node: Dict[str, Any], prefix: str = "") -> Dict[str, Any]:
+    """Map every dotted key path in `node` to its value, including sub-dicts.
+
+    Keys that themselves contain a dot are skipped, since a dotted lookup
+    could never reach them.
+    """
+    flat: Dict[str, Any] = {}
+    for key, value in node.items():
+        if not isinstance(key, str) or "." in key:
+            continue
+        path = f"{prefix}{key}"
+        flat[path] = value
+        if isinstance(value, dict):
+            flat.update(_flatten_config(value, f"{path}."))
+    return flat
+
 
 class ConfigManager:
     """Manages configuration loading and validation."""
 
+    # Config keys that may be overridden by an environment variable
+    ENV_MAPPINGS = {
+        "llm.provider": "LLM_PROVIDER",
+        "llm.model": "LLM_MODEL",
+        "llm.max_tokens": "LLM_MAX_TOKENS",
+        "llm.temperature": "LLM_TEMPERATURE",
+        "llm.max_input_tokens": "LLM_MAX_INPUT_TOKENS",
+        "pdf.max_pages_before_extraction": "PDF_MAX_PAGES_BEFORE_EXTRACTION",
+        "pdf.extraction_pages": "PDF_EXTRACTION_PAGES",
+        "ocr.enable_embedding": "OCR_ENABLE_EMBEDDING",
+        "ocr.min_text_per_page": "OCR_MIN_TEXT_PER_PAGE",
+        "ocr.language": "OCR_LANGUAGE",
+        "ocr.dpi": "OCR_DPI",
+        "google_drive.credentials_file": "GOOGLE_DRIVE_CREDENTIALS_FILE",
+        "google_drive.token_file": "GOOGLE_DRIVE_TOKEN_FILE",
+        "google_drive.download_chunk_size": "GOOGLE_DRIVE_DOWNLOAD_CHUNK_SIZE",
+        "processing.max_workers": "SCAN_NAMER_CONCURRENCY",
+        "logging.level": "LOG_LEVEL",
+        "logging.format": "LOG_FORMAT",
+        "logging.date_format": "LOG_DATE_FORMAT",
+        "logging.file": "LOG_FILE",
+    }
+
+    INT_KEYS = frozenset(
+        {
+            "llm.max_tokens",
+            "llm.max_input_tokens",
+            "pdf.max_pages_before_extraction",
+            "pdf.extraction_pages",
+            "google_drive.download_chunk_size",
+            "processing.max_workers",
+        }
+    )
+    FLOAT_KEYS = frozenset({"llm.temperature"})
+    BOOL_KEYS = frozenset({"auto_select_first_folder"})
+
     def __init__(self, config_file: str = "config.json"):
         self.config_file = config_file
         self.config = self._load_config()
         self._validate_config()
+        self._flat = _flatten_config(self.config)
 
     def _load_config(self) -> Dict[str, Any]:
         """Load configuration from JSON file."""
         try:
-            with open(self.config_file, "r") as f:
-                config_data = json.load(f)
+            with open(self.config_file, "rb") as f:
+                config_data = loads_json(f.read())
                 return config_data
         except FileNotFoundError:
             logging.error(f"Configuration file {self.config_file} not found")
@@ -94,45 +288,19 @@ class ConfigManager:
     def get(self, key_path: str, default=None) -> Any:
         """Get configuration value using dot notation (e.g., 'llm.api_key')."""
         # Check for environment variable override first
-        env_value = self._get_env_override(key_path)
-        if env_value is not None:
-            return env_value
+        if key_path in self.ENV_MAPPINGS:
+            env_value = self._get_env_override(key_path)
+            if env_value is not None:
+                return env_value
 
         # Fall back to config file value
-        keys = key_path.split(".")
-        value = self.config
-        for key in keys:
-            if isinstance(value, dict) and key in value:
-                value = value[key]
-            else:
-                return default
-        return value
+        return self._flat.get(key_path, default)
 
     def _get_env_override(self, key_path: str) -> Any:
         """Check for environment variable override for a config key."""
-        # Map config keys to environment variable names
-        env_mappings = {
-            "llm.provider": "LLM_PROVIDER",
-            "llm.model": "LLM_MODEL",
-            "llm.max_tokens": "LLM_MAX_TOKENS",
-            "llm.temperature": "LLM_TEMPERATURE",
-            "pdf.max_pages_before_extraction": "PDF_MAX_PAGES_BEFORE_EXTRACTION",
-            "pdf.extraction_pages": "PDF_EXTRACTION_PAGES",
-            "ocr.enable_embedding": "OCR_ENABLE_EMBEDDING",
-            "ocr.min_text_per_page": "OCR_MIN_TEXT_PER_PAGE",
-            "ocr.language": "OCR_LANGUAGE",
-            "ocr.dpi": "OCR_DPI",
-            "google_drive.credentials_file": "GOOGLE_DRIVE_CREDENTIALS_FILE",
-            "google_drive.token_file": "GOOGLE_DRIVE_TOKEN_FILE",
-            "logging.level": "LOG_LEVEL",
-            "logging.format": "LOG_FORMAT",
-            "logging.date_format": "LOG_DATE_FORMAT",
-            "logging.file": "LOG_FILE",
-        }
-
-        env_var = env_mappings.get(key_path)
+        env_var = self.ENV_MAPPINGS.get(key_path)
         if env_var:
-            env_value = os.getenv(env_var)
+            env_value = os.environ.get(env_var)
             if env_value is not None:
                 # Convert string values to appropriate types
                 return self._convert_env_value(env_value, key_path)
@@ -142,11 +310,7 @@ class ConfigManager:
     def _convert_env_value(self, value: str, key_path: str) -> Any:
         """Convert environment variable string to appropriate type."""
         # Integer conversions
-        if key_path in [
-            "llm.max_tokens",
-            "pdf.max_pages_before_extraction",
-            "pdf.extraction_pages",
-        ]:
+        if key_path in self.INT_KEYS:
             try:
                 return int(value)
             except ValueError:
@@ -154,7 +318,7 @@ class ConfigManager:
                 return None
 
         # Float conversions
-        if key_path in ["llm.temperature"]:
+        if key_path in self.FLOAT_KEYS:
             try:
                 return float(value)
             except ValueError:
@@ -162,7 +326,7 @@ class ConfigManager:
                 return None
 
         # Boolean conversions
-        if key_path in ["auto_select_first_folder"]:
+        if key_path in self.BOOL_KEYS:
             return value.lower() in ("true", "1", "yes", "on")
 
         # String values (no conversion needed)
@@ -179,8 +343,8 @@ class PromptManager:
     def _load_prompts(self) -> Dict[str, Any]:
         """Load prompts from JSON file."""
         try:
-            with open(self.prompts_file, "r") as f:
-                prompts_data = json.load(f)
+            with open(self.prompts_file, "rb") as f:
+                prompts_data = loads_json(f.read())
                 return prompts_data
         except FileNotFoundError:
             logging.error(f"Prompts file {self.prompts_file} not found")
@@ -195,6 +359,176 @@ class PromptManager:
             raise ValueError(f"Prompt key '{prompt_key}' not found")
         return self.prompts[prompt_key]
 
+    def get_local_rules(self) -> List[Dict[str, Any]]:
+        """Return the optional `local_rules` list used by LocalClassifier."""
+        rules = self.prompts.get("local_rules", [])
+        return rules if isinstance(rules, list) else []
+
+
+class LocalClassifier:
+    """Names templated documents locally, without calling an LLM.
+
+    Each rule is ``{"pattern": <regex>, "name": <template>}``. The pattern is
+    searched in the extracted text case-insensitively, with ``^``/``$``
+    matching at line breaks and ``.`` spanning them. The first match wins
+    and its named groups fill the ``{group}`` placeholders in the name
+    template, e.g. ``"Acme-Power-Bill-{date}"`` with a pattern containing
+    ``(?P<date>\\d{4}-\\d{2}-\\d{2})``.
+    """
+
+    def __init__(self, rules: List[Dict[str, Any]]):
+        self.rules: List[Tuple[re.Pattern, str]] = []
+        for rule in rules:
+            pattern = rule.get("pattern") if isinstance(rule, dict) else None
+            name = rule.get("name") if isinstance(rule, dict) else None
+            if not isinstance(pattern, str) or not isinstance(name, str):
+                logging.warning(f"Ignoring malformed local rule: {rule!r}")
+                continue
+            try:
+                compiled = re.compile(
+                    pattern, re.IGNORECASE | re.MULTILINE | re.DOTALL
+                )
+            except re.error as e:
+                logging.warning(f"Ignoring local rule with bad pattern {pattern!r}: {e}")
+                continue
+            self.rules.append((compiled, name))
+
+    def classify(self, text: str) -> Optional[str]:
+        """Return the filename of the first rule matching `text`, or None."""
+        for pattern, name in self.rules:
+            match = pattern.search(text)
+            if match is None:
+                continue
+            groups = {k: v for k, v in match.groupdict().items() if v is not None}
+            try:
+                return name.format_map(groups)
+            except (KeyError, IndexError, ValueError):
+                continue
+        return None
+
+
+class NameCache:
+    """SQLite cache of LLM filename suggestions, keyed by document content.
+
+    Entries are keyed on a blake2b hash of the document's text (or PDF
+    bytes) together with the provider, model and prompt version, so a rerun
+    after a partial failure only pays for documents not yet named, while a
+    change to any of those inputs misses the cache. A second table records
+    provider file ids of uploaded PDFs so they can be reused across runs.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        # Shared across worker threads; every access holds _lock.
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "h BLOB, provider TEXT, model TEXT, prompt_version TEXT, "
+                "name TEXT, prompt_tokens INT, completion_tokens INT, ts INT, "
+                "PRIMARY KEY (h, provider, model, prompt_version))"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS uploads ("
+                "h BLOB, provider TEXT, file_id TEXT, ts INT, "
+                "PRIMARY KEY (h, provider))"
+            )
+
+    @staticmethod
+    def content_hash(
+        document_text: Optional[str] = None, pdf_path: Optional[str] = None
+    ) -> bytes:
+        """Hash the text sent to the LLM, or the PDF file if sent instead."""
+        h = hashlib.blake2b(digest_size=16)
+        if document_text is not None:
+            h.update(b"text\0")
+            h.update(document_text.encode("utf-8"))
+        else:
+            h.update(b"pdf\0")
+            with open(pdf_path, "rb") as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                    h.update(chunk)
+        return h.digest()
+
+    @staticmethod
+    def prompt_version(prompt_config: Dict[str, Any]) -> str:
+        """Short fingerprint of a prompt, so editing prompts.json invalidates."""
+        encoded = json.dumps(prompt_config, sort_keys=True).encode("utf-8")
+        return hashlib.blake2b(encoded, digest_size=8).hexdigest()
+
+    def get(
+        self, h: bytes, provider: str, model: str, prompt_version: str
+    ) -> Optional[str]:
+        """Return the cached filename for this key, or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT name FROM cache "
+                "WHERE h = ? AND provider = ? AND model = ? AND prompt_version = ?",
+                (h, provider, model, prompt_version),
+            ).fetchone()
+        return row[0] if row else None
+
+    def put(
+        self,
+        h: bytes,
+        provider: str,
+        model: str,
+        prompt_version: str,
+        name: str,
+        cost_info: Dict[str, Any],
+    ) -> None:
+        """Store (or replace) the filename suggested for this key."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    h,
+                    provider,
+                    model,
+                    prompt_version,
+                    name,
+                    cost_info.get("prompt_tokens", 0),
+                    cost_info.get("completion_tokens", 0),
+                    int(time.time()),
+                ),
+            )
+
+    def get_upload(
+        self, h: bytes, provider: str, max_age: Optional[int] = None
+    ) -> Optional[str]:
+        """Return the provider file id recorded for this PDF, or None.
+
+        With `max_age`, ids recorded more than that many seconds ago are
+        ignored, for providers that expire uploaded files.
+        """
+        oldest = int(time.time()) - max_age if max_age is not None else 0
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT file_id FROM uploads WHERE h = ? AND provider = ? AND ts >= ?",
+                (h, provider, oldest),
+            ).fetchone()
+        return row[0] if row else None
+
+    def put_upload(self, h: bytes, provider: str, file_id: str) -> None:
+        """Record the provider file id a PDF was uploaded as."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO uploads VALUES (?, ?, ?, ?)",
+                (h, provider, file_id, int(time.time())),
+            )
+
+    def forget_upload(self, h: bytes, provider: str) -> None:
+        """Drop a recorded file id, e.g. after the provider rejected it."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM uploads WHERE h = ? AND provider = ?", (h, provider)
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
 
 class GoogleDriveManager:
     """Handles Google Drive authentication and operations."""
@@ -202,10 +536,16 @@ class GoogleDriveManager:
     def __init__(self, config: ConfigManager):
         self.config = config
         self.service: Optional[Any] = None
+        self._credentials: Optional[Any] = None
+        self._local = threading.local()
         self._authenticate()
 
     def _authenticate(self) -> None:
         """Authenticate with Google Drive API."""
+        from google.auth.transport.requests import Request
+        from google.oauth2.credentials import Credentials
+        from google_auth_oauthlib.flow import InstalledAppFlow
+
         creds = None
         token_file = self.config.get("google_drive.token_file")
         creds_file = self.config.get("google_drive.credentials_file")
@@ -245,9 +585,39 @@ class GoogleDriveManager:
                     token.write(creds.to_json())
                 logging.info(f"Saved credentials to {token_file}")
 
-        self.service = build("drive", "v3", credentials=creds)
+        self._credentials = creds
+        self.service = self._get_service()
         logging.info("Successfully authenticated with Google Drive")
 
+    USER_AGENT = "scan-namer (gzip)"
+
+    def _get_service(self) -> Any:
+        """Return a Drive service bound to the calling thread.
+
+        googleapiclient's underlying httplib2 transport is not thread-safe, so
+        each worker thread lazily builds its own service (and connection) from
+        the shared credentials.
+        """
+        service = getattr(self._local, "service", None)
+        if service is None:
+            import google_auth_httplib2
+            from googleapiclient.discovery import build
+            from googleapiclient.http import build_http, set_user_agent
+
+            # Google only gzips responses for clients whose User-Agent says
+            # so; httplib2 already sends "accept-encoding: gzip, deflate".
+            # build_http keeps the client's socket timeout and stops httplib2
+            # treating resumable uploads' 308 responses as redirects.
+            http = set_user_agent(
+                google_auth_httplib2.AuthorizedHttp(
+                    self._credentials, http=build_http()
+                ),
+                self.USER_AGENT,
+            )
+            service = build("drive", "v3", http=http)
+            self._local.service = service
+        return service
+
     def list_folders(self, parent_id: str = "root") -> List[Dict[str, Any]]:
         """List folders in Google Drive."""
         if self.service is None:
@@ -257,7 +627,7 @@ class GoogleDriveManager:
             query = f"'{parent_id}' in parents and mimeType='application/vnd.google-apps.folder' and trashed=false"
             results = (
                 self.service.files()
-                .list(q=query, fields="files(id,name,parents)")
+                .list(q=query, fields="files(id,name)")
                 .execute()
             )
             return results.get("files", [])
@@ -335,7 +705,7 @@ class GoogleDriveManager:
                 self.service.files()
                 .list(
                     q=query,
-                    fields="files(id,name,size,modifiedTime)",
+                    fields="files(id,name)",
                     orderBy="modifiedTime desc",
                 )
                 .execute()
@@ -347,32 +717,84 @@ class GoogleDriveManager:
             logging.error(f"Error listing PDFs: {e}")
             return []
 
-    def download_file(self, file_id: str, output_path: str) -> bool:
-        """Download a file from Google Drive."""
+    DRIVE_FILES_URL = "https://www.googleapis.com/drive/v3/files"
+
+    # Bytes read from the response stream per write.
+    DEFAULT_DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+    def _get_http_session(self) -> Any:
+        """Return an OAuth-authorized requests session bound to the calling thread.
+
+        google-auth's AuthorizedSession attaches the bearer token and
+        refreshes it on expiry; one per thread keeps connection pools
+        independent across workers.
+        """
+        session = getattr(self._local, "http_session", None)
+        if session is None:
+            from google.auth.transport.requests import AuthorizedSession
+
+            session = AuthorizedSession(self._credentials)
+            self._local.http_session = session
+        return session
+
+    def _stream_download(self, file_id: str, sink: Any) -> bool:
+        """Write a file's `alt=media` body to the binary stream `sink`.
+
+        Streams the body in a single request, rather than issuing one ranged
+        request per chunk.
+        """
         if self.service is None:
             logging.error("Google Drive service not initialized")
             return False
+        import requests
+
         try:
-            request = self.service.files().get_media(fileId=file_id)
-            with open(output_path, "wb") as f:
-                downloader = MediaIoBaseDownload(f, request)
-                done = False
-                while not done:
-                    status, done = downloader.next_chunk()
-            logging.debug(f"Downloaded file to {output_path}")
+            chunk_size = self.config.get(
+                "google_drive.download_chunk_size", self.DEFAULT_DOWNLOAD_CHUNK_SIZE
+            )
+            if not isinstance(chunk_size, int) or chunk_size <= 0:
+                chunk_size = self.DEFAULT_DOWNLOAD_CHUNK_SIZE
+            with self._get_http_session().get(
+                f"{self.DRIVE_FILES_URL}/{file_id}",
+                params={"alt": "media"},
+                stream=True,
+                timeout=120,
+            ) as response:
+                response.raise_for_status()
+                for chunk in response.iter_content(chunk_size=chunk_size):
+                    sink.write(chunk)
             return True
-        except HttpError as e:
+        except requests.RequestException as e:
             logging.error(f"Error downloading file: {e}")
             return False
 
+    def download_file(self, file_id: str, output_path: str) -> bool:
+        """Download a file from Google Drive straight to disk."""
+        with open(output_path, "wb") as f:
+            downloaded = self._stream_download(file_id, f)
+        if not downloaded:
+            Path(output_path).unlink(missing_ok=True)
+            return False
+        logging.debug(f"Downloaded file to {output_path}")
+        return True
+
+    def download_bytes(self, file_id: str) -> Optional[bytes]:
+        """Download a file from Google Drive into memory."""
+        buf = io.BytesIO()
+        if not self._stream_download(file_id, buf):
+            return None
+        logging.debug(f"Downloaded {buf.tell()} bytes of file {file_id}")
+        return buf.getvalue()
+
     def rename_file(self, file_id: str, new_name: str) -> bool:
         """Rename a file in Google Drive."""
         if self.service is None:
             logging.error("Google Drive service not initialized")
             return False
         try:
-            self.service.files().update(
-                fileId=file_id, body={"name": new_name}
+            self._throttle_write()
+            self._get_service().files().update(
+                fileId=file_id, body={"name": new_name}, fields="id"
             ).execute()
             logging.info(f"Renamed file to: {new_name}")
             return True
@@ -380,19 +802,94 @@ class GoogleDriveManager:
             logging.error(f"Error renaming file: {e}")
             return False
 
+    # Google's per-request limit for Drive batch HTTP requests.
+    BATCH_REQUEST_LIMIT = 100
+
+    # Drive's documented write quota is about 10 requests/second per user.
+    DEFAULT_WRITE_RATE_PER_SECOND = 10
+
+    @functools.cached_property
+    def _write_limiter(self) -> Optional[RateLimiter]:
+        """Shared limiter for metadata and content writes (renames, updates)."""
+        return RateLimiter.from_config(
+            self.config.get(
+                "google_drive.write_rate_limit_rps", self.DEFAULT_WRITE_RATE_PER_SECOND
+            )
+        )
+
+    def _throttle_write(self) -> None:
+        if self._write_limiter is not None:
+            self._write_limiter.acquire()
+
+    def rename_files_batch(self, renames: List[Tuple[str, str]]) -> Dict[str, bool]:
+        """Rename many files using Drive batch HTTP requests.
+
+        Packs up to BATCH_REQUEST_LIMIT updates into each multipart request.
+        Any rename that fails inside a batch is retried via rename_file.
+        Returns a mapping of file id to success.
+        """
+        results: Dict[str, bool] = {}
+        if self.service is None:
+            logging.error("Google Drive service not initialized")
+            return {file_id: False for file_id, _ in renames}
+
+        service = self._get_service()
+        errors: Dict[str, Exception] = {}
+
+        def _record(request_id: str, response: Any, exception: Any) -> None:
+            if exception is not None:
+                errors[request_id] = exception
+            else:
+                results[request_id] = True
+
+        for start in range(0, len(renames), self.BATCH_REQUEST_LIMIT):
+            chunk = renames[start : start + self.BATCH_REQUEST_LIMIT]
+            batch = service.new_batch_http_request(callback=_record)
+            for file_id, new_name in chunk:
+                # Each request inside a batch counts against the quota.
+                self._throttle_write()
+                batch.add(
+                    service.files().update(
+                        fileId=file_id, body={"name": new_name}, fields="id"
+                    ),
+                    request_id=file_id,
+                )
+            try:
+                batch.execute()
+            except HttpError as e:
+                logging.error(f"Error executing rename batch: {e}")
+                for file_id, _ in chunk:
+                    if file_id not in results:
+                        errors.setdefault(file_id, e)
+
+        new_names = dict(renames)
+        for file_id in results:
+            logging.info(f"Renamed file to: {new_names[file_id]}")
+        for file_id, error in errors.items():
+            logging.warning(
+                f"Batched rename of {file_id} failed ({error}); retrying individually"
+            )
+            results[file_id] = self.rename_file(file_id, new_names[file_id])
+        return results
+
     def update_file(self, file_id: str, file_path: str) -> bool:
         """Update a file in Google Drive with a new version."""
         if self.service is None:
             logging.error("Google Drive service not initialized")
             return False
         try:
+            from googleapiclient.http import MediaFileUpload
+
             # Create media upload object
             media = MediaFileUpload(
                 file_path, mimetype="application/pdf", resumable=True
             )
 
             # Update the file
-            self.service.files().update(fileId=file_id, media_body=media).execute()
+            self._throttle_write()
+            self._get_service().files().update(
+                fileId=file_id, media_body=media, fields="id"
+            ).execute()
 
             logging.info(f"Updated file {file_id} with new content from {file_path}")
             return True
@@ -404,6 +901,79 @@ class GoogleDriveManager:
             return False
 
 
+class PDFContext:
+    """A PDF opened once and parsed at most once, shared across PDFProcessor calls.
+
+    Parsing is lazy so a corrupt file surfaces its error inside whichever
+    PDFProcessor method touches it first, exactly as a path would.
+
+    Given `data`, the PDF is parsed from memory and `path` is only written
+    when a caller needs a real file (see ensure_file).
+    """
+
+    def __init__(self, path: str, data: Optional[bytes] = None):
+        self.path = path
+        self._data = data
+        self.on_disk = data is None
+        self._file: Optional[Any] = None
+        self._reader: Optional[pypdf.PdfReader] = None
+        self._pdfium_document: Any = None
+
+    def ensure_file(self) -> str:
+        """Return `path`, first writing in-memory data there if needed."""
+        if not self.on_disk:
+            with open(self.path, "wb") as f:
+                f.write(self._data)
+            self.on_disk = True
+        return self.path
+
+    @property
+    def reader(self) -> pypdf.PdfReader:
+        if self._reader is None:
+            import pypdf
+
+            if self._file is None:
+                self._file = (
+                    io.BytesIO(self._data)
+                    if self._data is not None
+                    else open(self.path, "rb")
+                )
+            self._reader = pypdf.PdfReader(self._file)
+        return self._reader
+
+    @property
+    def pdfium_document(self) -> Any:
+        """The PDFium handle for this file; callers must hold _PDFIUM_LOCK."""
+        if self._pdfium_document is None:
+            self._pdfium_document = _load_pdfium().PdfDocument(
+                self._data if self._data is not None else self.path
+            )
+        return self._pdfium_document
+
+    @property
+    def page_count(self) -> int:
+        return len(self.reader.pages)
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self._reader = None
+        if self._pdfium_document is not None:
+            with _PDFIUM_LOCK:
+                self._pdfium_document.close()
+            self._pdfium_document = None
+
+    def __enter__(self) -> "PDFContext":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+PDFSource = Union[str, PDFContext]
+
+
 class PDFProcessor:
     """Handles PDF processing operations."""
 
@@ -412,18 +982,118 @@ class PDFProcessor:
         self.max_pages = config.get("pdf.max_pages_before_extraction", 3)
         self.extraction_pages = config.get("pdf.extraction_pages", 3)
 
-    def get_page_count(self, pdf_path: str) -> int:
+    @staticmethod
+    @contextlib.contextmanager
+    def _open_reader(source: PDFSource) -> Iterator[pypdf.PdfReader]:
+        """Yield a PdfReader, reusing a PDFContext's parse when given one."""
+        if isinstance(source, PDFContext):
+            yield source.reader
+        else:
+            import pypdf
+
+            with open(source, "rb") as f:
+                yield pypdf.PdfReader(f)
+
+    @staticmethod
+    def _path_of(source: PDFSource) -> str:
+        return source.path if isinstance(source, PDFContext) else source
+
+    def _page_texts(
+        self, source: PDFSource, max_pages: Optional[int] = None
+    ) -> Tuple[List[str], int]:
+        """Return the text of the first `max_pages` pages (all if None).
+
+        Also returns the document's total page count. Uses PDFium when
+        installed, falling back to pypdf if it is missing or cannot open
+        the file.
+        """
+        pdfium = _load_pdfium()
+        if pdfium is not None:
+            try:
+                return self._pdfium_page_texts(pdfium, source, max_pages)
+            except pdfium.PdfiumError as e:
+                logging.debug(f"PDFium could not read PDF, using pypdf: {e}")
+
+        with self._open_reader(source) as reader:
+            total = len(reader.pages)
+            count = total if max_pages is None else min(max_pages, total)
+            return [reader.pages[i].extract_text() for i in range(count)], total
+
+    def _pdfium_page_texts(
+        self, pdfium: Any, source: PDFSource, max_pages: Optional[int]
+    ) -> Tuple[List[str], int]:
+        with _PDFIUM_LOCK:
+            if isinstance(source, PDFContext):
+                document, owned = source.pdfium_document, False
+            else:
+                document, owned = pdfium.PdfDocument(source), True
+            try:
+                total = len(document)
+                count = total if max_pages is None else min(max_pages, total)
+                texts = []
+                for i in range(count):
+                    # Release each page explicitly to keep PDFium memory flat.
+                    page = document[i]
+                    try:
+                        textpage = page.get_textpage()
+                        try:
+                            texts.append(
+                                textpage.get_text_range().replace("\r\n", "\n")
+                            )
+                        finally:
+                            textpage.close()
+                    finally:
+                        page.close()
+                return texts, total
+            finally:
+                if owned:
+                    document.close()
+
+    def get_page_count(self, pdf_path: PDFSource) -> int:
         """Get the number of pages in a PDF."""
         try:
-            with open(pdf_path, "rb") as f:
-                reader = pypdf.PdfReader(f)
+            with self._open_reader(pdf_path) as reader:
                 return len(reader.pages)
         except Exception as e:
-            logging.error(f"Error reading PDF {pdf_path}: {e}")
+            logging.error(f"Error reading PDF {self._path_of(pdf_path)}: {e}")
             return 0
 
+    def extract_pages_bytes(
+        self, source: Union[PDFSource, pypdf.PdfReader], num_pages: int
+    ) -> Optional[bytes]:
+        """Build a PDF of the first N pages of `source` entirely in memory.
+
+        `source` may be a path, a PDFContext or an already-parsed PdfReader,
+        so callers holding a parse avoid reading the file a second time.
+        """
+        import pypdf
+
+        try:
+            if isinstance(source, PDFContext):
+                reader = source.reader
+            elif isinstance(source, str):
+                reader = pypdf.PdfReader(source)
+            else:
+                reader = source
+            writer = pypdf.PdfWriter()
+
+            pages_to_extract = min(num_pages, len(reader.pages))
+            for i in range(pages_to_extract):
+                writer.add_page(reader.pages[i])
+
+            buf = io.BytesIO()
+            writer.write(buf)
+            logging.debug(f"Extracted {pages_to_extract} pages")
+            return buf.getvalue()
+        except Exception as e:
+            logging.error(f"Error extracting pages: {e}")
+            return None
+
     def extract_pages(
-        self, input_path: str, output_path: str, num_pages: Optional[int] = None
+        self,
+        input_path: Union[PDFSource, pypdf.PdfReader],
+        output_path: str,
+        num_pages: Optional[int] = None,
     ) -> bool:
         """Extract first N pages from PDF to a new file."""
         if num_pages is None:
@@ -433,25 +1103,21 @@ class PDFProcessor:
             else:
                 num_pages = 3
 
+        pdf_bytes = self.extract_pages_bytes(input_path, num_pages)
+        if pdf_bytes is None:
+            return False
         try:
-            with open(input_path, "rb") as input_file:
-                reader = pypdf.PdfReader(input_file)
-                writer = pypdf.PdfWriter()
-
-                pages_to_extract = min(num_pages, len(reader.pages))
-                for i in range(pages_to_extract):
-                    writer.add_page(reader.pages[i])
-
-                with open(output_path, "wb") as output_file:
-                    writer.write(output_file)
-
-            logging.debug(f"Extracted {pages_to_extract} pages to {output_path}")
+            with open(output_path, "wb") as output_file:
+                output_file.write(pdf_bytes)
+            logging.debug(f"Wrote extracted pages to {output_path}")
             return True
-        except Exception as e:
+        except OSError as e:
             logging.error(f"Error extracting pages: {e}")
             return False
 
-    def extract_text(self, pdf_path: str, max_pages: Optional[int] = None) -> str:
+    def extract_text(
+        self, pdf_path: PDFSource, max_pages: Optional[int] = None
+    ) -> str:
         """Extract text content from PDF for LLM analysis."""
         if max_pages is None:
             extraction_pages = self.config.get("pdf.extraction_pages", 3)
@@ -462,17 +1128,12 @@ class PDFProcessor:
 
         try:
             text_content = []
-            with open(pdf_path, "rb") as f:
-                reader = pypdf.PdfReader(f)
-                pages_to_process = min(max_pages, len(reader.pages))
-
-                for i in range(pages_to_process):
-                    page = reader.pages[i]
-                    page_text = page.extract_text()
-                    if page_text.strip():
-                        text_content.append(
-                            f"--- Page {i + 1} ---\n{page_text.strip()}"
-                        )
+            page_texts, _ = self._page_texts(pdf_path, max_pages)
+            pages_to_process = len(page_texts)
+
+            for i, page_text in enumerate(page_texts):
+                if page_text.strip():
+                    text_content.append(f"--- Page {i + 1} ---\n{page_text.strip()}")
 
             full_text = "\n\n".join(text_content)
             logging.debug(
@@ -481,7 +1142,9 @@ class PDFProcessor:
             return full_text
 
         except Exception as e:
-            logging.error(f"Error extracting text from PDF {pdf_path}: {e}")
+            logging.error(
+                f"Error extracting text from PDF {self._path_of(pdf_path)}: {e}"
+            )
             return ""
 
     def should_extract(self, page_count: int) -> bool:
@@ -492,7 +1155,7 @@ class PDFProcessor:
         return page_count > 3
 
     def detect_image_only_pdf(
-        self, pdf_path: str, min_text_per_page: Optional[int] = None
+        self, pdf_path: PDFSource, min_text_per_page: Optional[int] = None
     ) -> bool:
         """Detect if a PDF contains only images with no extractable text."""
         if min_text_per_page is None:
@@ -501,13 +1164,9 @@ class PDFProcessor:
             total_text_length = 0
             page_count = 0
 
-            with open(pdf_path, "rb") as f:
-                reader = pypdf.PdfReader(f)
-                page_count = len(reader.pages)
-
-                for page in reader.pages:
-                    page_text = page.extract_text()
-                    total_text_length += len(page_text.strip())
+            page_texts, page_count = self._page_texts(pdf_path)
+            for page_text in page_texts:
+                total_text_length += len(page_text.strip())
 
             # Calculate average text per page
             avg_text_per_page = total_text_length / page_count if page_count > 0 else 0
@@ -536,6 +1195,9 @@ class PDFProcessor:
         dpi = self.config.get("ocr.dpi", 300)
 
         try:
+            import pytesseract
+            from pdf2image import convert_from_path
+
             # Convert PDF to images
             logging.info(f"Converting PDF to images for OCR (DPI: {dpi})...")
             images = convert_from_path(pdf_path, dpi=dpi)
@@ -558,13 +1220,17 @@ class PDFProcessor:
             return []
 
     def create_searchable_pdf(
-        self, original_pdf_path: str, ocr_text_list: List[str], output_path: str
+        self,
+        original_pdf_path: PDFSource,
+        ocr_text_list: List[str],
+        output_path: str,
     ) -> bool:
         """Create a searchable PDF by adding OCR text as an invisible layer."""
+        import pypdf
+
         try:
             # Read original PDF
-            with open(original_pdf_path, "rb") as input_file:
-                reader = pypdf.PdfReader(input_file)
+            with self._open_reader(original_pdf_path) as reader:
                 writer = pypdf.PdfWriter()
 
                 # Process each page
@@ -605,6 +1271,10 @@ class PDFProcessor:
 class BaseLLMClient:
     """Base class for LLM clients."""
 
+    # Providers authenticated some other way (e.g. Vertex AI credentials)
+    # set this to False.
+    REQUIRES_API_KEY = True
+
     def __init__(
         self,
         config: ConfigManager,
@@ -623,6 +1293,34 @@ class BaseLLMClient:
             self.max_tokens = config.get("llm.max_tokens", 1000)
         self.temperature = config.get("llm.temperature", 0.3)
         self.token_costs: List[Dict[str, Any]] = []
+        self._costs_lock = threading.Lock()
+        self.api_key = self._get_api_key() if self.REQUIRES_API_KEY else None
+
+    @functools.cached_property
+    def _provider_cfg(self) -> Dict[str, Any]:
+        """This provider's `llm.providers.<name>` section, resolved once."""
+        section = self.config.get(f"llm.providers.{self.provider}", {})
+        return section if isinstance(section, dict) else {}
+
+    @functools.cached_property
+    def limiter(self) -> Optional[RateLimiter]:
+        """Request-rate limiter from `rate_limit_rps`/`rate_limit_burst`, if set."""
+        return RateLimiter.from_config(
+            self._provider_cfg.get("rate_limit_rps"),
+            self._provider_cfg.get("rate_limit_burst"),
+        )
+
+    def _throttle(self) -> None:
+        """Block until this provider's rate limit admits another request."""
+        if self.limiter is not None:
+            self.limiter.acquire()
+
+    # Provider name used in log messages.
+    DISPLAY_NAME = "LLM"
+
+    # The subset of PDF_STRATEGIES this client can send; "none" and anything
+    # not listed are rejected before a request is built.
+    SUPPORTED_PDF_STRATEGIES: FrozenSet[str] = frozenset({"rasterize_to_images"})
 
     def analyze_document(
         self,
@@ -632,60 +1330,288 @@ class BaseLLMClient:
     ) -> Tuple[Optional[str], Dict[str, Any]]:
         """Send document text or PDF to LLM for analysis.
 
+        Builds the user turn as provider-neutral parts and hands it to the
+        subclass's `_do_request`; cost accounting and logging happen here.
+
         Args:
             document_text: Extracted text content (if available)
             prompt_config: Prompt configuration dictionary
             pdf_path: Path to PDF file for direct upload (if text extraction failed)
         """
-        raise NotImplementedError("Subclasses must implement analyze_document")
-
-    def _encode_pdf_to_base64(self, pdf_path: str) -> str:
-        """Encode PDF file to base64 for API upload."""
+        if prompt_config is None:
+            logging.error("Prompt config is required")
+            return None, {}
         try:
-            with open(pdf_path, "rb") as pdf_file:
-                pdf_bytes = pdf_file.read()
-                return base64.b64encode(pdf_bytes).decode("utf-8")
+            parts = self._build_parts(document_text, prompt_config, pdf_path)
+            if parts is None:
+                return None, {}
+            text, cost_info = self._do_request(
+                prompt_config.get("system_prompt", ""), parts
+            )
         except Exception as e:
-            logging.error(f"Error encoding PDF to base64: {e}")
-            return ""
+            logging.error(f"{self.DISPLAY_NAME} API error: {e}")
+            return None, {}
+        self._record_cost(cost_info)
 
-    def _parse_secret_file(self, path: str, env_var_name: str) -> Optional[str]:
-        """Read a secret from a file.
+        suggested_name = (text or "").strip()
+        if not suggested_name:
+            logging.error(f"{self.DISPLAY_NAME} returned no text")
+            return None, cost_info
+        logging.info(f"{self.DISPLAY_NAME} suggested filename: {suggested_name}")
+        return suggested_name, cost_info
 
-        Accepts either a raw secret (the file's first non-empty line) or a
-        shell-style assignment line such as:
-            export ANTHROPIC_API_KEY=foo
-            ANTHROPIC_API_KEY="foo"
-        Surrounding single/double quotes on an assignment value are stripped.
+    def _build_parts(
+        self,
+        document_text: Optional[str],
+        prompt_config: Dict[str, Any],
+        pdf_path: Optional[str],
+    ) -> Optional[List[Dict[str, Any]]]:
+        """Assemble the user turn as provider-neutral content parts.
+
+        Parts are ``{"type": "text", "text": str}``, ``{"type": "image",
+        "data": png_bytes}`` or ``{"type": "pdf", "path": str}``. Returns None
+        (after logging why) when there is nothing this client can send.
         """
-        try:
-            with open(path, "r") as f:
-                lines = f.readlines()
-        except OSError as e:
-            logging.warning(f"Could not read secret file {path}: {e}")
+        user_prompt = prompt_config.get("user_prompt", "")
+        if document_text:
+            return [
+                {
+                    "type": "text",
+                    "text": f"{user_prompt}\n\nDocument content:\n{document_text}",
+                }
+            ]
+        if not pdf_path:
+            logging.error("Neither document text nor PDF path provided")
             return None
 
-        assign = re.compile(
-            rf"^\s*(?:export\s+)?{re.escape(env_var_name)}\s*=\s*(.+?)\s*$"
-        )
-        for line in lines:
-            m = assign.match(line)
-            if m:
-                value = m.group(1)
-                if len(value) >= 2 and value[0] == value[-1] and value[0] in "\"'":
-                    value = value[1:-1]
-                return value or None
+        strategy = self.pdf_strategy()
+        if strategy == "none":
+            logging.error(
+                f"Model {self.model} has pdf_strategy='none'; cannot process PDF. "
+                f"Use a PDF-capable model or extract text first."
+            )
+            return None
+        if strategy not in self.SUPPORTED_PDF_STRATEGIES:
+            logging.error(
+                f"{self.DISPLAY_NAME} client does not implement pdf_strategy='{strategy}' "
+                f"for model {self.model}."
+            )
+            return None
 
-        for line in lines:
-            stripped = line.strip()
-            if stripped:
-                return stripped
-        return None
+        if strategy == "rasterize_to_images":
+            png_pages = self._rasterize_pdf_to_pngs(pdf_path)
+            if not png_pages:
+                logging.error("No pages rasterized from PDF")
+                return None
+            parts: List[Dict[str, Any]] = [
+                {
+                    "type": "text",
+                    "text": f"{user_prompt}\n\nThe document is provided as images of its pages.",
+                }
+            ]
+            parts.extend({"type": "image", "data": png} for png in png_pages)
+            return parts
+        return [
+            {"type": "text", "text": f"{user_prompt}\n\nPlease analyze this PDF document:"},
+            {"type": "pdf", "path": pdf_path},
+        ]
 
-    def _resolve_secret(self, env_var_name: str) -> Optional[str]:
-        """Resolve a secret from the environment, else an app-dir file.
+    def _do_request(
+        self, system_prompt: str, parts: List[Dict[str, Any]]
+    ) -> Tuple[str, Dict[str, Any]]:
+        """Send one request built from `_build_parts` output.
 
-        The environment always wins. The file must be named exactly
+        Returns (reply text, cost_info); raises on failure.
+        """
+        raise NotImplementedError("Subclasses must implement _do_request")
+
+    # Set by ScanNamer when `cache.reuse_uploads` is on. Uploaded PDFs are
+    # then kept on the provider and their file ids recorded here by content
+    # hash; otherwise each upload is deleted once the request completes.
+    upload_cache: Optional[NameCache] = None
+
+    @contextlib.contextmanager
+    def _uploaded(
+        self,
+        pdf_path: str,
+        upload: Callable[[], str],
+        delete: Callable[[str], None],
+    ) -> Iterator[str]:
+        """Yield a provider file id for `pdf_path`, uploading only if needed.
+
+        A request that fails with a reused file id forgets it, so the next
+        run uploads the PDF again instead of failing the same way.
+        """
+        if self.upload_cache is None:
+            file_id = upload()
+            try:
+                yield file_id
+            finally:
+                delete(file_id)
+            return
+
+        h = NameCache.content_hash(pdf_path=pdf_path)
+        file_id = self.upload_cache.get_upload(h, self.provider)
+        reused = file_id is not None
+        if file_id is None:
+            file_id = upload()
+            self.upload_cache.put_upload(h, self.provider, file_id)
+        else:
+            logging.info(f"Reusing uploaded file {file_id} for {pdf_path}")
+        try:
+            yield file_id
+        except Exception:
+            if reused:
+                self.upload_cache.forget_upload(h, self.provider)
+            raise
+
+    # Upper bound for a single backoff sleep between retries.
+    RETRY_MAX_DELAY_SECONDS = 60.0
+
+    def _call_with_retry(
+        self, func: Callable[..., Any], *args: Any, **kwargs: Any
+    ) -> Any:
+        """Call a provider API, retrying rate limits and transient errors.
+
+        Sleeps for the server's Retry-After when present, otherwise for an
+        exponential backoff with jitter, up to ``llm.max_retries`` retries
+        (default 6). Non-retryable errors propagate immediately.
+        """
+        return self._retrying_call(func, args, kwargs, throttle=True)
+
+    def _retrying_call(
+        self,
+        func: Callable[..., Any],
+        args: Tuple[Any, ...],
+        kwargs: Dict[str, Any],
+        throttle: bool,
+    ) -> Any:
+        """_call_with_retry, optionally without taking rate limit tokens."""
+        max_retries = self.config.get("llm.max_retries", 6)
+        if not isinstance(max_retries, int) or max_retries < 0:
+            max_retries = 6
+        attempt = 0
+        while True:
+            if throttle:
+                self._throttle()
+            try:
+                return func(*args, **kwargs)
+            except Exception as e:
+                if attempt >= max_retries or not is_retryable_error(e):
+                    raise
+                delay = retry_after_seconds(e)
+                if delay is None:
+                    delay = 2**attempt + random.random()
+                delay = min(delay, self.RETRY_MAX_DELAY_SECONDS)
+                attempt += 1
+                logging.warning(
+                    f"{self.provider} request failed ({e}); retry {attempt}/{max_retries} in {delay:.1f}s"
+                )
+                time.sleep(delay)
+
+    # Batch jobs are polled with exponential backoff between these bounds.
+    BATCH_POLL_INITIAL_SECONDS = 5.0
+    BATCH_POLL_MAX_SECONDS = 120.0
+
+    def analyze_documents_batch(
+        self, items: List[Dict[str, Any]], prompt_config: Dict[str, Any]
+    ) -> Dict[str, Tuple[Optional[str], Dict[str, Any]]]:
+        """Analyze many documents, keyed by each item's ``key``.
+
+        Each item carries ``key`` plus either ``document_text`` or
+        ``pdf_path``. Providers with an asynchronous batch API override this;
+        the default analyzes the items one at a time.
+        """
+        results: Dict[str, Tuple[Optional[str], Dict[str, Any]]] = {}
+        for item in items:
+            results[item["key"]] = self.analyze_document(
+                document_text=item.get("document_text"),
+                prompt_config=prompt_config,
+                pdf_path=item.get("pdf_path"),
+            )
+        return results
+
+    def _wait_for_batch(
+        self, retrieve: Callable[[], Any], is_done: Callable[[Any], bool]
+    ) -> Any:
+        """Poll ``retrieve`` until ``is_done`` accepts its result.
+
+        Raises TimeoutError after ``llm.batch_timeout_seconds`` (default 24h).
+        """
+        timeout = self.config.get("llm.batch_timeout_seconds", 86400)
+        deadline = time.monotonic() + timeout
+        delay = self.BATCH_POLL_INITIAL_SECONDS
+        while True:
+            batch = retrieve()
+            if is_done(batch):
+                return batch
+            if time.monotonic() + delay > deadline:
+                raise TimeoutError(f"Batch did not finish within {timeout} seconds")
+            logging.debug(f"Batch still running; polling again in {delay:.0f}s")
+            time.sleep(delay)
+            delay = min(delay * 2, self.BATCH_POLL_MAX_SECONDS)
+
+    # Must be a multiple of 3 so chunked base64 output concatenates cleanly.
+    BASE64_CHUNK_SIZE = 57 * 1024
+
+    def _encode_pdf_to_base64(self, pdf: Union[str, bytes]) -> str:
+        """Encode a PDF (file path or in-memory bytes) to base64 for API upload."""
+        try:
+            if isinstance(pdf, bytes):
+                return base64.b64encode(pdf).decode("ascii")
+            # Encode in 3-byte-aligned chunks so no padding lands mid-stream
+            # and the raw PDF is never held in memory alongside its encoding.
+            # Each chunk is decoded as it goes, so the peak is the pieces plus
+            # the joined result: two copies of the encoding, not three.
+            encoded: List[str] = []
+            with open(pdf, "rb") as pdf_file:
+                while True:
+                    chunk = pdf_file.read(self.BASE64_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    encoded.append(base64.b64encode(chunk).decode("ascii"))
+            return "".join(encoded)
+        except Exception as e:
+            logging.error(f"Error encoding PDF to base64: {e}")
+            return ""
+
+    def _parse_secret_file(self, path: str, env_var_name: str) -> Optional[str]:
+        """Read a secret from a file.
+
+        Accepts either a raw secret (the file's first non-empty line) or a
+        shell-style assignment line such as:
+            export ANTHROPIC_API_KEY=foo
+            ANTHROPIC_API_KEY="foo"
+        Surrounding single/double quotes on an assignment value are stripped.
+        """
+        try:
+            with open(path, "r") as f:
+                lines = f.readlines()
+        except OSError as e:
+            logging.warning(f"Could not read secret file {path}: {e}")
+            return None
+
+        assign = re.compile(
+            rf"^\s*(?:export\s+)?{re.escape(env_var_name)}\s*=\s*(.+?)\s*$"
+        )
+        for line in lines:
+            m = assign.match(line)
+            if m:
+                value = m.group(1)
+                if len(value) >= 2 and value[0] == value[-1] and value[0] in "\"'":
+                    value = value[1:-1]
+                return value or None
+
+        for line in lines:
+            stripped = line.strip()
+            if stripped:
+                return stripped
+        return None
+
+    def _resolve_secret(self, env_var_name: str) -> Optional[str]:
+        """Resolve a secret from the environment, else an app-dir file.
+
+        The environment always wins. The file must be named exactly
         ``env_var_name`` (no extension) and live in the application directory.
         """
         value = os.getenv(env_var_name)
@@ -698,7 +1624,7 @@ class BaseLLMClient:
 
     def _get_api_key(self) -> str:
         """Resolve this provider's API key from env or app-dir file."""
-        api_key_env = self.config.get(f"llm.providers.{self.provider}.api_key_env")
+        api_key_env = self._provider_cfg.get("api_key_env")
         if not isinstance(api_key_env, str):
             logging.error(
                 f"Invalid API key environment variable name for {self.provider}"
@@ -726,9 +1652,11 @@ class BaseLLMClient:
 
         Defaults to "none" if missing or unrecognized.
         """
-        strategies = self.config.get(
-            f"llm.providers.{self.provider}.pdf_strategy", {}
-        )
+        return self._pdf_strategy
+
+    @functools.cached_property
+    def _pdf_strategy(self) -> str:
+        strategies = self._provider_cfg.get("pdf_strategy", {})
         if isinstance(strategies, dict):
             value = strategies.get(self.model, "none")
             if isinstance(value, str) and value in self.PDF_STRATEGIES:
@@ -739,6 +1667,106 @@ class BaseLLMClient:
         """True if this model has any non-text PDF strategy configured."""
         return self.pdf_strategy() != "none"
 
+    def prefetch_upload(self, pdf_path: str) -> None:
+        """Start uploading `pdf_path` in case the document falls back to PDF.
+
+        Clients without a separate upload step ignore this.
+        """
+
+    def discard_prefetch(self, pdf_path: str) -> None:
+        """Drop a prefetched upload of `pdf_path` that will not be used.
+
+        Returns once nothing is reading `pdf_path`, so it may be deleted.
+        """
+
+    def _streaming_enabled(self) -> bool:
+        """True if `llm.stream` asks for streamed responses."""
+        return self.config.get("llm.stream", False) is True
+
+    @staticmethod
+    def _read_first_line(deltas: Iterable[str]) -> Tuple[str, bool]:
+        """Accumulate streamed text until the first non-empty line ends.
+
+        A filename never spans lines, so the caller can abandon the stream
+        as soon as one is complete. Returns (text, stopped_early).
+        """
+        text = ""
+        for delta in deltas:
+            text += delta
+            stripped = text.lstrip()
+            if "\n" in stripped:
+                return stripped.split("\n", 1)[0], True
+        return text, False
+
+    # Rough characters-per-token ratio for English text, used when no
+    # tokenizer for the model is available.
+    CHARS_PER_TOKEN = 4
+    DEFAULT_MAX_INPUT_TOKENS = 4000
+
+    @functools.cached_property
+    def _tokenizer(self) -> Any:
+        """tiktoken encoding for OpenAI models, or None if unavailable.
+
+        Other providers publish no local tokenizer.
+        """
+        if self.provider != "openai":
+            return None
+        try:
+            import tiktoken
+        except ImportError:
+            return None
+        try:
+            try:
+                return tiktoken.encoding_for_model(self.model)
+            except KeyError:
+                return tiktoken.get_encoding("o200k_base")
+        except Exception as e:
+            # Encodings are downloaded on first use, which fails offline.
+            logging.warning(f"Could not load tiktoken encoding, estimating tokens: {e}")
+            return None
+
+    def count_tokens(self, text: str) -> int:
+        """Token count of `text`, estimated from CHARS_PER_TOKEN if no tokenizer."""
+        if self._tokenizer is not None:
+            return len(self._tokenizer.encode(text))
+        return len(text) // self.CHARS_PER_TOKEN
+
+    def _truncate_to_tokens(self, text: str, max_tokens: int) -> str:
+        """Cut `text` to at most roughly `max_tokens` tokens for this model.
+
+        Measured with `_tokenizer` when there is one, else CHARS_PER_TOKEN.
+        """
+        if self._tokenizer is not None:
+            tokens = self._tokenizer.encode(text)
+            if len(tokens) <= max_tokens:
+                return text
+            return self._tokenizer.decode(tokens[:max_tokens])
+
+        max_chars = max_tokens * self.CHARS_PER_TOKEN
+        if len(text) <= max_chars:
+            return text
+        cut = text[:max_chars]
+        # Prefer not to end mid-word.
+        boundary = cut.rfind(" ", max_chars - 64)
+        return cut[:boundary] if boundary > 0 else cut
+
+    def fit_input_budget(self, text: str) -> str:
+        """Truncate document text to `llm.max_input_tokens` (<= 0 disables)."""
+        max_input = self.config.get(
+            "llm.max_input_tokens", self.DEFAULT_MAX_INPUT_TOKENS
+        )
+        if not isinstance(max_input, int):
+            max_input = self.DEFAULT_MAX_INPUT_TOKENS
+        if max_input <= 0:
+            return text
+        truncated = self._truncate_to_tokens(text, max_input)
+        if len(truncated) < len(text):
+            logging.info(
+                f"Truncated document text from {len(text)} to {len(truncated)} "
+                f"characters (~{max_input} token budget)"
+            )
+        return truncated
+
     def _rasterize_pdf_to_pngs(self, pdf_path: str) -> List[bytes]:
         """Render the first `pdf.extraction_pages` pages of `pdf_path` to PNG bytes.
 
@@ -746,6 +1774,8 @@ class BaseLLMClient:
         empty list on error.
         """
         try:
+            from pdf2image import convert_from_path
+
             extraction_pages = self.config.get("pdf.extraction_pages", 3)
             if not isinstance(extraction_pages, int) or extraction_pages < 1:
                 extraction_pages = 3
@@ -772,23 +1802,76 @@ class BaseLLMClient:
             logging.error(f"Failed to rasterize PDF {pdf_path}: {e}")
             return []
 
+    def _record_cost(self, cost_info: Dict[str, Any]) -> None:
+        """Append a request's token usage; safe to call from worker threads."""
+        with self._costs_lock:
+            self.token_costs.append(cost_info)
+
     def get_total_costs(self) -> Dict[str, int]:
         """Get total token costs for all requests."""
-        if not self.token_costs:
+        with self._costs_lock:
+            costs = list(self.token_costs)
+        if not costs:
             return {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
 
         return {
-            "prompt_tokens": sum(cost["prompt_tokens"] for cost in self.token_costs),
-            "completion_tokens": sum(
-                cost["completion_tokens"] for cost in self.token_costs
-            ),
-            "total_tokens": sum(cost["total_tokens"] for cost in self.token_costs),
+            "prompt_tokens": sum(cost["prompt_tokens"] for cost in costs),
+            "completion_tokens": sum(cost["completion_tokens"] for cost in costs),
+            "total_tokens": sum(cost["total_tokens"] for cost in costs),
         }
 
 
+def _chat_messages(
+    system_prompt: str, parts: List[Dict[str, Any]]
+) -> List[Dict[str, Any]]:
+    """Build OpenAI-compatible chat/completions messages from content parts.
+
+    A lone text part is sent as a plain string, which every compatible server
+    (including local ones like LM Studio) accepts.
+    """
+    if len(parts) == 1 and parts[0]["type"] == "text":
+        content: Any = parts[0]["text"]
+    else:
+        content = []
+        for part in parts:
+            if part["type"] == "text":
+                content.append({"type": "text", "text": part["text"]})
+            elif part["type"] == "image":
+                b64 = base64.b64encode(part["data"]).decode("ascii")
+                content.append({
+                    "type": "image_url",
+                    "image_url": {"url": f"data:image/png;base64,{b64}"},
+                })
+            else:
+                raise ValueError("PDF parts need the Files/Responses API")
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": content},
+    ]
+
+
+def _responses_input(
+    system_prompt: str, parts: List[Dict[str, Any]], file_id: str
+) -> List[Dict[str, Any]]:
+    """Build Responses API input, with the PDF part sent as uploaded `file_id`."""
+    blocks: List[Dict[str, Any]] = []
+    # Include system prompt as a leading input_text if present
+    if system_prompt:
+        blocks.append({"type": "input_text", "text": system_prompt})
+    for part in parts:
+        if part["type"] == "pdf":
+            blocks.append({"type": "input_file", "file_id": file_id})
+        else:
+            blocks.append({"type": "input_text", "text": part["text"]})
+    return [{"role": "user", "content": blocks}]
+
+
 class XAIClient(BaseLLMClient):
     """X.AI (Grok) API client."""
 
+    DISPLAY_NAME = "X.AI"
+    SUPPORTED_PDF_STRATEGIES = frozenset({"files_api_responses", "rasterize_to_images"})
+
     def __init__(
         self,
         config: ConfigManager,
@@ -797,8 +1880,59 @@ class XAIClient(BaseLLMClient):
         max_tokens: Optional[int] = None,
     ):
         super().__init__(config, provider, model, max_tokens)
-        self.api_key = self._get_api_key()
-        self.endpoint = config.get(f"llm.providers.{provider}.api_endpoint")
+        self.endpoint = self._provider_cfg.get("api_endpoint")
+        self.session = self._create_session()
+
+    def _create_session(self) -> requests.Session:
+        """Build a keep-alive session shared by every request to X.AI.
+
+        Reusing pooled connections avoids a TCP/TLS handshake per document,
+        and the mounted Retry transparently backs off on 429s and transient
+        5xx responses (honoring Retry-After).
+        """
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
+        session = requests.Session()
+        session.headers.update({"Authorization": f"Bearer {self.api_key}"})
+        retry = Retry(
+            total=5,
+            backoff_factor=1.5,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=None,  # X.AI calls are POSTs; retry them too
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=16, max_retries=retry)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def _post_json(self, url: str, payload: Any = None, **kwargs: Any) -> Any:
+        """POST through the pooled session and return the decoded JSON body.
+
+        A `payload` is serialized with `dumps_json` and sent as the JSON
+        request body. The response is closed before returning, so its
+        connection goes back to the pool even when the status check or parse
+        fails. HTTP errors log the start of the response body before being
+        re-raised.
+        """
+        import requests
+
+        if payload is not None:
+            kwargs["data"] = dumps_json(payload)
+            kwargs["headers"] = {"Content-Type": "application/json"}
+        self._throttle()
+        with self.session.post(url, **kwargs) as response:
+            try:
+                response.raise_for_status()
+            except requests.HTTPError:
+                logging.error(
+                    f"xAI HTTP {response.status_code} error: {response.text[:300]}"
+                )
+                raise
+            return loads_json(response.content)
 
     def _files_url(self) -> str:
         """Derive the xAI Files API URL from the chat-completions endpoint."""
@@ -816,298 +1950,119 @@ class XAIClient(BaseLLMClient):
             base = base[: -len(suffix)]
         return base.rstrip("/") + "/responses"
 
-    def _analyze_pdf_via_files_api(
-        self,
-        pdf_path: str,
-        prompt_config: Dict[str, Any],
-    ) -> Tuple[Optional[str], Dict[str, Any]]:
-        """Upload PDF via Files API then call Responses API to analyze it."""
-        auth_headers = {"Authorization": f"Bearer {self.api_key}"}
-        file_id: Optional[str] = None
-        try:
-            # Step 1: Upload PDF to Files API
-            with open(pdf_path, "rb") as pdf_file:
-                pdf_bytes = pdf_file.read()
-
-            logging.info(f"Uploading PDF to xAI Files API: {pdf_path}")
-            upload_resp = requests.post(
-                self._files_url(),
-                headers=auth_headers,
-                files={"file": (os.path.basename(pdf_path), pdf_bytes, "application/pdf")},
-                data={"purpose": "assistants"},
-                timeout=60,
-            )
-            upload_resp.raise_for_status()
-            upload_data = upload_resp.json()
-            file_id = upload_data.get("id")
-            if not file_id:
-                logging.error(
-                    f"xAI Files API returned no file id. Response: {upload_resp.text[:300]}"
-                )
-                return None, {}
-            logging.info(f"xAI file uploaded, file_id={file_id}")
-
-            # Step 2: Call Responses API with file_id
-            system_prompt = prompt_config.get("system_prompt", "")
-            user_prompt = prompt_config.get("user_prompt", "")
-            full_user_text = (
-                f"{user_prompt}\n\nPlease analyze this PDF document:"
-                if user_prompt
-                else "Please analyze this PDF document:"
+    def _upload_file(self, pdf_path: str) -> str:
+        """Upload a PDF to the xAI Files API and return its file id."""
+        with open(pdf_path, "rb") as pdf_file:
+            pdf_bytes = pdf_file.read()
+
+        logging.info(f"Uploading PDF to xAI Files API: {pdf_path}")
+        upload_data = self._post_json(
+            self._files_url(),
+            files={"file": (os.path.basename(pdf_path), pdf_bytes, "application/pdf")},
+            data={"purpose": "assistants"},
+            timeout=60,
+        )
+        file_id = upload_data.get("id")
+        if not file_id:
+            raise RuntimeError(
+                f"xAI Files API returned no file id. Response: {str(upload_data)[:300]}"
             )
+        logging.info(f"xAI file uploaded, file_id={file_id}")
+        return file_id
 
-            # Include system prompt as a leading input_text if present
-            content_blocks: List[Dict[str, Any]] = []
-            if system_prompt:
-                content_blocks.append({"type": "input_text", "text": system_prompt})
-            content_blocks.append({"type": "input_text", "text": full_user_text})
-            content_blocks.append({"type": "input_file", "file_id": file_id})
-
-            payload: Dict[str, Any] = {
-                "model": self.model,
-                "input": [
-                    {
-                        "role": "user",
-                        "content": content_blocks,
-                    }
-                ],
-                "max_output_tokens": self.max_tokens,
-            }
-
-            resp_headers = dict(auth_headers)
-            resp_headers["Content-Type"] = "application/json"
+    def _delete_file(self, file_id: str) -> None:
+        import requests
 
+        try:
+            self.session.delete(
+                self._files_url() + f"/{file_id}",
+                timeout=15,
+            ).close()
+            logging.debug(f"Deleted xAI file {file_id}")
+        except requests.RequestException as e:
+            logging.warning(f"Could not delete xAI file {file_id}: {e}")
+
+    def _respond_with_file(
+        self, system_prompt: str, parts: List[Dict[str, Any]]
+    ) -> Tuple[str, Dict[str, Any]]:
+        """Upload the PDF part via the Files API, then ask the Responses API."""
+        pdf_path = next(part["path"] for part in parts if part["type"] == "pdf")
+        with self._uploaded(
+            pdf_path, lambda: self._upload_file(pdf_path), self._delete_file
+        ) as file_id:
             logging.info(f"Calling xAI Responses API for model {self.model}")
-            response = requests.post(
+            result = self._post_json(
                 self._responses_url(),
-                headers=resp_headers,
-                json=payload,
-                timeout=120,
-            )
-            response.raise_for_status()
-            result = response.json()
-
-            # Parse usage from Responses API shape
-            usage = result.get("usage", {})
-            cost_info = {
-                "prompt_tokens": usage.get("input_tokens", usage.get("prompt_tokens", 0)),
-                "completion_tokens": usage.get("output_tokens", usage.get("completion_tokens", 0)),
-                "total_tokens": usage.get("total_tokens", 0),
-            }
-            if cost_info["total_tokens"] == 0:
-                cost_info["total_tokens"] = (
-                    cost_info["prompt_tokens"] + cost_info["completion_tokens"]
-                )
-            self.token_costs.append(cost_info)
-
-            # Parse text from Responses API output shape:
-            # output[*].content[*].text  (type == "output_text")
-            suggested_name: Optional[str] = None
-            output = result.get("output", [])
-            for out_item in output:
-                content = out_item.get("content", [])
-                for block in content:
-                    text = block.get("text") or block.get("output_text")
-                    if text:
-                        suggested_name = str(text).strip()
-                        break
-                if suggested_name:
-                    break
-
-            if suggested_name is None:
-                # Fallback: look for any top-level text field
-                suggested_name = result.get("text") or result.get("output_text")
-                if suggested_name:
-                    suggested_name = str(suggested_name).strip()
-
-            if not suggested_name:
-                logging.error(
-                    f"xAI Responses API returned no text. Full response: {str(result)[:500]}"
-                )
-                return None, cost_info
-
-            logging.info(f"X.AI suggested filename: {suggested_name}")
-            return suggested_name, cost_info
-
-        except requests.HTTPError as e:
-            body = getattr(e.response, "text", "") if e.response is not None else ""
-            status = e.response.status_code if e.response is not None else "?"
-            logging.error(f"xAI Files/Responses API HTTP {status} error: {body[:300]}")
-            return None, {}
-        except Exception as e:
-            logging.error(f"xAI Files/Responses API error: {e}")
-            return None, {}
-        finally:
-            if file_id:
-                try:
-                    requests.delete(
-                        self._files_url() + f"/{file_id}",
-                        headers=auth_headers,
-                        timeout=15,
-                    )
-                    logging.debug(f"Deleted xAI file {file_id}")
-                except requests.RequestException as e:
-                    logging.warning(f"Could not delete xAI file {file_id}: {e}")
-
-    def _analyze_via_rasterized_pages(
-        self, pdf_path: str, prompt_config: Dict[str, Any]
-    ) -> Tuple[Optional[str], Dict[str, Any]]:
-        """Rasterize PDF pages to PNG and analyze via chat/completions image_url."""
-        try:
-            png_pages = self._rasterize_pdf_to_pngs(pdf_path)
-            if not png_pages:
-                logging.error("No pages rasterized from PDF")
-                return None, {}
-
-            content: List[Dict[str, Any]] = [
-                {
-                    "type": "text",
-                    "text": (
-                        prompt_config.get("user_prompt", "")
-                        + "\n\nThe document is provided as images of its pages."
-                    ),
-                }
-            ]
-            for png in png_pages:
-                b64 = base64.b64encode(png).decode("utf-8")
-                content.append({
-                    "type": "image_url",
-                    "image_url": {"url": f"data:image/png;base64,{b64}"},
-                })
-
-            messages = [
-                {
-                    "role": "system",
-                    "content": prompt_config.get("system_prompt", ""),
+                payload={
+                    "model": self.model,
+                    "input": _responses_input(system_prompt, parts, file_id),
+                    "max_output_tokens": self.max_tokens,
                 },
-                {"role": "user", "content": content},
-            ]
-
-            headers = {
-                "Authorization": f"Bearer {self.api_key}",
-                "Content-Type": "application/json",
-            }
-            payload = {
-                "model": self.model,
-                "messages": messages,
-                "max_tokens": self.max_tokens,
-                "temperature": self.temperature,
-            }
-
-            endpoint = self.endpoint
-            if not isinstance(endpoint, str):
-                logging.error("Invalid API endpoint configuration")
-                return None, {}
-            response = requests.post(
-                endpoint, json=payload, headers=headers, timeout=120
-            )
-            response.raise_for_status()
-            result = response.json()
-
-            usage = result.get("usage", {})
-            cost_info = {
-                "prompt_tokens": usage.get("prompt_tokens", 0),
-                "completion_tokens": usage.get("completion_tokens", 0),
-                "total_tokens": usage.get("total_tokens", 0),
-            }
-            self.token_costs.append(cost_info)
-
-            suggested_name = result["choices"][0]["message"]["content"].strip()
-            logging.info(
-                f"X.AI suggested filename (from rasterized PDF): {suggested_name}"
+                timeout=120,
             )
-            return suggested_name, cost_info
-        except Exception as e:
-            logging.error(f"X.AI rasterized-PDF analysis error: {e}")
-            return None, {}
-
-    def analyze_document(
-        self,
-        document_text: Optional[str] = None,
-        prompt_config: Optional[Dict[str, Any]] = None,
-        pdf_path: Optional[str] = None,
-    ) -> Tuple[Optional[str], Dict[str, Any]]:
-        """Send document text or PDF to Grok for analysis."""
-        try:
-            if prompt_config is None:
-                logging.error("Prompt config is required")
-                return None, {}
 
-            if pdf_path:
-                strategy = self.pdf_strategy()
-                if strategy == "files_api_responses":
-                    return self._analyze_pdf_via_files_api(pdf_path, prompt_config)
-                if strategy == "rasterize_to_images":
-                    return self._analyze_via_rasterized_pages(pdf_path, prompt_config)
-                if strategy == "none":
-                    logging.error(
-                        f"Model {self.model} has pdf_strategy='none'; cannot process PDF. "
-                        f"Use a PDF-capable model or extract text first."
-                    )
-                    return None, {}
-                logging.error(
-                    f"X.AI client does not implement pdf_strategy='{strategy}' "
-                    f"for model {self.model}."
-                )
-                return None, {}
-
-            if not document_text:
-                logging.error("Neither document text nor PDF path provided")
-                return None, {}
-
-            # Text path: use chat/completions as before
-            headers = {
-                "Authorization": f"Bearer {self.api_key}",
-                "Content-Type": "application/json",
-            }
-
-            user_message = f"{prompt_config.get('user_prompt', '')}\n\nDocument content:\n{document_text}"
-            messages = [
-                {
-                    "role": "system",
-                    "content": prompt_config.get("system_prompt", ""),
-                },
-                {"role": "user", "content": user_message},
-            ]
-
-            payload = {
-                "model": self.model,
-                "messages": messages,
-                "max_tokens": self.max_tokens,
-                "temperature": self.temperature,
-            }
-
-            endpoint = self.endpoint
-            if not isinstance(endpoint, str):
-                logging.error("Invalid API endpoint configuration")
-                return None, {}
-            response = requests.post(
-                endpoint, json=payload, headers=headers, timeout=60
+        # Parse usage from Responses API shape
+        usage = result.get("usage", {})
+        cost_info = {
+            "prompt_tokens": usage.get("input_tokens", usage.get("prompt_tokens", 0)),
+            "completion_tokens": usage.get("output_tokens", usage.get("completion_tokens", 0)),
+            "total_tokens": usage.get("total_tokens", 0),
+        }
+        if cost_info["total_tokens"] == 0:
+            cost_info["total_tokens"] = (
+                cost_info["prompt_tokens"] + cost_info["completion_tokens"]
             )
-            response.raise_for_status()
-            result = response.json()
 
-            usage = result.get("usage", {})
-            cost_info = {
-                "prompt_tokens": usage.get("prompt_tokens", 0),
-                "completion_tokens": usage.get("completion_tokens", 0),
-                "total_tokens": usage.get("total_tokens", 0),
-            }
-            self.token_costs.append(cost_info)
-
-            suggested_name = result["choices"][0]["message"]["content"].strip()
-            logging.info(f"X.AI suggested filename: {suggested_name}")
-
-            return suggested_name, cost_info
-
-        except Exception as e:
-            logging.error(f"X.AI API error: {e}")
-            return None, {}
+        # Parse text from Responses API output shape:
+        # output[*].content[*].text  (type == "output_text")
+        for out_item in result.get("output", []):
+            for block in out_item.get("content", []):
+                text = block.get("text") or block.get("output_text")
+                if text:
+                    return str(text), cost_info
+        # Fallback: look for any top-level text field
+        text = result.get("text") or result.get("output_text")
+        if not text:
+            logging.debug(f"xAI Responses API full response: {str(result)[:500]}")
+        return str(text or ""), cost_info
+
+    def _do_request(
+        self, system_prompt: str, parts: List[Dict[str, Any]]
+    ) -> Tuple[str, Dict[str, Any]]:
+        if any(part["type"] == "pdf" for part in parts):
+            return self._respond_with_file(system_prompt, parts)
+
+        endpoint = self.endpoint
+        if not isinstance(endpoint, str):
+            raise ValueError("Invalid API endpoint configuration")
+        payload = {
+            "model": self.model,
+            "messages": _chat_messages(system_prompt, parts),
+            "max_tokens": self.max_tokens,
+            "temperature": self.temperature,
+        }
+        # Page images take longer to process than plain text.
+        timeout = 60 if len(parts) == 1 else 120
+        result = self._post_json(endpoint, payload, timeout=timeout)
+
+        usage = result.get("usage", {})
+        cost_info = {
+            "prompt_tokens": usage.get("prompt_tokens", 0),
+            "completion_tokens": usage.get("completion_tokens", 0),
+            "total_tokens": usage.get("total_tokens", 0),
+        }
+        return result["choices"][0]["message"]["content"], cost_info
 
 
 class AnthropicClient(BaseLLMClient):
     """Anthropic Claude API client."""
 
+    DISPLAY_NAME = "Claude"
+    SUPPORTED_PDF_STRATEGIES = frozenset({"inline_base64_document", "rasterize_to_images"})
+
+    # Beta flag for uploading files and citing them from Messages requests.
+    FILES_API_BETA = "files-api-2025-04-14"
+
     def __init__(
         self,
         config: ConfigManager,
@@ -1116,160 +2071,234 @@ class AnthropicClient(BaseLLMClient):
         max_tokens: Optional[int] = None,
     ):
         super().__init__(config, provider, model, max_tokens)
-        self.api_key = self._get_api_key()
         self._setup_client()
 
     def _setup_client(self) -> None:
         try:
             import anthropic
 
-            self.client = anthropic.Anthropic(api_key=self.api_key)
+            # Retries are handled by _call_with_retry; don't compound them.
+            self.client = anthropic.Anthropic(api_key=self.api_key, max_retries=0)
         except ImportError:
             logging.error(
                 "Anthropic library not installed. Please install with: pip install anthropic"
             )
             sys.exit(1)
 
-    def _analyze_via_rasterized_pages(
-        self, pdf_path: str, prompt_config: Dict[str, Any]
-    ) -> Tuple[Optional[str], Dict[str, Any]]:
-        """Rasterize PDF pages to PNG and analyze via Anthropic image content blocks."""
+    def _create_message(
+        self, betas: Optional[List[str]] = None, **kwargs: Any
+    ) -> Tuple[str, Dict[str, Any]]:
+        """Call the Messages API and return (text, cost_info).
+
+        With `llm.stream` enabled the reply is streamed and the connection
+        dropped as soon as the first line of text is complete. Passing
+        `betas` routes the call through the beta Messages API.
+        """
+        messages = self.client.messages
+        if betas:
+            messages = self.client.beta.messages
+            kwargs["betas"] = betas
+        if not self._streaming_enabled():
+            response = self._call_with_retry(messages.create, **kwargs)
+            text, usage = response.content[0].text, response.usage
+        else:
+
+            def _stream() -> Tuple[str, Any]:
+                with messages.stream(**kwargs) as stream:
+                    text, stopped_early = self._read_first_line(stream.text_stream)
+                    if stopped_early:
+                        logging.debug("Stopped Claude stream after first line")
+                    return text, stream.current_message_snapshot.usage
+
+            text, usage = self._call_with_retry(_stream)
+
+        cost_info = {
+            "prompt_tokens": usage.input_tokens,
+            "completion_tokens": usage.output_tokens,
+            "total_tokens": usage.input_tokens + usage.output_tokens,
+        }
+        return text, cost_info
+
+    def _upload_file(self, pdf_path: str) -> str:
+        """Upload a PDF to the Anthropic Files API (beta) and return its file id."""
+
+        def _upload() -> Any:
+            # Reopen per attempt so a retry never sends a consumed handle.
+            with open(pdf_path, "rb") as fh:
+                return self.client.beta.files.upload(
+                    file=(os.path.basename(pdf_path), fh, "application/pdf")
+                )
+
+        file_id = self._call_with_retry(_upload).id
+        logging.info(f"Anthropic file uploaded, file_id={file_id}")
+        return file_id
+
+    def _delete_file(self, file_id: str) -> None:
         try:
-            png_pages = self._rasterize_pdf_to_pngs(pdf_path)
-            if not png_pages:
-                logging.error("No pages rasterized from PDF")
-                return None, {}
+            self.client.beta.files.delete(file_id)
+            logging.debug(f"Deleted Anthropic file {file_id}")
+        except Exception as e:
+            logging.warning(f"Could not delete Anthropic file {file_id}: {e}")
 
-            content: List[Dict[str, Any]] = []
-            for png in png_pages:
-                b64 = base64.b64encode(png).decode("utf-8")
-                content.append({
+    def _content_blocks(
+        self, parts: List[Dict[str, Any]], file_id: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Translate `_build_parts` output into Messages API content blocks.
+
+        The PDF part cites `file_id` when given, else is inlined as base64.
+        """
+        blocks: List[Dict[str, Any]] = []
+        for part in parts:
+            if part["type"] == "text":
+                blocks.append({"type": "text", "text": part["text"]})
+            elif part["type"] == "image":
+                blocks.append({
                     "type": "image",
                     "source": {
                         "type": "base64",
                         "media_type": "image/png",
-                        "data": b64,
+                        "data": base64.b64encode(part["data"]).decode("ascii"),
                     },
                 })
-            content.append({
-                "type": "text",
-                "text": (
-                    prompt_config.get("user_prompt", "")
-                    + "\n\nThe document is provided as images of its pages."
-                ),
-            })
-
-            response = self.client.messages.create(
-                model=self.model,
-                max_tokens=self.max_tokens,
-                temperature=self.temperature,
-                system=prompt_config.get("system_prompt", ""),
-                messages=[{"role": "user", "content": content}],
-            )
-
-            cost_info = {
-                "prompt_tokens": response.usage.input_tokens,
-                "completion_tokens": response.usage.output_tokens,
-                "total_tokens": response.usage.input_tokens + response.usage.output_tokens,
-            }
-            self.token_costs.append(cost_info)
-
-            suggested_name = response.content[0].text.strip()
-            logging.info(
-                f"Claude suggested filename (from rasterized PDF): {suggested_name}"
-            )
-            return suggested_name, cost_info
-        except Exception as e:
-            logging.error(f"Anthropic rasterized-PDF analysis error: {e}")
-            return None, {}
-
-    def analyze_document(
-        self,
-        document_text: Optional[str] = None,
-        prompt_config: Optional[Dict[str, Any]] = None,
-        pdf_path: Optional[str] = None,
-    ) -> Tuple[Optional[str], Dict[str, Any]]:
-        """Send document text or PDF to Claude for analysis."""
-        try:
-            if prompt_config is None:
-                logging.error("Prompt config is required")
-                return None, {}
-
-            # Prepare message content based on available input
-            if document_text:
-                user_message = f"{prompt_config.get('user_prompt', '')}\n\nDocument content:\n{document_text}"
-                messages = [{"role": "user", "content": user_message}]
-            elif pdf_path:
-                strategy = self.pdf_strategy()
-                if strategy == "inline_base64_document":
-                    pdf_base64 = self._encode_pdf_to_base64(pdf_path)
-                    if not pdf_base64:
-                        return None, {}
-
-                    user_message = f"{prompt_config.get('user_prompt', '')}\n\nPlease analyze this PDF document:"
-                    messages = [
-                        {
-                            "role": "user",
-                            "content": [
-                                {"type": "text", "text": user_message},
-                                {
-                                    "type": "document",
-                                    "source": {
-                                        "type": "base64",
-                                        "media_type": "application/pdf",
-                                        "data": pdf_base64,
-                                    },
-                                },
-                            ],
-                        }
-                    ]
-                elif strategy == "rasterize_to_images":
-                    return self._analyze_via_rasterized_pages(pdf_path, prompt_config)
-                elif strategy == "none":
-                    logging.error(
-                        f"Model {self.model} has pdf_strategy='none'; cannot process PDF. "
-                        f"Use a PDF-capable model or extract text first."
-                    )
-                    return None, {}
-                else:
-                    logging.error(
-                        f"Anthropic client does not implement pdf_strategy='{strategy}' "
-                        f"for model {self.model}."
-                    )
-                    return None, {}
+            elif file_id is not None:
+                blocks.append({
+                    "type": "document",
+                    "source": {"type": "file", "file_id": file_id},
+                })
             else:
-                logging.error("Neither document text nor PDF path provided")
-                return None, {}
-
-            response = self.client.messages.create(
-                model=self.model,
-                max_tokens=self.max_tokens,
-                temperature=self.temperature,
-                system=prompt_config.get("system_prompt", ""),
-                messages=messages,
+                pdf_base64 = self._encode_pdf_to_base64(part["path"])
+                if not pdf_base64:
+                    raise ValueError(f"Could not read PDF {part['path']}")
+                blocks.append({
+                    "type": "document",
+                    "source": {
+                        "type": "base64",
+                        "media_type": "application/pdf",
+                        "data": pdf_base64,
+                    },
+                })
+        return blocks
+
+    def _do_request(
+        self, system_prompt: str, parts: List[Dict[str, Any]]
+    ) -> Tuple[str, Dict[str, Any]]:
+        request = {
+            "model": self.model,
+            "max_tokens": self.max_tokens,
+            "temperature": self.temperature,
+            "system": system_prompt,
+        }
+        pdf_path = next((part["path"] for part in parts if part["type"] == "pdf"), None)
+        # Uploading raw bytes once beats resending base64 only when the file
+        # id can be reused, so the Files API is used with the upload cache.
+        if pdf_path is None or self.upload_cache is None:
+            return self._create_message(
+                messages=[{"role": "user", "content": self._content_blocks(parts)}],
+                **request,
+            )
+        with self._uploaded(
+            pdf_path, lambda: self._upload_file(pdf_path), self._delete_file
+        ) as file_id:
+            return self._create_message(
+                betas=[self.FILES_API_BETA],
+                messages=[
+                    {"role": "user", "content": self._content_blocks(parts, file_id)}
+                ],
+                **request,
             )
 
-            cost_info = {
-                "prompt_tokens": response.usage.input_tokens,
-                "completion_tokens": response.usage.output_tokens,
-                "total_tokens": response.usage.input_tokens
-                + response.usage.output_tokens,
-            }
-            self.token_costs.append(cost_info)
+    def analyze_documents_batch(
+        self, items: List[Dict[str, Any]], prompt_config: Dict[str, Any]
+    ) -> Dict[str, Tuple[Optional[str], Dict[str, Any]]]:
+        """Analyze documents through the Anthropic Message Batches API.
 
-            suggested_name = response.content[0].text.strip()
-            logging.info(f"Claude suggested filename: {suggested_name}")
+        Text items and PDFs sent as inline base64 documents are submitted as
+        one batch (billed at a discount); other PDF strategies fall back to the
+        synchronous per-document path.
+        """
+        inline_pdf = self.pdf_strategy() == "inline_base64_document"
+        batch_items = [
+            item
+            for item in items
+            if item.get("document_text") or (item.get("pdf_path") and inline_pdf)
+        ]
+        batch_keys = {item["key"] for item in batch_items}
+        results = super().analyze_documents_batch(
+            [item for item in items if item["key"] not in batch_keys], prompt_config
+        )
+        if not batch_items:
+            return results
 
-            return suggested_name, cost_info
+        try:
+            batch_requests: List[Dict[str, Any]] = []
+            for item in batch_items:
+                parts = self._build_parts(
+                    item.get("document_text"), prompt_config, item.get("pdf_path")
+                )
+                if parts is None:
+                    continue
+                try:
+                    content = self._content_blocks(parts)
+                except ValueError as e:
+                    logging.error(str(e))
+                    continue
+                batch_requests.append(
+                    {
+                        "custom_id": item["key"],
+                        "params": {
+                            "model": self.model,
+                            "max_tokens": self.max_tokens,
+                            "temperature": self.temperature,
+                            "system": prompt_config.get("system_prompt", ""),
+                            "messages": [{"role": "user", "content": content}],
+                        },
+                    }
+                )
 
+            if batch_requests:
+                batch = self._call_with_retry(
+                    self.client.messages.batches.create, requests=batch_requests
+                )
+                logging.info(
+                    f"Submitted Anthropic batch {batch.id} with {len(batch_requests)} request(s)"
+                )
+                self._wait_for_batch(
+                    lambda: self._call_with_retry(
+                        self.client.messages.batches.retrieve, batch.id
+                    ),
+                    lambda b: b.processing_status == "ended",
+                )
+                for entry in self.client.messages.batches.results(batch.id):
+                    if entry.result.type != "succeeded":
+                        logging.error(
+                            f"Anthropic batch request {entry.custom_id} {entry.result.type}"
+                        )
+                        continue
+                    message = entry.result.message
+                    cost_info = {
+                        "prompt_tokens": message.usage.input_tokens,
+                        "completion_tokens": message.usage.output_tokens,
+                        "total_tokens": message.usage.input_tokens
+                        + message.usage.output_tokens,
+                    }
+                    self._record_cost(cost_info)
+                    suggested_name = message.content[0].text.strip()
+                    logging.info(f"Claude batch suggested filename: {suggested_name}")
+                    results[entry.custom_id] = (suggested_name, cost_info)
         except Exception as e:
-            logging.error(f"Anthropic API error: {e}")
-            return None, {}
+            logging.error(f"Anthropic Message Batches API error: {e}")
+
+        for item in batch_items:
+            results.setdefault(item["key"], (None, {}))
+        return results
 
 
 class OpenAIClient(BaseLLMClient):
     """OpenAI GPT API client."""
 
+    DISPLAY_NAME = "OpenAI"
+    SUPPORTED_PDF_STRATEGIES = frozenset({"files_api_responses", "rasterize_to_images"})
+
     def __init__(
         self,
         config: ConfigManager,
@@ -1278,14 +2307,14 @@ class OpenAIClient(BaseLLMClient):
         max_tokens: Optional[int] = None,
     ):
         super().__init__(config, provider, model, max_tokens)
-        self.api_key = self._get_api_key()
         self._setup_client()
 
     def _setup_client(self) -> None:
         try:
             import openai
 
-            self.client = openai.OpenAI(api_key=self.api_key)
+            # Retries are handled by _call_with_retry; don't compound them.
+            self.client = openai.OpenAI(api_key=self.api_key, max_retries=0)
         except ImportError:
             logging.error(
                 "OpenAI library not installed. Please install with: pip install openai"
@@ -1307,194 +2336,242 @@ class OpenAIClient(BaseLLMClient):
             "total_tokens": getattr(usage, "total_tokens", 0) or 0,
         }
 
-    def _analyze_via_rasterized_pages(
-        self, pdf_path: str, prompt_config: Dict[str, Any]
-    ) -> Tuple[Optional[str], Dict[str, Any]]:
-        """Rasterize PDF pages to PNG and analyze via OpenAI chat/completions image_url."""
-        try:
-            png_pages = self._rasterize_pdf_to_pngs(pdf_path)
-            if not png_pages:
-                logging.error("No pages rasterized from PDF")
-                return None, {}
-
-            content: List[Dict[str, Any]] = [
-                {
-                    "type": "text",
-                    "text": (
-                        prompt_config.get("user_prompt", "")
-                        + "\n\nThe document is provided as images of its pages."
-                    ),
-                }
-            ]
-            for png in png_pages:
-                b64 = base64.b64encode(png).decode("utf-8")
-                content.append({
-                    "type": "image_url",
-                    "image_url": {"url": f"data:image/png;base64,{b64}"},
-                })
+    def _create_chat_completion(self, **kwargs: Any) -> Tuple[str, Dict[str, Any]]:
+        """Call chat completions and return (text, cost_info).
 
-            messages = [
-                {"role": "system", "content": prompt_config.get("system_prompt", "")},
-                {"role": "user", "content": content},
-            ]
+        With `llm.stream` enabled the reply is streamed and closed as soon as
+        the first line of text is complete. Usage arrives in the final chunk,
+        so a stream cut short has its token counts estimated from length.
+        """
+        if not self._streaming_enabled():
+            response = self._call_with_retry(
+                self.client.chat.completions.create, **kwargs
+            )
+            text = response.choices[0].message.content or ""
+            return text, self._extract_usage(response)
 
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=messages,
-                max_tokens=self.max_tokens,
-                temperature=self.temperature,
+        def _stream() -> Tuple[str, Dict[str, Any]]:
+            stream = self.client.chat.completions.create(
+                stream=True, stream_options={"include_usage": True}, **kwargs
             )
+            usage_chunk = None
 
-            cost_info = self._extract_usage(response)
-            self.token_costs.append(cost_info)
+            def _deltas() -> Iterator[str]:
+                nonlocal usage_chunk
+                for chunk in stream:
+                    if getattr(chunk, "usage", None) is not None:
+                        usage_chunk = chunk
+                    if chunk.choices:
+                        yield chunk.choices[0].delta.content or ""
 
-            suggested_name = response.choices[0].message.content.strip()
-            logging.info(
-                f"OpenAI suggested filename (from rasterized PDF): {suggested_name}"
+            try:
+                text, stopped_early = self._read_first_line(_deltas())
+            finally:
+                stream.close()
+            if usage_chunk is not None:
+                return text, self._extract_usage(usage_chunk)
+            if stopped_early:
+                logging.debug("Stopped OpenAI stream after first line")
+            prompt_tokens = sum(
+                self.count_tokens(m["content"])
+                for m in kwargs.get("messages", [])
+                if isinstance(m.get("content"), str)
             )
-            return suggested_name, cost_info
-        except Exception as e:
-            logging.error(f"OpenAI rasterized-PDF analysis error: {e}")
-            return None, {}
+            completion_tokens = max(1, self.count_tokens(text))
+            return text, {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            }
 
-    def _analyze_pdf_via_files_api(
-        self, pdf_path: str, prompt_config: Dict[str, Any]
-    ) -> Tuple[Optional[str], Dict[str, Any]]:
-        """Upload PDF via Files API, then analyze via Responses API input_file."""
-        file_id: Optional[str] = None
-        try:
-            with open(pdf_path, "rb") as fh:
-                uploaded = self.client.files.create(file=fh, purpose="user_data")
-            file_id = getattr(uploaded, "id", None)
-            if not file_id:
-                logging.error("OpenAI Files API returned no file id")
-                return None, {}
-            logging.info(f"OpenAI file uploaded, file_id={file_id}")
+        return self._call_with_retry(_stream)
 
-            system_prompt = prompt_config.get("system_prompt", "")
-            user_prompt = prompt_config.get("user_prompt", "")
-            full_user_text = (
-                f"{user_prompt}\n\nPlease analyze this PDF document:"
-                if user_prompt
-                else "Please analyze this PDF document:"
-            )
+    def _upload_file(self, pdf_path: str) -> str:
+        """Upload a PDF to the OpenAI Files API and return its file id."""
+
+        def _upload() -> Any:
+            # Reopen per attempt so a retry never sends a consumed handle.
+            with open(pdf_path, "rb") as fh:
+                return self.client.files.create(file=fh, purpose="user_data")
 
-            content_blocks: List[Dict[str, Any]] = []
-            if system_prompt:
-                content_blocks.append({"type": "input_text", "text": system_prompt})
-            content_blocks.append({"type": "input_text", "text": full_user_text})
-            content_blocks.append({"type": "input_file", "file_id": file_id})
+        uploaded = self._call_with_retry(_upload)
+        file_id = getattr(uploaded, "id", None)
+        if not file_id:
+            raise RuntimeError("OpenAI Files API returned no file id")
+        logging.info(f"OpenAI file uploaded, file_id={file_id}")
+        return file_id
 
-            response = self.client.responses.create(
+    def _delete_file(self, file_id: str) -> None:
+        try:
+            self.client.files.delete(file_id)
+            logging.debug(f"Deleted OpenAI file {file_id}")
+        except Exception as e:
+            logging.warning(f"Could not delete OpenAI file {file_id}: {e}")
+
+    def _respond_with_file(
+        self, system_prompt: str, parts: List[Dict[str, Any]]
+    ) -> Tuple[str, Dict[str, Any]]:
+        """Upload the PDF part via the Files API, then ask the Responses API."""
+        pdf_path = next(part["path"] for part in parts if part["type"] == "pdf")
+        with self._uploaded(
+            pdf_path, lambda: self._upload_file(pdf_path), self._delete_file
+        ) as file_id:
+            response = self._call_with_retry(
+                self.client.responses.create,
                 model=self.model,
-                input=[{"role": "user", "content": content_blocks}],
+                input=_responses_input(system_prompt, parts, file_id),
                 max_output_tokens=self.max_tokens,
             )
 
-            usage = getattr(response, "usage", None)
-            cost_info = {
-                "prompt_tokens": getattr(usage, "input_tokens", 0) or 0,
-                "completion_tokens": getattr(usage, "output_tokens", 0) or 0,
-                "total_tokens": getattr(usage, "total_tokens", 0) or 0,
-            }
-            if cost_info["total_tokens"] == 0:
-                cost_info["total_tokens"] = (
-                    cost_info["prompt_tokens"] + cost_info["completion_tokens"]
-                )
-            self.token_costs.append(cost_info)
-
-            suggested_name: Optional[str] = getattr(response, "output_text", None)
-            if suggested_name is None:
-                output = getattr(response, "output", None) or []
-                for out_item in output:
-                    content = getattr(out_item, "content", None) or []
-                    for block in content:
-                        text = getattr(block, "text", None)
-                        if text:
-                            suggested_name = str(text)
-                            break
-                    if suggested_name:
-                        break
+        usage = getattr(response, "usage", None)
+        cost_info = {
+            "prompt_tokens": getattr(usage, "input_tokens", 0) or 0,
+            "completion_tokens": getattr(usage, "output_tokens", 0) or 0,
+            "total_tokens": getattr(usage, "total_tokens", 0) or 0,
+        }
+        if cost_info["total_tokens"] == 0:
+            cost_info["total_tokens"] = (
+                cost_info["prompt_tokens"] + cost_info["completion_tokens"]
+            )
 
-            if not suggested_name:
-                logging.error("OpenAI Responses API returned no text")
-                return None, cost_info
+        text: Optional[str] = getattr(response, "output_text", None)
+        if text is None:
+            for out_item in getattr(response, "output", None) or []:
+                for block in getattr(out_item, "content", None) or []:
+                    if getattr(block, "text", None):
+                        return str(block.text), cost_info
+        return text or "", cost_info
+
+    def _do_request(
+        self, system_prompt: str, parts: List[Dict[str, Any]]
+    ) -> Tuple[str, Dict[str, Any]]:
+        if any(part["type"] == "pdf" for part in parts):
+            return self._respond_with_file(system_prompt, parts)
+        return self._create_chat_completion(
+            model=self.model,
+            messages=_chat_messages(system_prompt, parts),
+            max_tokens=self.max_tokens,
+            temperature=self.temperature,
+        )
 
-            suggested_name = suggested_name.strip()
-            logging.info(f"OpenAI suggested filename: {suggested_name}")
-            return suggested_name, cost_info
-        except Exception as e:
-            logging.error(f"OpenAI Files/Responses API error: {e}")
-            return None, {}
-        finally:
-            if file_id:
-                try:
-                    self.client.files.delete(file_id)
-                    logging.debug(f"Deleted OpenAI file {file_id}")
-                except Exception as e:
-                    logging.warning(f"Could not delete OpenAI file {file_id}: {e}")
+    # Endpoint every batch line targets; OpenAI-compatible batch APIs share
+    # the JSONL format below.
+    BATCH_ENDPOINT = "/v1/chat/completions"
 
-    def analyze_document(
-        self,
-        document_text: Optional[str] = None,
-        prompt_config: Optional[Dict[str, Any]] = None,
-        pdf_path: Optional[str] = None,
-    ) -> Tuple[Optional[str], Dict[str, Any]]:
-        """Send document text or PDF to OpenAI for analysis."""
-        try:
-            if prompt_config is None:
-                logging.error("Prompt config is required")
-                return None, {}
+    def _batch_request(
+        self, item: Dict[str, Any], prompt_config: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """One JSONL line of a chat-completions batch for a text item."""
+        parts = self._build_parts(item["document_text"], prompt_config, None)
+        return {
+            "custom_id": item["key"],
+            "method": "POST",
+            "url": self.BATCH_ENDPOINT,
+            "body": {
+                "model": self.model,
+                "messages": _chat_messages(
+                    prompt_config.get("system_prompt", ""), parts or []
+                ),
+                "max_tokens": self.max_tokens,
+                "temperature": self.temperature,
+            },
+        }
 
-            # Prepare message content based on available input
-            if document_text:
-                user_message = f"{prompt_config.get('user_prompt', '')}\n\nDocument content:\n{document_text}"
-                messages = [
-                    {
-                        "role": "system",
-                        "content": prompt_config.get("system_prompt", ""),
-                    },
-                    {"role": "user", "content": user_message},
-                ]
-            elif pdf_path:
-                strategy = self.pdf_strategy()
-                if strategy == "files_api_responses":
-                    return self._analyze_pdf_via_files_api(pdf_path, prompt_config)
-                if strategy == "rasterize_to_images":
-                    return self._analyze_via_rasterized_pages(pdf_path, prompt_config)
-                if strategy == "none":
-                    logging.error(
-                        f"Model {self.model} has pdf_strategy='none'; cannot process PDF. "
-                        f"Use a PDF-capable model or extract text first."
-                    )
-                    return None, {}
+    def _batch_results(
+        self, output: str
+    ) -> Dict[str, Tuple[Optional[str], Dict[str, Any]]]:
+        """Parse a batch output JSONL file into (name, cost_info) by custom_id."""
+        results: Dict[str, Tuple[Optional[str], Dict[str, Any]]] = {}
+        for line in output.splitlines():
+            if not line.strip():
+                continue
+            record = loads_json(line)
+            key = record.get("custom_id")
+            response = record.get("response") or {}
+            if record.get("error") or response.get("status_code") != 200:
                 logging.error(
-                    f"OpenAI client does not implement pdf_strategy='{strategy}' "
-                    f"for model {self.model}."
+                    f"{self.DISPLAY_NAME} batch request {key} failed: "
+                    f"{record.get('error') or response.get('status_code')}"
                 )
-                return None, {}
-            else:
-                logging.error("Neither document text nor PDF path provided")
-                return None, {}
-
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=messages,
-                max_tokens=self.max_tokens,
-                temperature=self.temperature,
+                continue
+            body = response.get("body", {})
+            usage = body.get("usage") or {}
+            cost_info = {
+                "prompt_tokens": usage.get("prompt_tokens", 0) or 0,
+                "completion_tokens": usage.get("completion_tokens", 0) or 0,
+                "total_tokens": usage.get("total_tokens", 0) or 0,
+            }
+            self._record_cost(cost_info)
+            suggested_name = body["choices"][0]["message"]["content"].strip()
+            logging.info(
+                f"{self.DISPLAY_NAME} batch suggested filename: {suggested_name}"
             )
+            results[key] = (suggested_name, cost_info)
+        return results
 
-            cost_info = self._extract_usage(response)
-            self.token_costs.append(cost_info)
+    def analyze_documents_batch(
+        self, items: List[Dict[str, Any]], prompt_config: Dict[str, Any]
+    ) -> Dict[str, Tuple[Optional[str], Dict[str, Any]]]:
+        """Analyze text documents through the OpenAI Batch API.
 
-            suggested_name = response.choices[0].message.content.strip()
-            logging.info(f"OpenAI suggested filename: {suggested_name}")
+        Text items become a JSONL file of chat-completions requests,
+        submitted as a single batch job (billed at a discount); PDF items
+        fall back to the synchronous per-document path.
+        """
+        text_items = [item for item in items if item.get("document_text")]
+        pdf_items = [item for item in items if not item.get("document_text")]
+        results = super().analyze_documents_batch(pdf_items, prompt_config)
+        if not text_items:
+            return results
 
-            return suggested_name, cost_info
+        input_file_id: Optional[str] = None
+        try:
+            jsonl = b"".join(
+                dumps_json(self._batch_request(item, prompt_config)) + b"\n"
+                for item in text_items
+            )
+            uploaded = self._call_with_retry(
+                self.client.files.create,
+                file=("batch.jsonl", jsonl),
+                purpose="batch",
+            )
+            input_file_id = uploaded.id
 
+            batch = self._call_with_retry(
+                self.client.batches.create,
+                input_file_id=input_file_id,
+                endpoint=self.BATCH_ENDPOINT,
+                completion_window="24h",
+            )
+            logging.info(
+                f"Submitted {self.DISPLAY_NAME} batch {batch.id} "
+                f"with {len(text_items)} request(s)"
+            )
+            batch = self._wait_for_batch(
+                lambda: self._call_with_retry(self.client.batches.retrieve, batch.id),
+                lambda b: b.status in ("completed", "failed", "expired", "cancelled"),
+            )
+            if batch.status != "completed" or not batch.output_file_id:
+                logging.error(
+                    f"{self.DISPLAY_NAME} batch {batch.id} ended with status {batch.status}"
+                )
+            else:
+                output = self.client.files.content(batch.output_file_id).text
+                results.update(self._batch_results(output))
         except Exception as e:
-            logging.error(f"OpenAI API error: {e}")
-            return None, {}
+            logging.error(f"{self.DISPLAY_NAME} Batch API error: {e}")
+        finally:
+            if input_file_id:
+                try:
+                    self.client.files.delete(input_file_id)
+                except Exception as e:
+                    logging.warning(
+                        f"Could not delete {self.DISPLAY_NAME} file {input_file_id}: {e}"
+                    )
+
+        for item in text_items:
+            results.setdefault(item["key"], (None, {}))
+        return results
 
 
 class LMStudioClient(OpenAIClient):
@@ -1506,6 +2583,8 @@ class LMStudioClient(OpenAIClient):
     not configured we pass a placeholder string to satisfy the SDK.
     """
 
+    DISPLAY_NAME = "LM Studio"
+
     def _get_api_key(self) -> str:
         """Return the configured API key, or a placeholder if unset.
 
@@ -1513,7 +2592,7 @@ class LMStudioClient(OpenAIClient):
         app-dir file named after ``api_key_env``; if neither is present, return
         a non-empty placeholder so the openai SDK does not refuse to construct.
         """
-        api_key_env = self.config.get(f"llm.providers.{self.provider}.api_key_env")
+        api_key_env = self._provider_cfg.get("api_key_env")
         if isinstance(api_key_env, str):
             api_key = self._resolve_secret(api_key_env)
             if api_key:
@@ -1530,7 +2609,7 @@ class LMStudioClient(OpenAIClient):
             )
             sys.exit(1)
 
-        endpoint = self.config.get(f"llm.providers.{self.provider}.api_endpoint")
+        endpoint = self._provider_cfg.get("api_endpoint")
         if not isinstance(endpoint, str) or not endpoint:
             logging.error(
                 f"Invalid or missing api_endpoint for provider {self.provider}"
@@ -1547,12 +2626,28 @@ class LMStudioClient(OpenAIClient):
             base_url = base_url[: -len(suffix)]
         base_url = base_url.rstrip("/")
 
-        self.client = openai.OpenAI(api_key=self.api_key, base_url=base_url)
+        self.client = openai.OpenAI(
+            api_key=self.api_key, base_url=base_url, max_retries=0
+        )
         logging.info(f"LM Studio client initialized: base_url={base_url}")
 
+    def analyze_documents_batch(
+        self, items: List[Dict[str, Any]], prompt_config: Dict[str, Any]
+    ) -> Dict[str, Tuple[Optional[str], Dict[str, Any]]]:
+        """LM Studio has no batch endpoint; analyze documents one at a time."""
+        return BaseLLMClient.analyze_documents_batch(self, items, prompt_config)
+
 
 class GoogleClient(BaseLLMClient):
-    """Google Vertex AI API client."""
+    """Google Gemini client: the Developer API when an API key is configured,
+    else Vertex AI."""
+
+    DISPLAY_NAME = "Google AI"
+    SUPPORTED_PDF_STRATEGIES = frozenset({"genai_files_upload", "rasterize_to_images"})
+
+    # Vertex AI authenticates with application-default credentials; the key
+    # is optional and only selects the Developer API.
+    REQUIRES_API_KEY = False
 
     def __init__(
         self,
@@ -1562,12 +2657,27 @@ class GoogleClient(BaseLLMClient):
         max_tokens: Optional[int] = None,
     ):
         super().__init__(config, provider, model, max_tokens)
-        self.project_id = self._get_project_id()
-        self.location = config.get(f"llm.providers.{provider}.location", "us-central1")
+        self.api_key = self._developer_api_key()
+        if self.api_key is None:
+            self.project_id = self._get_project_id()
+            self.location = self._provider_cfg.get("location", "us-central1")
+        # Speculative uploads by local PDF path; see prefetch_upload.
+        self._prefetched: Dict[str, Future] = {}
+        self._prefetch_lock = threading.Lock()
         self._setup_client()
 
+    def _developer_api_key(self) -> Optional[str]:
+        """The Gemini Developer API key from ``api_key_env``, if one is set.
+
+        Only the Developer API offers the Files and inline Batch APIs.
+        """
+        api_key_env = self._provider_cfg.get("api_key_env")
+        if not isinstance(api_key_env, str):
+            return None
+        return self._resolve_secret(api_key_env) or None
+
     def _get_project_id(self) -> str:
-        project_env = self.config.get(f"llm.providers.{self.provider}.project_id_env")
+        project_env = self._provider_cfg.get("project_id_env")
         if not isinstance(project_env, str):
             logging.error(f"Invalid project ID environment variable name for {self.provider}")
             sys.exit(1)
@@ -1580,15 +2690,39 @@ class GoogleClient(BaseLLMClient):
             sys.exit(1)
         return project_id
 
+    # Per-request HTTP timeout; the SDK takes milliseconds.
+    HTTP_TIMEOUT_MS = 120_000
+
+    # genai.Client instances keyed by API key or (project, location). Each owns
+    # an httpx connection pool, so sharing them keeps connections warm across
+    # clients.
+    _clients: Dict[Tuple[str, str], Any] = {}
+    _clients_lock = threading.Lock()
+
     def _setup_client(self) -> None:
         try:
             from google import genai
+            from google.genai import types
 
-            # Initialize Google Gen AI client for Vertex AI
-            self.client = genai.Client(
-                project=self.project_id,
-                location=self.location,
-            )
+            if self.api_key:
+                key = ("api_key", self.api_key)
+                options: Dict[str, Any] = {"api_key": self.api_key}
+            else:
+                key = (self.project_id, self.location)
+                options = {
+                    "vertexai": True,
+                    "project": self.project_id,
+                    "location": self.location,
+                }
+            with GoogleClient._clients_lock:
+                client = GoogleClient._clients.get(key)
+                if client is None:
+                    client = genai.Client(
+                        **options,
+                        http_options=types.HttpOptions(timeout=self.HTTP_TIMEOUT_MS),
+                    )
+                    GoogleClient._clients[key] = client
+            self.client = client
 
         except ImportError:
             logging.error(
@@ -1596,146 +2730,306 @@ class GoogleClient(BaseLLMClient):
             )
             sys.exit(1)
 
-    def _analyze_via_rasterized_pages(
-        self, pdf_path: str, prompt_config: Dict[str, Any]
-    ) -> Tuple[Optional[str], Dict[str, Any]]:
-        """Rasterize PDF pages to PNG and analyze via Google Gen AI image parts."""
+    def _has_files_api(self) -> bool:
+        """True for Developer API clients; Vertex AI has no Files API."""
+        return not getattr(self.client, "vertexai", False)
+
+    @functools.cached_property
+    def _prefetch_pool(self) -> ThreadPoolExecutor:
+        return ThreadPoolExecutor(max_workers=2, thread_name_prefix="gemini-upload")
+
+    def prefetch_upload(self, pdf_path: str) -> None:
+        """Upload `pdf_path` in the background while text is extracted.
+
+        Like _upload, this reuses and records uploads in the upload cache.
+        It takes no rate limit token until _upload actually uses the file,
+        so speculative uploads that are discarded don't slow real requests.
+        """
+        if self.pdf_strategy() != "genai_files_upload" or not self._has_files_api():
+            return
+        with self._prefetch_lock:
+            if pdf_path not in self._prefetched:
+                self._prefetched[pdf_path] = self._prefetch_pool.submit(
+                    self._upload_or_reuse, pdf_path, False
+                )
+
+    def discard_prefetch(self, pdf_path: str) -> None:
+        """Cancel or delete the prefetched upload of `pdf_path`.
+
+        Waits for an upload in progress, so the caller may then remove the
+        file without pulling it out from under the upload. With an upload
+        cache the upload is kept, since the cache may hand it out again.
+        """
+        with self._prefetch_lock:
+            future = self._prefetched.pop(pdf_path, None)
+        if future is None or future.cancel():
+            return
+        wait([future])
+        if self.upload_cache is None:
+            self._delete_prefetched(future)
+
+    def _delete_prefetched(self, future: Future) -> None:
+        if future.exception() is not None:
+            return
         try:
-            from google.genai import types
+            self.client.files.delete(name=future.result().name)
+        except Exception as e:
+            # Uploaded files expire after 48 hours anyway.
+            logging.debug(f"Could not delete unused Gemini upload: {e}")
+
+    # Gemini deletes uploaded files after 48 hours; stop reusing them early.
+    UPLOAD_TTL_SECONDS = 47 * 3600
+
+    def _upload(self, pdf_path: str) -> Any:
+        """Return the uploaded file for `pdf_path`, uploading only if needed.
+
+        A prefetched upload is used first; otherwise see _upload_or_reuse.
+        """
+        with self._prefetch_lock:
+            future = self._prefetched.pop(pdf_path, None)
+        if future is not None:
+            try:
+                file = future.result()
+            except Exception as e:
+                logging.warning(f"Speculative upload of {pdf_path} failed: {e}")
+            else:
+                # Charge the upload to the rate limit now that it is used.
+                self._throttle()
+                return file
+        return self._upload_or_reuse(pdf_path, True)
+
+    def _upload_or_reuse(self, pdf_path: str, throttle: bool) -> Any:
+        """Upload `pdf_path`, or reuse an upload of the same content.
+
+        With an upload cache, a still active upload of the same content from
+        an earlier request or run is reused, and new uploads are recorded for
+        the next one. `throttle` is passed on to _retrying_call.
+        """
+        if self.upload_cache is None:
+            return self._retrying_call(
+                self.client.files.upload, (), {"file": pdf_path}, throttle
+            )
+
+        h = NameCache.content_hash(pdf_path=pdf_path)
+        file = self._reusable_upload(h, throttle)
+        if file is not None:
+            logging.info(f"Reusing uploaded file {file.name} for {pdf_path}")
+            return file
+        file = self._retrying_call(
+            self.client.files.upload, (), {"file": pdf_path}, throttle
+        )
+        self.upload_cache.put_upload(h, self.provider, file.name)
+        return file
+
+    def _reusable_upload(self, h: bytes, throttle: bool) -> Any:
+        """The recorded upload of content `h` if Gemini still has it active."""
+        name = self.upload_cache.get_upload(
+            h, self.provider, max_age=self.UPLOAD_TTL_SECONDS
+        )
+        if name is None:
+            return None
+        try:
+            file = self._retrying_call(
+                self.client.files.get, (), {"name": name}, throttle
+            )
+        except Exception as e:
+            logging.debug(f"Recorded Gemini upload {name} is unavailable: {e}")
+            file = None
+        if file is None or self._state_name(file) != "ACTIVE":
+            self.upload_cache.forget_upload(h, self.provider)
+            return None
+        return file
+
+    # Terminal Gemini batch job states.
+    BATCH_DONE_STATES = frozenset({
+        "JOB_STATE_SUCCEEDED",
+        "JOB_STATE_FAILED",
+        "JOB_STATE_CANCELLED",
+        "JOB_STATE_EXPIRED",
+    })
 
-            png_pages = self._rasterize_pdf_to_pngs(pdf_path)
-            if not png_pages:
-                logging.error("No pages rasterized from PDF")
-                return None, {}
+    def _generation_config(self, system_prompt: str) -> Dict[str, Any]:
+        """generate_content config, with the system prompt as system_instruction."""
+        config: Dict[str, Any] = {
+            "max_output_tokens": self.max_tokens,
+            "temperature": self.temperature,
+        }
+        if system_prompt:
+            config["system_instruction"] = system_prompt
+        return config
 
-            system_prompt = prompt_config.get("system_prompt", "")
-            user_prompt = prompt_config.get("user_prompt", "")
-            full_prompt = (
-                f"{system_prompt}\n\n{user_prompt}\n\n"
-                "The document is provided as images of its pages."
-            )
+    def _contents(
+        self, system_prompt: str, parts: List[Dict[str, Any]]
+    ) -> Tuple[List[Any], int]:
+        """Build generate_content contents from parts, uploading any PDF.
+
+        Vertex AI has no Files API, so there PDFs are sent inline instead.
 
-            contents: List[Any] = [full_prompt]
-            for png in png_pages:
+        Returns the contents and a rough prompt-token estimate. The system
+        prompt travels in `_generation_config`, so the (possibly large)
+        document text is passed through without being copied into a new
+        string.
+        """
+        from google.genai import types
+
+        contents: List[Any] = []
+        prompt_tokens = self.count_tokens(system_prompt)
+        images = 0
+        pdfs = 0
+        for part in parts:
+            if part["type"] == "text":
+                prompt_tokens += self.count_tokens(part["text"])
+                contents.append(part["text"])
+            elif part["type"] == "image":
+                images += 1
+                contents.append(
+                    types.Part.from_bytes(data=part["data"], mime_type="image/png")
+                )
+            elif self._has_files_api():
+                pdfs += 1
+                contents.append(self._upload(part["path"]))
+            else:
+                # Vertex AI has no Files API; send the PDF with the request.
+                pdfs += 1
                 contents.append(
-                    types.Part.from_bytes(data=png, mime_type="image/png")
+                    types.Part.from_bytes(
+                        data=Path(part["path"]).read_bytes(),
+                        mime_type="application/pdf",
+                    )
                 )
 
-            response = self.client.models.generate_content(
-                model=self.model,
-                contents=contents,
-                config={
-                    "max_output_tokens": self.max_tokens,
-                    "temperature": self.temperature,
-                },
-            )
+        # Only used when a response lacks usage_metadata: ~1500 tokens per
+        # page image, ~1000 per uploaded PDF.
+        return contents, prompt_tokens + images * 1500 + pdfs * 1000
 
-            estimated_prompt_tokens = (
-                len(full_prompt) // 4 + len(png_pages) * 1500
-            )  # rough estimate: ~1500 tokens per image
-            estimated_completion_tokens = len(response.text) // 4
-            cost_info = {
-                "prompt_tokens": estimated_prompt_tokens,
-                "completion_tokens": estimated_completion_tokens,
-                "total_tokens": estimated_prompt_tokens + estimated_completion_tokens,
-            }
-            self.token_costs.append(cost_info)
+    @staticmethod
+    def _state_name(resource: Any) -> str:
+        """Name of a Gemini batch job's or file's state, enum or plain string."""
+        state = getattr(resource, "state", None)
+        return getattr(state, "name", str(state))
+
+    def _response_cost(
+        self, response: Any, estimated_prompt_tokens: int
+    ) -> Dict[str, int]:
+        """Token usage from the response's usage_metadata.
+
+        Counts the SDK leaves out fall back to estimates. Thinking tokens are
+        billed as output, so they count toward completion_tokens.
+        """
+        usage = getattr(response, "usage_metadata", None)
+        prompt_tokens = getattr(usage, "prompt_token_count", None)
+        if prompt_tokens is None:
+            prompt_tokens = estimated_prompt_tokens
+        completion_tokens = getattr(usage, "candidates_token_count", None)
+        if completion_tokens is None:
+            completion_tokens = self.count_tokens(response.text or "")
+        completion_tokens += getattr(usage, "thoughts_token_count", None) or 0
+        return {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        }
 
-            suggested_name = response.text.strip()
+    def _do_request(
+        self, system_prompt: str, parts: List[Dict[str, Any]]
+    ) -> Tuple[str, Dict[str, Any]]:
+        contents, estimated_prompt_tokens = self._contents(system_prompt, parts)
+        response = self._call_with_retry(
+            self.client.models.generate_content,
+            model=self.model,
+            contents=contents,
+            config=self._generation_config(system_prompt),
+        )
+        return response.text or "", self._response_cost(
+            response, estimated_prompt_tokens
+        )
+
+    def analyze_documents_batch(
+        self, items: List[Dict[str, Any]], prompt_config: Dict[str, Any]
+    ) -> Dict[str, Tuple[Optional[str], Dict[str, Any]]]:
+        """Analyze documents through the Gemini Batch API.
+
+        Text items and PDFs sent via the Files API are submitted inline as
+        one batch job (billed at a discount); rasterized PDFs fall back to
+        the synchronous per-document path. Batch jobs need the Developer API
+        (an API key); Vertex AI only takes batch input from Cloud Storage or
+        BigQuery, so there every item goes through the synchronous path.
+        """
+        if getattr(self.client, "vertexai", False):
             logging.info(
-                f"Google AI suggested filename (from rasterized PDF): {suggested_name}"
+                f"Gemini batch jobs need an API key in {self._provider_cfg.get('api_key_env')}; "
+                "analyzing documents one at a time through Vertex AI"
             )
-            return suggested_name, cost_info
-        except Exception as e:
-            logging.error(f"Google AI rasterized-PDF analysis error: {e}")
-            return None, {}
+            return super().analyze_documents_batch(items, prompt_config)
 
-    def analyze_document(
-        self,
-        document_text: Optional[str] = None,
-        prompt_config: Optional[Dict[str, Any]] = None,
-        pdf_path: Optional[str] = None,
-    ) -> Tuple[Optional[str], Dict[str, Any]]:
-        """Send document text or PDF to Google Gen AI for analysis."""
-        try:
-            if prompt_config is None:
-                logging.error("Prompt config is required")
-                return None, {}
+        upload_pdf = self.pdf_strategy() == "genai_files_upload"
+        batch_items = [
+            item
+            for item in items
+            if item.get("document_text") or (item.get("pdf_path") and upload_pdf)
+        ]
+        batch_keys = {item["key"] for item in batch_items}
+        results = super().analyze_documents_batch(
+            [item for item in items if item["key"] not in batch_keys], prompt_config
+        )
+        if not batch_items:
+            return results
 
-            system_prompt = prompt_config.get("system_prompt", "")
-            user_prompt = prompt_config.get("user_prompt", "")
+        system_prompt = prompt_config.get("system_prompt", "")
+        try:
+            # Inline responses come back in request order.
+            keys: List[str] = []
+            estimates: List[int] = []
+            batch_requests: List[Dict[str, Any]] = []
+            for item in batch_items:
+                parts = self._build_parts(
+                    item.get("document_text"), prompt_config, item.get("pdf_path")
+                )
+                if parts is None:
+                    continue
+                contents, estimate = self._contents(system_prompt, parts)
+                keys.append(item["key"])
+                estimates.append(estimate)
+                batch_requests.append({
+                    "contents": contents,
+                    "config": self._generation_config(system_prompt),
+                })
 
-            # Prepare content based on available input
-            if document_text:
-                full_prompt = f"{system_prompt}\n\n{user_prompt}\n\nDocument content:\n{document_text}"
-                contents = [full_prompt]
-            elif pdf_path:
-                strategy = self.pdf_strategy()
-                if strategy == "genai_files_upload":
-                    try:
-                        uploaded_file = self.client.files.upload(file=pdf_path)
-                        full_prompt = f"{system_prompt}\n\n{user_prompt}\n\nPlease analyze this PDF document:"
-                        contents = [full_prompt, uploaded_file]
-                    except Exception as upload_error:
-                        logging.error(f"Failed to upload PDF: {upload_error}")
-                        return None, {}
-                elif strategy == "rasterize_to_images":
-                    return self._analyze_via_rasterized_pages(pdf_path, prompt_config)
-                elif strategy == "none":
+            if batch_requests:
+                batch = self._call_with_retry(
+                    self.client.batches.create,
+                    model=self.model,
+                    src=batch_requests,
+                    config={"display_name": "scan-namer"},
+                )
+                logging.info(
+                    f"Submitted Gemini batch {batch.name} with {len(batch_requests)} request(s)"
+                )
+                batch = self._wait_for_batch(
+                    lambda: self._call_with_retry(self.client.batches.get, name=batch.name),
+                    lambda b: self._state_name(b) in self.BATCH_DONE_STATES,
+                )
+                if self._state_name(batch) != "JOB_STATE_SUCCEEDED":
                     logging.error(
-                        f"Model {self.model} has pdf_strategy='none'; cannot process PDF. "
-                        f"Use a PDF-capable model or extract text first."
+                        f"Gemini batch {batch.name} ended with state {self._state_name(batch)}"
                     )
-                    return None, {}
                 else:
-                    logging.error(
-                        f"Google client does not implement pdf_strategy='{strategy}' "
-                        f"for model {self.model}."
-                    )
-                    return None, {}
-            else:
-                logging.error("Neither document text nor PDF path provided")
-                return None, {}
-
-            response = self.client.models.generate_content(
-                model=self.model,
-                contents=contents,
-                config={
-                    "max_output_tokens": self.max_tokens,
-                    "temperature": self.temperature,
-                },
-            )
-
-            # Google Gen AI SDK doesn't provide detailed token usage
-            # Approximate token count (rough estimate)
-            if document_text:
-                estimated_prompt_tokens = (
-                    len(
-                        f"{system_prompt}\n\n{user_prompt}\n\nDocument content:\n{document_text}"
-                    )
-                    // 4
-                )
-            else:
-                estimated_prompt_tokens = (
-                    len(f"{system_prompt}\n\n{user_prompt}") // 4 + 1000
-                )  # Estimate for PDF
-            estimated_completion_tokens = len(response.text) // 4
-
-            cost_info = {
-                "prompt_tokens": estimated_prompt_tokens,
-                "completion_tokens": estimated_completion_tokens,
-                "total_tokens": estimated_prompt_tokens + estimated_completion_tokens,
-            }
-            self.token_costs.append(cost_info)
-
-            suggested_name = response.text.strip()
-            logging.info(f"Google AI suggested filename: {suggested_name}")
-
-            return suggested_name, cost_info
-
+                    responses = getattr(batch.dest, "inlined_responses", None) or []
+                    for key, estimate, inlined in zip(keys, estimates, responses):
+                        if inlined.error or inlined.response is None:
+                            logging.error(f"Gemini batch request {key} failed: {inlined.error}")
+                            continue
+                        cost_info = self._response_cost(inlined.response, estimate)
+                        self._record_cost(cost_info)
+                        suggested_name = (inlined.response.text or "").strip()
+                        logging.info(f"Google AI batch suggested filename: {suggested_name}")
+                        results[key] = (suggested_name, cost_info)
         except Exception as e:
-            logging.error(f"Google AI API error: {e}")
-            return None, {}
+            logging.error(f"Gemini Batch API error: {e}")
+
+        for item in batch_items:
+            results.setdefault(item["key"], (None, {}))
+        return results
 
 
 class LLMClientFactory:
@@ -1826,13 +3120,43 @@ class ScanNamer:
         enable_ocr_embedding: bool = False,
         download_dir: Optional[str] = None,
         folder_name: Optional[str] = None,
+        max_workers: Optional[int] = None,
+        batch_mode: bool = False,
+        use_cache: bool = True,
+        config: Optional[ConfigManager] = None,
     ):
-        self.config = ConfigManager(config_file)
+        # A caller that already loaded the configuration can pass it in.
+        self.config = config if config is not None else ConfigManager(config_file)
         self.prompts = PromptManager()
+        self.local_classifier = LocalClassifier(self.prompts.get_local_rules())
         self.dry_run = dry_run
         self.no_ocr = no_ocr
         self.enable_ocr_embedding = enable_ocr_embedding
         self.folder_name = folder_name
+        self.batch_mode = batch_mode
+        # Upload the PDF alongside text extraction so a fallback doesn't wait.
+        self.speculative_upload = self.config.get("llm.speculative_upload") is True
+
+        # Files are processed concurrently: every pipeline stage (download,
+        # LLM call, rename) is I/O-bound. A CLI override wins over config.
+        if max_workers is None:
+            max_workers = self.config.get("processing.max_workers", 4)
+        if not isinstance(max_workers, int) or max_workers < 1:
+            logging.warning(f"Invalid max_workers {max_workers!r}; using 1")
+            max_workers = 1
+        self.max_workers = max_workers
+        # Separately bound in-flight LLM requests to stay under provider RPM.
+        max_llm_requests = self.config.get(
+            "llm.max_concurrent_requests", self.max_workers
+        )
+        if not isinstance(max_llm_requests, int) or max_llm_requests < 1:
+            max_llm_requests = self.max_workers
+        self._llm_slots = threading.BoundedSemaphore(max_llm_requests)
+        # Names suggested this run by cache key, so identical scans cost one
+        # LLM call even with --no-cache; _inflight serializes each key.
+        self._run_names: Dict[Tuple[bytes, str, str, str], str] = {}
+        self._inflight: Dict[Tuple[bytes, str, str, str], threading.Lock] = {}
+        self._inflight_lock = threading.Lock()
 
         if download_dir:
             self.download_dir = os.path.expanduser(download_dir)
@@ -1852,6 +3176,13 @@ class ScanNamer:
         )
         self.pdf_processor = PDFProcessor(self.config)
         self.drive_manager = GoogleDriveManager(self.config)
+        self.name_cache = (
+            NameCache(self.config.get("cache.file", "scan_namer_cache.db"))
+            if use_cache
+            else None
+        )
+        if self.name_cache is not None and self.config.get("cache.reuse_uploads") is True:
+            self.llm_client.upload_cache = self.name_cache
 
         # Validate --no-ocr flag with model capabilities
         if self.no_ocr and not self.llm_client.accepts_pdf():
@@ -1867,6 +3198,12 @@ class ScanNamer:
         """Set up logging configuration."""
         import datetime
 
+        # basicConfig is a no-op once the root logger has handlers (e.g. an
+        # earlier ScanNamer set them up), so don't start another listener.
+        self._log_listener: Optional[logging.handlers.QueueListener] = None
+        if logging.root.handlers:
+            return
+
         log_level = getattr(logging, self.config.get("logging.level", "INFO"))
         log_format = self.config.get(
             "logging.format", "%(asctime)s - %(levelname)s - %(message)s"
@@ -1891,31 +3228,56 @@ class ScanNamer:
         console_handler = logging.StreamHandler(sys.stdout)
         console_handler.setFormatter(formatter)
 
+        # Log calls only enqueue records; a listener thread does the file and
+        # console I/O so workers never wait on it.
+        log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue()
+        self._log_listener = logging.handlers.QueueListener(
+            log_queue, file_handler, console_handler, respect_handler_level=True
+        )
+        self._log_listener.start()
+        atexit.register(self._log_listener.stop)
+
         # Configure root logger
-        logging.basicConfig(level=log_level, handlers=[file_handler, console_handler])
+        logging.basicConfig(
+            level=log_level, handlers=[logging.handlers.QueueHandler(log_queue)]
+        )
 
-    def _is_generic_filename(self, filename: str) -> bool:
-        """Check if filename appears to be generic/auto-generated."""
+    @functools.cached_property
+    def _generic_patterns(self) -> Tuple[str, ...]:
+        """Lowercased GENERIC_FILENAME_PATTERNS, parsed once."""
         # Get patterns from environment variable or use defaults
         patterns_env = os.getenv("GENERIC_FILENAME_PATTERNS")
         if patterns_env:
-            generic_patterns = [pattern.strip() for pattern in patterns_env.split(",")]
-        else:
-            generic_patterns = [
-                "raven_scan",
-                # 'scan_',
-                # 'document_',
-                # 'img_',
-                # 'file_',
-            ]
+            return tuple(
+                pattern.strip().lower()
+                for pattern in patterns_env.split(",")
+                if pattern.strip()
+            )
+        return (
+            "raven_scan",
+            # 'scan_',
+            # 'document_',
+            # 'img_',
+            # 'file_',
+        )
 
-        filename_lower = filename.lower()
-        return any(pattern in filename_lower for pattern in generic_patterns)
+    @functools.cached_property
+    def _max_filename_length(self) -> int:
+        return int(os.getenv("MAX_FILENAME_LENGTH", "100"))
+
+    @functools.cached_property
+    def _generic_re(self) -> re.Pattern:
+        """All generic patterns as one alternation, scanned in a single pass."""
+        if not self._generic_patterns:
+            return re.compile(r"(?!)")  # matches nothing
+        return re.compile("|".join(map(re.escape, self._generic_patterns)))
+
+    def _is_generic_filename(self, filename: str) -> bool:
+        """Check if filename appears to be generic/auto-generated."""
+        return self._generic_re.search(filename.lower()) is not None
 
     def _clean_filename(self, filename: str) -> str:
         """Clean and validate filename from LLM response."""
-        import re
-
         # Remove any quotes or extra whitespace
         filename = filename.strip().strip("\"'")
 
@@ -1924,18 +3286,17 @@ class ScanNamer:
             filename = filename[:-4]
 
         # Replace invalid characters with underscores
-        filename = re.sub(r'[<>:"/\\|?*]', "_", filename)
+        filename = _INVALID_FILENAME_CHARS_RE.sub("_", filename)
 
         # Replace multiple underscores/spaces with single underscore
-        filename = re.sub(r"[_\s]+", "_", filename)
+        filename = _SEPARATOR_RUN_RE.sub("_", filename)
 
         # Remove leading/trailing underscores
         filename = filename.strip("_")
 
         # Limit length to reasonable size
-        max_length = int(os.getenv("MAX_FILENAME_LENGTH", "100"))
-        if len(filename) > max_length:
-            filename = filename[:max_length]
+        if len(filename) > self._max_filename_length:
+            filename = filename[: self._max_filename_length]
 
         # Ensure it's not empty
         if not filename or filename.isspace():
@@ -1958,47 +3319,55 @@ class ScanNamer:
         else:
             logging.info(f"No PDF-capable models configured for {provider}")
 
-    def process_document(self, file_info: Dict[str, Any], temp_dir: str) -> bool:
-        """Process a single document."""
+    def _prepare_document(
+        self, file_info: Dict[str, Any], temp_dir: str
+    ) -> Optional[Dict[str, Any]]:
+        """Download a document and prepare its LLM input.
+
+        Returns a dict with ``document_text`` or ``pdf_path`` (one of them set)
+        plus the ``temp_paths`` actually created, to clean up afterwards, or
+        None on failure.
+        """
         file_id = file_info["id"]
-        original_name = file_info["name"]
         document_text = None  # Initialize variable to avoid scope issues
 
-        logging.info(f"Processing: {original_name}")
-
-        # Check if filename is generic
-        if not self._is_generic_filename(original_name):
-            logging.info(f"Skipping non-generic filename: {original_name}")
-            return True
-
-        # Download the file
-        temp_pdf_path = os.path.join(temp_dir, f"temp_{file_id}.pdf")
-        if not self.drive_manager.download_file(file_id, temp_pdf_path):
-            return False
+        # Download the file into memory; it is only written to temp_pdf_path
+        # if OCR or a full-document upload needs it on disk.
+        temp_pdf_path = f"{temp_dir}/temp_{file_id}.pdf"
+        shortened_pdf_path = f"{temp_dir}/shortened_{file_id}.pdf"
+        pdf_bytes = self.drive_manager.download_bytes(file_id)
+        if pdf_bytes is None:
+            return None
+        prepared: Dict[str, Any] = {
+            "file_info": file_info,
+            "document_text": None,
+            "pdf_path": None,
+            "temp_paths": [],
+        }
 
+        # Parse the PDF once and share the parse across every step below.
+        pdf = PDFContext(temp_pdf_path, pdf_bytes)
         try:
             # Get page count
-            page_count = self.pdf_processor.get_page_count(temp_pdf_path)
+            page_count = self.pdf_processor.get_page_count(pdf)
             logging.info(f"Document has {page_count} pages")
 
             # Check if OCR embedding is enabled and PDF is image-only
-            if self.enable_ocr_embedding and self.pdf_processor.detect_image_only_pdf(
-                temp_pdf_path
-            ):
+            if self.enable_ocr_embedding and self.pdf_processor.detect_image_only_pdf(pdf):
                 logging.info(
                     "Detected image-only PDF, performing OCR to create searchable PDF..."
                 )
 
                 # Perform OCR
-                ocr_results = self.pdf_processor.perform_ocr(temp_pdf_path)
+                ocr_results = self.pdf_processor.perform_ocr(
+                    self._pdf_file(pdf, prepared)
+                )
 
                 if ocr_results:
                     # Create searchable PDF
-                    searchable_pdf_path = os.path.join(
-                        temp_dir, f"searchable_{file_id}.pdf"
-                    )
+                    searchable_pdf_path = f"{temp_dir}/searchable_{file_id}.pdf"
                     if self.pdf_processor.create_searchable_pdf(
-                        temp_pdf_path, ocr_results, searchable_pdf_path
+                        pdf, ocr_results, searchable_pdf_path
                     ):
                         # Upload the searchable PDF back to Google Drive
                         if not self.dry_run:
@@ -2018,8 +3387,7 @@ class ScanNamer:
                             )
 
                         # Clean up the searchable PDF
-                        if os.path.exists(searchable_pdf_path):
-                            os.unlink(searchable_pdf_path)
+                        Path(searchable_pdf_path).unlink(missing_ok=True)
 
                         # Use OCR text for document analysis
                         document_text = "\n\n".join(
@@ -2042,19 +3410,26 @@ class ScanNamer:
             pdf_path_for_upload = None
 
             if not use_pdf_upload:
+                if self.speculative_upload and self.llm_client.accepts_pdf():
+                    # Start the fallback upload now so it overlaps extraction.
+                    pdf_path_for_upload = self._pdf_for_upload(
+                        pdf, page_count, prepared, shortened_pdf_path
+                    )
+                    self.llm_client.prefetch_upload(pdf_path_for_upload)
+
                 # Try to extract text from PDF for LLM analysis
                 if self.pdf_processor.should_extract(page_count):
                     logging.info(
                         f"Document has {page_count} pages, extracting text from first {self.pdf_processor.extraction_pages}"
                     )
                     document_text = self.pdf_processor.extract_text(
-                        temp_pdf_path, self.pdf_processor.extraction_pages
+                        pdf, self.pdf_processor.extraction_pages
                     )
                 else:
                     logging.info(
                         f"Document has {page_count} pages, extracting all text"
                     )
-                    document_text = self.pdf_processor.extract_text(temp_pdf_path)
+                    document_text = self.pdf_processor.extract_text(pdf)
 
                 # Check if text extraction failed
                 if not document_text.strip():
@@ -2063,105 +3438,544 @@ class ScanNamer:
                     )
                     use_pdf_upload = True
                     document_text = None
+                elif pdf_path_for_upload:
+                    self.llm_client.discard_prefetch(pdf_path_for_upload)
+                    pdf_path_for_upload = None
 
-            if use_pdf_upload:
-                # Prepare PDF for upload (use shortened version if applicable)
-                if self.pdf_processor.should_extract(page_count):
-                    # Create a shortened PDF for upload
-                    shortened_pdf_path = os.path.join(
-                        temp_dir, f"shortened_{file_id}.pdf"
-                    )
-                    if self.pdf_processor.extract_pages(
-                        temp_pdf_path,
-                        shortened_pdf_path,
-                        self.pdf_processor.extraction_pages,
-                    ):
-                        pdf_path_for_upload = shortened_pdf_path
-                        logging.info(
-                            f"Using shortened PDF ({self.pdf_processor.extraction_pages} pages) for upload"
-                        )
-                    else:
-                        pdf_path_for_upload = temp_pdf_path
-                        logging.warning(
-                            "Failed to create shortened PDF, using full document"
-                        )
-                else:
-                    pdf_path_for_upload = temp_pdf_path
-                    logging.info("Using full PDF for upload")
-
-            # Analyze with LLM
-            prompt_config = self.prompts.get_prompt("document_naming")
-            if document_text:  # type: ignore
-                logging.info("Analyzing document using extracted text")
-                suggested_name, cost_info = self.llm_client.analyze_document(
-                    document_text=document_text, prompt_config=prompt_config
-                )
-            elif pdf_path_for_upload:
-                logging.info("Analyzing document using PDF upload")
-                suggested_name, cost_info = self.llm_client.analyze_document(
-                    pdf_path=pdf_path_for_upload, prompt_config=prompt_config
+            if use_pdf_upload and not pdf_path_for_upload:
+                pdf_path_for_upload = self._pdf_for_upload(
+                    pdf, page_count, prepared, shortened_pdf_path
                 )
-            else:
+
+            if not document_text and not pdf_path_for_upload:
                 logging.error("No document content available for analysis")
-                return False
+                self._cleanup_prepared(prepared)
+                return None
 
-            if not suggested_name:
-                logging.error("Failed to get filename suggestion from LLM")
-                return False
+            if document_text:
+                document_text = self.llm_client.fit_input_budget(document_text)
+            prepared["document_text"] = document_text or None
+            prepared["pdf_path"] = pdf_path_for_upload
+            return prepared
+        except Exception:
+            self._cleanup_prepared(prepared)
+            raise
+        finally:
+            pdf.close()
 
-            # Clean and validate the suggested filename
-            suggested_name = self._clean_filename(suggested_name)
-            if not suggested_name:
-                logging.error("LLM returned invalid filename")
-                return False
+    def _pdf_for_upload(
+        self,
+        pdf: PDFContext,
+        page_count: int,
+        prepared: Dict[str, Any],
+        shortened_pdf_path: str,
+    ) -> str:
+        """Path of the PDF to upload: the first pages of a long document."""
+        if not self.pdf_processor.should_extract(page_count):
+            logging.info("Using full PDF for upload")
+            return self._pdf_file(pdf, prepared)
+        # Create a shortened PDF for upload
+        if self.pdf_processor.extract_pages(
+            pdf, shortened_pdf_path, self.pdf_processor.extraction_pages
+        ):
+            prepared["temp_paths"].append(shortened_pdf_path)
+            logging.info(
+                f"Using shortened PDF ({self.pdf_processor.extraction_pages} pages) for upload"
+            )
+            return shortened_pdf_path
+        logging.warning("Failed to create shortened PDF, using full document")
+        return self._pdf_file(pdf, prepared)
+
+    @staticmethod
+    def _pdf_file(pdf: PDFContext, prepared: Dict[str, Any]) -> str:
+        """Path of the downloaded PDF on disk, writing it there on first use."""
+        if not pdf.on_disk:
+            prepared["temp_paths"].append(pdf.path)
+        return pdf.ensure_file()
+
+    def _cleanup_prepared(self, prepared: Dict[str, Any]) -> None:
+        """Remove temporary files created while preparing a document."""
+        for path in prepared["temp_paths"]:
+            # An unused speculative upload of this file is no longer needed.
+            self.llm_client.discard_prefetch(path)
+            Path(path).unlink(missing_ok=True)
+
+    def _final_filename(
+        self, suggested_name: Optional[str], cost_info: Dict[str, Any]
+    ) -> Optional[str]:
+        """Turn the LLM's suggestion into a clean .pdf filename.
+
+        Logs the request's token usage. Returns None if the suggestion is
+        missing or cleans down to nothing.
+        """
+        if not suggested_name:
+            logging.error("Failed to get filename suggestion from LLM")
+            return None
 
-            # Ensure the filename has .pdf extension
-            if not suggested_name.lower().endswith(".pdf"):
-                suggested_name += ".pdf"
+        # Clean and validate the suggested filename
+        suggested_name = self._valid_filename(suggested_name)
+        if not suggested_name:
+            logging.error("LLM returned invalid filename")
+            return None
 
-            # Log token costs
-            logging.info(
-                f"Token usage - Prompt: {cost_info.get('prompt_tokens', 0)}, "
-                f"Completion: {cost_info.get('completion_tokens', 0)}, "
-                f"Total: {cost_info.get('total_tokens', 0)}"
+        # Log token costs
+        logging.info(
+            f"Token usage - Prompt: {cost_info.get('prompt_tokens', 0)}, "
+            f"Completion: {cost_info.get('completion_tokens', 0)}, "
+            f"Total: {cost_info.get('total_tokens', 0)}"
+        )
+        return suggested_name
+
+    def _valid_filename(self, suggested_name: Optional[str]) -> Optional[str]:
+        """The cleaned .pdf filename for a suggestion, or None if it is unusable."""
+        if not suggested_name:
+            return None
+        suggested_name = self._clean_filename(suggested_name)
+        if not suggested_name:
+            return None
+
+        # Ensure the filename has .pdf extension
+        if not suggested_name.lower().endswith(".pdf"):
+            suggested_name += ".pdf"
+        return suggested_name
+
+    def _report_dry_run(self, original_name: str, new_name: str) -> None:
+        """Print the rename that would happen outside dry-run mode."""
+        print("DRY RUN - Would rename:")
+        print(f"  From: {original_name}")
+        print(f"  To:   {new_name}")
+        if self.download_dir:
+            local_path = os.path.join(self.download_dir, new_name)
+            print(f"  Download to: {local_path}")
+
+    def _after_rename(self, file_id: str, original_name: str, new_name: str) -> None:
+        """Log a successful rename and download the file if requested."""
+        logging.info(f"Successfully renamed: {original_name} -> {new_name}")
+        if self.download_dir:
+            local_path = os.path.join(self.download_dir, new_name)
+            if self.drive_manager.download_file(file_id, local_path):
+                logging.info(f"Downloaded to: {local_path}")
+            else:
+                logging.warning(f"Failed to download {new_name} to {local_path}")
+
+    def _rename_document(self, file_info: Dict[str, Any], new_name: str) -> bool:
+        """Apply a validated filename in Google Drive."""
+        if self.drive_manager.rename_file(file_info["id"], new_name):
+            self._after_rename(file_info["id"], file_info["name"], new_name)
+            return True
+
+        logging.error(f"Failed to rename file: {file_info['name']}")
+        return False
+
+    def _rename_documents(
+        self, renames: List[Tuple[Dict[str, Any], str]]
+    ) -> Tuple[int, int]:
+        """Apply validated filenames with batched Drive requests.
+
+        Returns a (renamed, failed) tuple.
+        """
+        outcomes = self.drive_manager.rename_files_batch(
+            [(file_info["id"], new_name) for file_info, new_name in renames]
+        )
+        renamed = 0
+        failed = 0
+        for file_info, new_name in renames:
+            if outcomes.get(file_info["id"]):
+                self._after_rename(file_info["id"], file_info["name"], new_name)
+                renamed += 1
+            else:
+                logging.error(f"Failed to rename file: {file_info['name']}")
+                failed += 1
+        return renamed, failed
+
+    def _classify_locally(self, prepared: Dict[str, Any]) -> Optional[str]:
+        """Name a document from a local rule if its text matches one."""
+        if not prepared["document_text"]:
+            return None
+        name = self.local_classifier.classify(prepared["document_text"])
+        if name:
+            logging.info(f"Named by local rule, skipping LLM: {name}")
+        return name
+
+    def _cache_key(
+        self, prepared: Dict[str, Any], prompt_config: Dict[str, Any]
+    ) -> Tuple[bytes, str, str, str]:
+        """The NameCache key for a prepared document (content, model, prompt)."""
+        if "cache_key" not in prepared:
+            prepared["cache_key"] = (
+                NameCache.content_hash(
+                    prepared["document_text"], prepared["pdf_path"]
+                ),
+                self.llm_client.provider,
+                self.llm_client.model,
+                NameCache.prompt_version(prompt_config),
             )
+        return prepared["cache_key"]
+
+    def _cached_name(
+        self, prepared: Dict[str, Any], prompt_config: Dict[str, Any]
+    ) -> Optional[str]:
+        """Return a name suggested for identical input earlier or on a prior run."""
+        key = self._cache_key(prepared, prompt_config)
+        name = self._run_names.get(key)
+        if name:
+            logging.info(f"Reusing suggestion for an identical document: {name}")
+            return name
+        if self.name_cache is None:
+            return None
+        name = self.name_cache.get(*key)
+        if name:
+            logging.info(f"Using cached filename suggestion: {name}")
+        return name
+
+    def _store_name(
+        self,
+        prepared: Dict[str, Any],
+        prompt_config: Dict[str, Any],
+        suggested_name: Optional[str],
+        cost_info: Dict[str, Any],
+    ) -> None:
+        """Remember the final filename for a suggestion that validates.
 
+        Unusable suggestions are not stored, so the next identical document
+        asks the LLM again instead of failing the same way.
+        """
+        new_name = self._valid_filename(suggested_name)
+        if not new_name:
+            return
+        key = self._cache_key(prepared, prompt_config)
+        self._run_names[key] = new_name
+        if self.name_cache is not None:
+            self.name_cache.put(*key, new_name, cost_info)
+
+    @contextlib.contextmanager
+    def _single_flight(self, key: Tuple[bytes, str, str, str]) -> Iterator[None]:
+        """Hold the lock for one cache key so duplicates wait, then hit the cache."""
+        with self._inflight_lock:
+            lock = self._inflight.setdefault(key, threading.Lock())
+        with lock:
+            yield
+
+    def _analyze(
+        self, prepared: Dict[str, Any], prompt_config: Dict[str, Any]
+    ) -> Tuple[Optional[str], Dict[str, Any]]:
+        """Get a filename suggestion from the cache, else from the LLM.
+
+        Identical documents processed concurrently are analyzed once; the
+        others wait for that answer. Only a suggestion that validates is
+        shared, so after an unusable one the next waiter asks the LLM itself.
+        """
+        with self._single_flight(self._cache_key(prepared, prompt_config)):
+            cached = self._cached_name(prepared, prompt_config)
+            if cached:
+                return cached, {}
+
+            if prepared["document_text"]:
+                logging.info("Analyzing document using extracted text")
+                with self._llm_slots:
+                    suggested_name, cost_info = self.llm_client.analyze_document(
+                        document_text=prepared["document_text"],
+                        prompt_config=prompt_config,
+                    )
+            else:
+                logging.info("Analyzing document using PDF upload")
+                with self._llm_slots:
+                    suggested_name, cost_info = self.llm_client.analyze_document(
+                        pdf_path=prepared["pdf_path"], prompt_config=prompt_config
+                    )
+
+            self._store_name(prepared, prompt_config, suggested_name, cost_info)
+            return suggested_name, cost_info
+
+    def _name_document(
+        self, file_info: Dict[str, Any], temp_dir: str
+    ) -> Union[bool, str]:
+        """Run every step of process_document except the Drive rename.
+
+        Callers pass only files whose names passed `_is_generic_filename`.
+        Returns the validated new filename if a rename is still due;
+        otherwise True or False once the document is done (reported in
+        dry-run, or failed).
+        """
+        original_name = file_info["name"]
+
+        logging.info(f"Processing: {original_name}")
+
+        prepared = self._prepare_document(file_info, temp_dir)
+        if prepared is None:
+            return False
+
+        try:
+            # Templated documents matching a local rule need no LLM call
+            local_name = self._classify_locally(prepared)
+            prompt_config = self.prompts.get_prompt("document_naming")
+            if local_name:
+                suggested_name, cost_info = local_name, {}
+            else:
+                suggested_name, cost_info = self._analyze(prepared, prompt_config)
+
+            new_name = self._final_filename(suggested_name, cost_info)
+            if not new_name:
+                return False
             if self.dry_run:
-                print("DRY RUN - Would rename:")
-                print(f"  From: {original_name}")
-                print(f"  To:   {suggested_name}")
-                if self.download_dir:
-                    local_path = os.path.join(self.download_dir, suggested_name)
-                    print(f"  Download to: {local_path}")
+                self._report_dry_run(original_name, new_name)
                 return True
-            else:
-                # Rename the file
-                if self.drive_manager.rename_file(file_id, suggested_name):
-                    logging.info(
-                        f"Successfully renamed: {original_name} -> {suggested_name}"
+            return new_name
+
+        finally:
+            # Clean up temp files
+            self._cleanup_prepared(prepared)
+
+    def process_document(self, file_info: Dict[str, Any], temp_dir: str) -> bool:
+        """Process a single document with a generic filename."""
+        outcome = self._name_document(file_info, temp_dir)
+        if isinstance(outcome, bool):
+            return outcome
+        return self._rename_document(file_info, outcome)
+
+    # Drive writes are paced by the write limiter, so a couple of rename
+    # threads keep up with any number of naming workers.
+    RENAME_WORKERS = 2
+
+    # Suggested names are sent as one Drive batch request once this many
+    # are waiting, or once the oldest has waited RENAME_FLUSH_SECONDS.
+    RENAME_BATCH_SIZE = 10
+    RENAME_FLUSH_SECONDS = 2.0
+
+    def _process_concurrently(
+        self, eligible_files: List[Dict[str, Any]], temp_dir: str
+    ) -> Tuple[int, int]:
+        """Name files on a bounded thread pool and rename them on another.
+
+        Handing renames to their own pool lets a naming worker start its next
+        download as soon as the LLM answers, instead of waiting on Drive.
+        Names are queued and sent to Drive as batch requests of up to
+        RENAME_BATCH_SIZE, flushed early after RENAME_FLUSH_SECONDS, so Drive
+        sees a few batch requests rather than one per file. Queued names are
+        still applied if naming is interrupted.
+        Returns a (processed, failed) tuple.
+        """
+        processed = 0
+        failed = 0
+
+        workers = min(self.max_workers, len(eligible_files))
+        logging.info(f"Processing with {workers} worker(s)")
+        with ThreadPoolExecutor(max_workers=workers) as executor, ThreadPoolExecutor(
+            max_workers=self.RENAME_WORKERS
+        ) as renamer:
+            futures = {
+                executor.submit(self._name_document, file_info, temp_dir): file_info
+                for file_info in eligible_files
+            }
+            renames: Dict[Any, List[Tuple[Dict[str, Any], str]]] = {}
+            pending: List[Tuple[Dict[str, Any], str]] = []
+            pending_since = 0.0
+
+            def flush() -> None:
+                nonlocal pending
+                if pending:
+                    renames[renamer.submit(self._rename_documents, pending)] = pending
+                    pending = []
+
+            remaining = set(futures)
+            try:
+                while remaining:
+                    done, remaining = wait(
+                        remaining,
+                        timeout=self.RENAME_FLUSH_SECONDS,
+                        return_when=FIRST_COMPLETED,
                     )
-                    # Download the renamed file if requested
-                    if self.download_dir:
-                        local_path = os.path.join(self.download_dir, suggested_name)
-                        if self.drive_manager.download_file(file_id, local_path):
-                            logging.info(f"Downloaded to: {local_path}")
-                        else:
-                            logging.warning(
-                                f"Failed to download {suggested_name} to {local_path}"
+                    for future in done:
+                        file_info = futures[future]
+                        try:
+                            outcome = future.result()
+                        except Exception as e:
+                            logging.error(
+                                f"Unexpected error processing {file_info['name']}: {e}"
                             )
-                    return True
+                            failed += 1
+                            continue
+                        if isinstance(outcome, str):
+                            if not pending:
+                                pending_since = time.monotonic()
+                            pending.append((file_info, outcome))
+                            if len(pending) >= self.RENAME_BATCH_SIZE:
+                                flush()
+                        elif outcome:
+                            processed += 1
+                        else:
+                            failed += 1
+                    if (
+                        pending
+                        and time.monotonic() - pending_since >= self.RENAME_FLUSH_SECONDS
+                    ):
+                        flush()
+            except KeyboardInterrupt:
+                # Drop queued files; in-flight ones and queued renames finish
+                # on exit.
+                for future in futures:
+                    future.cancel()
+                raise
+            finally:
+                flush()
+
+            for future in as_completed(renames):
+                try:
+                    renamed, not_renamed = future.result()
+                except Exception as e:
+                    logging.error(f"Unexpected error renaming files: {e}")
+                    renamed, not_renamed = 0, len(renames[future])
+                processed += renamed
+                failed += not_renamed
+
+        return processed, failed
+
+    # Assumed input size of a PDF submitted without extracted text.
+    PDF_TOKEN_ESTIMATE = 1000
+
+    def _split_batch(
+        self, items: List[Dict[str, Any]], prompt_config: Dict[str, Any]
+    ) -> List[List[Dict[str, Any]]]:
+        """Split batch items into jobs under `llm.batch_max_input_tokens`.
+
+        Unset or <= 0 keeps everything in one job. A single item larger
+        than the limit still gets a job of its own.
+        """
+        limit = self.config.get("llm.batch_max_input_tokens", 0)
+        if not isinstance(limit, int) or limit <= 0 or not items:
+            return [items]
+
+        prompt_tokens = self.llm_client.count_tokens(
+            prompt_config.get("system_prompt", "")
+            + prompt_config.get("user_prompt", "")
+        )
+        estimates = [
+            self.llm_client.count_tokens(item["document_text"])
+            if item.get("document_text")
+            else self.PDF_TOKEN_ESTIMATE
+            for item in items
+        ]
+        logging.info(
+            f"Estimated {sum(estimates) + prompt_tokens * len(items)} input tokens "
+            f"for {len(items)} batch document(s)"
+        )
+
+        jobs: List[List[Dict[str, Any]]] = []
+        current: List[Dict[str, Any]] = []
+        current_tokens = 0
+        for item, tokens in zip(items, estimates):
+            tokens += prompt_tokens
+            if current and current_tokens + tokens > limit:
+                jobs.append(current)
+                current = []
+                current_tokens = 0
+            current.append(item)
+            current_tokens += tokens
+        jobs.append(current)
+        return jobs
+
+    def _process_batch(
+        self, eligible_files: List[Dict[str, Any]], temp_dir: str
+    ) -> Tuple[int, int]:
+        """Prepare every file, submit them as one provider batch, then rename.
+
+        Returns a (processed, failed) tuple.
+        """
+        processed = 0
+        failed = 0
+        prepared_docs: List[Dict[str, Any]] = []
+
+        # Downloads and text extraction still overlap across files.
+        workers = min(self.max_workers, len(eligible_files))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(self._prepare_document, file_info, temp_dir): file_info
+                for file_info in eligible_files
+            }
+            for future in as_completed(futures):
+                file_info = futures[future]
+                try:
+                    prepared = future.result()
+                except Exception as e:
+                    logging.error(f"Unexpected error preparing {file_info['name']}: {e}")
+                    prepared = None
+                if prepared is None:
+                    failed += 1
+                else:
+                    prepared_docs.append(prepared)
+
+        if not prepared_docs:
+            return processed, failed
+
+        try:
+            prompt_config = self.prompts.get_prompt("document_naming")
+            results: Dict[str, Tuple[Optional[str], Dict[str, Any]]] = {}
+            items = []
+            submitted: List[Dict[str, Any]] = []
+            # Identical documents are submitted once; copies share the answer.
+            first_by_key: Dict[Tuple[bytes, str, str, str], str] = {}
+            duplicates: List[Tuple[str, str]] = []
+            for prepared in prepared_docs:
+                known_name = self._classify_locally(prepared) or self._cached_name(
+                    prepared, prompt_config
+                )
+                if known_name:
+                    results[prepared["file_info"]["id"]] = (known_name, {})
+                    continue
+                key = self._cache_key(prepared, prompt_config)
+                if key in first_by_key:
+                    duplicates.append((prepared["file_info"]["id"], first_by_key[key]))
+                    continue
+                first_by_key[key] = prepared["file_info"]["id"]
+                submitted.append(prepared)
+                items.append(
+                    {
+                        "key": prepared["file_info"]["id"],
+                        "document_text": prepared["document_text"],
+                        "pdf_path": prepared["pdf_path"],
+                    }
+                )
+            if items:
+                # Jobs run one after another: providers cap the tokens
+                # enqueued across all pending batches, not just per job.
+                for job in self._split_batch(items, prompt_config):
+                    logging.info(f"Submitting {len(job)} document(s) in batch mode")
+                    results.update(
+                        self.llm_client.analyze_documents_batch(job, prompt_config)
+                    )
+                for prepared in submitted:
+                    self._store_name(
+                        prepared,
+                        prompt_config,
+                        *results.get(prepared["file_info"]["id"], (None, {})),
+                    )
+                for file_id, original_id in duplicates:
+                    results[file_id] = (results.get(original_id, (None, {}))[0], {})
+
+            # Validate every suggestion, then apply the renames together.
+            renames: List[Tuple[Dict[str, Any], str]] = []
+            for prepared in prepared_docs:
+                file_info = prepared["file_info"]
+                suggested_name, cost_info = results.get(file_info["id"], (None, {}))
+                logging.info(f"Processing: {file_info['name']}")
+                new_name = self._final_filename(suggested_name, cost_info)
+                if not new_name:
+                    failed += 1
+                elif self.dry_run:
+                    self._report_dry_run(file_info["name"], new_name)
+                    processed += 1
                 else:
-                    logging.error(f"Failed to rename file: {original_name}")
-                    return False
+                    renames.append((file_info, new_name))
 
+            if renames:
+                renamed, not_renamed = self._rename_documents(renames)
+                processed += renamed
+                failed += not_renamed
         finally:
-            # Clean up temp files
-            if os.path.exists(temp_pdf_path):
-                os.unlink(temp_pdf_path)
-            # Clean up shortened PDF if it was created
-            shortened_pdf_path = os.path.join(temp_dir, f"shortened_{file_id}.pdf")
-            if os.path.exists(shortened_pdf_path):
-                os.unlink(shortened_pdf_path)
+            for prepared in prepared_docs:
+                self._cleanup_prepared(prepared)
+
+        return processed, failed
 
     def run(self) -> None:
         """Main execution method."""
@@ -2216,22 +4030,16 @@ class ScanNamer:
             if self.dry_run:
                 eligible_files = eligible_files[:1]
 
-            # Process files
+            # Process files concurrently; each worker downloads, extracts and
+            # analyzes one file, then hands its rename to a rename pool.
+            # Batch mode instead submits every document as one provider job.
             with tempfile.TemporaryDirectory() as temp_dir:
-                processed = 0
-                failed = 0
-
-                for file_info in eligible_files:
-                    try:
-                        if self.process_document(file_info, temp_dir):
-                            processed += 1
-                        else:
-                            failed += 1
-                    except Exception as e:
-                        logging.error(
-                            f"Unexpected error processing {file_info['name']}: {e}"
-                        )
-                        failed += 1
+                if self.batch_mode:
+                    processed, failed = self._process_batch(eligible_files, temp_dir)
+                else:
+                    processed, failed = self._process_concurrently(
+                        eligible_files, temp_dir
+                    )
 
                 # Summary
                 total_costs = self.llm_client.get_total_costs()
@@ -2249,6 +4057,15 @@ class ScanNamer:
         except Exception as e:
             logging.error(f"Unexpected error: {e}")
             raise
+        finally:
+            if self.name_cache is not None:
+                self.name_cache.close()
+
+
+@functools.lru_cache(maxsize=4)
+def _load_config(config_file: str) -> ConfigManager:
+    """Load a config file once per process, however many commands use it."""
+    return ConfigManager(config_file)
 
 
 def main() -> None:
@@ -2318,13 +4135,29 @@ def main() -> None:
         help="Google Drive folder name to use (overrides config google_drive.folder_name); skips the menu when uniquely matched",
         metavar="NAME",
     )
+    parser.add_argument(
+        "--batch-mode",
+        action="store_true",
+        help="Submit all documents as one provider batch job (cheaper, but may take hours; OpenAI, Anthropic and Gemini with an API key)",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Ignore cached filename suggestions from previous runs and don't record new ones",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="Number of files to process concurrently (overrides config processing.max_workers)",
+        metavar="N",
+    )
 
     args = parser.parse_args()
 
     # Handle list-providers command
     if args.list_providers:
         try:
-            config = ConfigManager(args.config)
+            config = _load_config(args.config)
             providers = config.get("llm.providers", {})
             current_provider = config.get("llm.provider")
 
@@ -2343,7 +4176,7 @@ def main() -> None:
     # Handle list-models command
     if args.list_models:
         try:
-            config = ConfigManager(args.config)
+            config = _load_config(args.config)
             providers = config.get("llm.providers", {})
             current_provider = config.get("llm.provider")
             current_model = config.get("llm.model")
@@ -2386,7 +4219,7 @@ def main() -> None:
 
     try:
         app = ScanNamer(
-            config_file=args.config,
+            config=_load_config(args.config),
             dry_run=args.dry_run,
             model=args.model,
             provider=args.provider,
@@ -2395,6 +4228,9 @@ def main() -> None:
             enable_ocr_embedding=args.enable_ocr_embedding,
             download_dir=args.download,
             folder_name=args.folder,
+            max_workers=args.workers,
+            batch_mode=args.batch_mode,
+            use_cache=not args.no_cache,
         )
         app.run()
     except KeyboardInterrupt:
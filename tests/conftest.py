@@ -72,10 +72,13 @@ def _isolate_env(monkeypatch):
         "LLM_MODEL",
         "LLM_MAX_TOKENS",
         "LLM_TEMPERATURE",
+        "LLM_MAX_INPUT_TOKENS",
         "MAX_FILENAME_LENGTH",
         "GENERIC_FILENAME_PATTERNS",
         "PDF_MAX_PAGES_BEFORE_EXTRACTION",
         "PDF_EXTRACTION_PAGES",
+        "GOOGLE_DRIVE_DOWNLOAD_CHUNK_SIZE",
+        "SCAN_NAMER_CONCURRENCY",
     ]:
         monkeypatch.delenv(var, raising=False)
 
@@ -0,0 +1,99 @@
+import threading
+
+import scan_namer
+
+
+PROMPTS = {"system_prompt": "Be terse.", "user_prompt": "Name this."}
+
+
+def _client(cls, config, strategy="none"):
+    client = object.__new__(cls)
+    client.config = config
+    client.provider = "openai"
+    client.model = "gpt-test"
+    client.token_costs = []
+    client._costs_lock = threading.Lock()
+    client._pdf_strategy = strategy
+    return client
+
+
+def _no_request(system_prompt, parts):
+    raise AssertionError("no request expected")
+
+
+def test_text_document_is_sent_and_cost_recorded(config):
+    client = _client(scan_namer.OpenAIClient, config)
+    sent = []
+
+    def do_request(system_prompt, parts):
+        sent.append((system_prompt, parts))
+        return "  Acme-Invoice-2025\n", {"prompt_tokens": 9, "completion_tokens": 3, "total_tokens": 12}
+
+    client._do_request = do_request
+    name, cost = client.analyze_document(document_text="Invoice #1", prompt_config=PROMPTS)
+    assert name == "Acme-Invoice-2025"
+    assert sent == [
+        ("Be terse.", [{"type": "text", "text": "Name this.\n\nDocument content:\nInvoice #1"}])
+    ]
+    assert client.get_total_costs()["total_tokens"] == 12
+
+
+def test_pdf_with_strategy_none_makes_no_request(config):
+    client = _client(scan_namer.AnthropicClient, config)
+    client._do_request = _no_request
+    assert client.analyze_document(pdf_path="scan.pdf", prompt_config=PROMPTS) == (None, {})
+
+
+def test_pdf_strategy_unsupported_by_client_is_rejected(config):
+    client = _client(scan_namer.AnthropicClient, config, strategy="genai_files_upload")
+    client._do_request = _no_request
+    assert client.analyze_document(pdf_path="scan.pdf", prompt_config=PROMPTS) == (None, {})
+
+
+def test_request_errors_are_caught(config):
+    client = _client(scan_namer.OpenAIClient, config)
+
+    def do_request(system_prompt, parts):
+        raise RuntimeError("boom")
+
+    client._do_request = do_request
+    assert client.analyze_document(document_text="x", prompt_config=PROMPTS) == (None, {})
+    assert client.token_costs == []
+
+
+def test_rasterized_pages_become_image_parts(config):
+    client = _client(scan_namer.XAIClient, config, strategy="rasterize_to_images")
+    client._rasterize_pdf_to_pngs = lambda path: [b"png1", b"png2"]
+    parts = client._build_parts(None, PROMPTS, "scan.pdf")
+    assert [part["type"] for part in parts] == ["text", "image", "image"]
+    messages = scan_namer._chat_messages("Be terse.", parts)
+    assert messages[0] == {"role": "system", "content": "Be terse."}
+    assert [block["type"] for block in messages[1]["content"]] == [
+        "text",
+        "image_url",
+        "image_url",
+    ]
+
+
+def test_single_text_part_is_sent_as_plain_string():
+    messages = scan_namer._chat_messages("sys", [{"type": "text", "text": "hello"}])
+    assert messages[1] == {"role": "user", "content": "hello"}
+
+
+def test_anthropic_inline_pdf_becomes_document_block(config, tmp_path):
+    pdf = tmp_path / "scan.pdf"
+    pdf.write_bytes(b"%PDF-1.4")
+    client = _client(scan_namer.AnthropicClient, config, strategy="inline_base64_document")
+    blocks = client._content_blocks(client._build_parts(None, PROMPTS, str(pdf)))
+    assert [block["type"] for block in blocks] == ["text", "document"]
+    assert blocks[1]["source"]["media_type"] == "application/pdf"
+
+
+def test_responses_input_references_uploaded_file():
+    parts = [{"type": "text", "text": "Name this."}, {"type": "pdf", "path": "scan.pdf"}]
+    (message,) = scan_namer._responses_input("sys", parts, "file-123")
+    assert message["content"] == [
+        {"type": "input_text", "text": "sys"},
+        {"type": "input_text", "text": "Name this."},
+        {"type": "input_file", "file_id": "file-123"},
+    ]
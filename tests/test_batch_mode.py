@@ -0,0 +1,258 @@
+import json
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+import scan_namer
+from conftest import MINIMAL_CONFIG
+
+PROMPT = {"system_prompt": "sys", "user_prompt": "name it"}
+
+
+class FakeOpenAI:
+    """Just enough of the openai SDK surface for the batch path."""
+
+    def __init__(self, replies):
+        self.replies = replies
+        self.uploaded = None
+        self.deleted = []
+        self.files = SimpleNamespace(
+            create=self._create_file,
+            content=lambda file_id: SimpleNamespace(text=self._output()),
+            delete=self.deleted.append,
+        )
+        self.batches = SimpleNamespace(
+            create=lambda **kw: SimpleNamespace(id="batch-1", status="validating"),
+            retrieve=lambda batch_id: SimpleNamespace(
+                id=batch_id, status="completed", output_file_id="out-1"
+            ),
+        )
+
+    def _create_file(self, file, purpose):
+        filename, data = file
+        self.uploaded = [json.loads(line) for line in data.splitlines()]
+        return SimpleNamespace(id="in-1")
+
+    def _output(self):
+        lines = []
+        for request in self.uploaded:
+            key = request["custom_id"]
+            body = {
+                "choices": [{"message": {"content": f" {self.replies[key]} "}}],
+                "usage": {"prompt_tokens": 10, "completion_tokens": 2, "total_tokens": 12},
+            }
+            lines.append(
+                json.dumps(
+                    {"custom_id": key, "response": {"status_code": 200, "body": body}}
+                )
+            )
+        return "\n".join(lines)
+
+
+def _openai_client(config, fake):
+    client = object.__new__(scan_namer.OpenAIClient)
+    client.config = config
+    client.provider = "openai"
+    client.model = "gpt-4o"
+    client.max_tokens = 100
+    client.temperature = 0.3
+    client.token_costs = []
+    client._costs_lock = threading.Lock()
+    client.client = fake
+    return client
+
+
+def test_openai_batch_maps_results_by_key(config):
+    fake = FakeOpenAI({"a": "Invoice-A", "b": "Receipt-B"})
+    client = _openai_client(config, fake)
+    results = client.analyze_documents_batch(
+        [
+            {"key": "a", "document_text": "text a", "pdf_path": None},
+            {"key": "b", "document_text": "text b", "pdf_path": None},
+        ],
+        PROMPT,
+    )
+    assert results["a"][0] == "Invoice-A"
+    assert results["b"][0] == "Receipt-B"
+    assert fake.uploaded[0]["url"] == "/v1/chat/completions"
+    assert fake.uploaded[0]["body"]["model"] == "gpt-4o"
+    assert fake.deleted == ["in-1"]
+    assert client.get_total_costs()["total_tokens"] == 24
+
+
+def test_openai_batch_jsonl_keeps_non_ascii_text(config):
+    fake = FakeOpenAI({"a": "Facture-Café"})
+    client = _openai_client(config, fake)
+    client.analyze_documents_batch(
+        [{"key": "a", "document_text": "Café №1", "pdf_path": None}], PROMPT
+    )
+    assert "Café №1" in fake.uploaded[0]["body"]["messages"][1]["content"]
+
+
+def test_openai_batch_results_skip_failed_lines(config):
+    client = _openai_client(config, None)
+    ok = {
+        "custom_id": "a",
+        "response": {
+            "status_code": 200,
+            "body": {"choices": [{"message": {"content": "Name-A\n"}}], "usage": {}},
+        },
+    }
+    failed = {"custom_id": "b", "error": {"message": "bad request"}}
+    output = "\n".join(json.dumps(record) for record in (ok, failed)) + "\n"
+    assert client._batch_results(output) == {
+        "a": ("Name-A", {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0})
+    }
+
+
+def test_openai_batch_jsonl_is_serialized_with_orjson(config, monkeypatch):
+    real_dumps = pytest.importorskip("orjson").dumps
+    dumped = []
+
+    def spy_dumps(obj):
+        dumped.append(obj["custom_id"])
+        return real_dumps(obj)
+
+    monkeypatch.setattr(scan_namer.orjson, "dumps", spy_dumps)
+    fake = FakeOpenAI({"a": "Invoice-A"})
+    client = _openai_client(config, fake)
+    client.analyze_documents_batch(
+        [{"key": "a", "document_text": "text a", "pdf_path": None}], PROMPT
+    )
+    assert dumped == ["a"]
+
+
+def test_base_batch_falls_back_to_per_document_calls():
+    client = object.__new__(scan_namer.BaseLLMClient)
+    calls = []
+
+    def analyze_document(document_text=None, prompt_config=None, pdf_path=None):
+        calls.append((document_text, pdf_path))
+        return f"name-{len(calls)}", {}
+
+    client.analyze_document = analyze_document
+    results = client.analyze_documents_batch(
+        [
+            {"key": "x", "document_text": "t", "pdf_path": None},
+            {"key": "y", "document_text": None, "pdf_path": "/tmp/y.pdf"},
+        ],
+        PROMPT,
+    )
+    assert calls == [("t", None), (None, "/tmp/y.pdf")]
+    assert results == {"x": ("name-1", {}), "y": ("name-2", {})}
+
+
+class FakeGenai:
+    """Just enough of the google-genai client surface for the batch path."""
+
+    def __init__(self, replies, vertexai=False):
+        self.vertexai = vertexai
+        self.replies = replies
+        self.submitted = None
+        self.batches = SimpleNamespace(create=self._create, get=self._get)
+
+    def _create(self, model, src, config):
+        self.submitted = src
+        return SimpleNamespace(name="batches/1", state="JOB_STATE_PENDING")
+
+    def _get(self, name):
+        responses = [
+            SimpleNamespace(
+                error=None, response=SimpleNamespace(text=f" {self.replies[i]} ")
+            )
+            for i in range(len(self.submitted))
+        ]
+        return SimpleNamespace(
+            name=name,
+            state=SimpleNamespace(name="JOB_STATE_SUCCEEDED"),
+            dest=SimpleNamespace(inlined_responses=responses),
+        )
+
+
+def _google_client(config, fake):
+    client = object.__new__(scan_namer.GoogleClient)
+    client.config = config
+    client.provider = "google"
+    client.model = "gemini-2.5-flash"
+    client.max_tokens = 100
+    client.temperature = 0.3
+    client.token_costs = []
+    client._costs_lock = threading.Lock()
+    client._pdf_strategy = "none"
+    client.client = fake
+    return client
+
+
+def test_gemini_batch_maps_inline_responses_in_order(config):
+    fake = FakeGenai(["Invoice-A", "Receipt-B"])
+    client = _google_client(config, fake)
+    results = client.analyze_documents_batch(
+        [
+            {"key": "a", "document_text": "text a", "pdf_path": None},
+            {"key": "b", "document_text": "text b", "pdf_path": None},
+        ],
+        PROMPT,
+    )
+    assert results["a"][0] == "Invoice-A"
+    assert results["b"][0] == "Receipt-B"
+    assert fake.submitted[0]["contents"] == ["name it\n\nDocument content:\ntext a"]
+    assert fake.submitted[0]["config"]["system_instruction"] == "sys"
+
+
+def test_gemini_batch_on_vertex_runs_per_document(config):
+    client = _google_client(config, FakeGenai([], vertexai=True))
+    client._do_request = lambda system_prompt, parts: ("Letter", {"total_tokens": 1})
+    results = client.analyze_documents_batch(
+        [{"key": "a", "document_text": "text a", "pdf_path": None}], PROMPT
+    )
+    assert results == {"a": ("Letter", {"total_tokens": 1})}
+
+
+class CountingTokenizer:
+    def __init__(self):
+        self.counted = []
+
+    def count_tokens(self, text):
+        self.counted.append(text)
+        return len(text) // 4
+
+
+def _namer(config, client):
+    namer = object.__new__(scan_namer.ScanNamer)
+    namer.config = config
+    namer.llm_client = client
+    return namer
+
+
+def test_split_batch_counts_every_text_and_estimates_pdfs(config_factory):
+    cfg = json.loads(json.dumps(MINIMAL_CONFIG))
+    cfg["llm"]["batch_max_input_tokens"] = 1500
+    client = CountingTokenizer()
+    namer = _namer(config_factory(cfg), client)
+    items = [
+        {"key": "a", "document_text": "x" * 400, "pdf_path": None},
+        {"key": "b", "document_text": None, "pdf_path": "/tmp/b.pdf"},
+        {"key": "c", "document_text": "y" * 2000, "pdf_path": None},
+    ]
+    jobs = namer._split_batch(items, {"system_prompt": "", "user_prompt": ""})
+    assert client.counted == ["", "x" * 400, "y" * 2000]
+    assert [[item["key"] for item in job] for job in jobs] == [["a", "b"], ["c"]]
+
+
+def test_split_batch_respects_token_limit(config_factory):
+    cfg = json.loads(json.dumps(MINIMAL_CONFIG))
+    cfg["llm"]["batch_max_input_tokens"] = 250
+    namer = _namer(config_factory(cfg), CountingTokenizer())
+    items = [
+        {"key": str(i), "document_text": "x" * 400, "pdf_path": None} for i in range(5)
+    ]
+    jobs = namer._split_batch(items, {"system_prompt": "", "user_prompt": ""})
+    assert [len(job) for job in jobs] == [2, 2, 1]
+    assert [item["key"] for job in jobs for item in job] == ["0", "1", "2", "3", "4"]
+
+
+def test_split_batch_unlimited_by_default(config):
+    namer = _namer(config, CountingTokenizer())
+    items = [{"key": "a", "document_text": "t", "pdf_path": None}]
+    assert namer._split_batch(items, PROMPT) == [items]
@@ -0,0 +1,152 @@
+import atexit
+import logging.handlers
+import threading
+import time
+
+import pytest
+
+import scan_namer
+from conftest import MINIMAL_CONFIG
+
+
+def _client():
+    """A BaseLLMClient with only the cost-tracking state initialized."""
+    client = object.__new__(scan_namer.BaseLLMClient)
+    client.token_costs = []
+    client._costs_lock = threading.Lock()
+    return client
+
+
+def test_total_costs_empty():
+    assert _client().get_total_costs() == {
+        "prompt_tokens": 0,
+        "completion_tokens": 0,
+        "total_tokens": 0,
+    }
+
+
+def test_record_cost_from_many_threads():
+    client = _client()
+    cost = {"prompt_tokens": 2, "completion_tokens": 1, "total_tokens": 3}
+
+    def worker():
+        for _ in range(100):
+            client._record_cost(dict(cost))
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert client.get_total_costs() == {
+        "prompt_tokens": 1600,
+        "completion_tokens": 800,
+        "total_tokens": 2400,
+    }
+
+
+def test_renames_run_on_their_own_pool_and_are_counted():
+    namer = object.__new__(scan_namer.ScanNamer)
+    namer.max_workers = 2
+    naming_threads = set()
+    rename_threads = set()
+
+    def name_document(file_info, temp_dir):
+        naming_threads.add(threading.current_thread().name)
+        return {"a": "A.pdf", "b": True, "c": False, "d": "D.pdf"}[file_info["id"]]
+
+    def rename_documents(renames):
+        rename_threads.add(threading.current_thread().name)
+        assert sorted(name for _, name in renames) == ["A.pdf", "D.pdf"]
+        return 1, 1
+
+    namer._name_document = name_document
+    namer._rename_documents = rename_documents
+    files = [{"id": key, "name": key} for key in "abcd"]
+    assert namer._process_concurrently(files, "/tmp") == (2, 2)
+    assert rename_threads and not rename_threads & naming_threads
+
+
+def test_renames_are_flushed_in_batches(monkeypatch):
+    namer = object.__new__(scan_namer.ScanNamer)
+    namer.max_workers = 4
+    monkeypatch.setattr(scan_namer.ScanNamer, "RENAME_BATCH_SIZE", 3)
+    batches = []
+    namer._name_document = lambda file_info, temp_dir: f"{file_info['id']}.pdf"
+    namer._rename_documents = lambda renames: batches.append(len(renames)) or (len(renames), 0)
+    files = [{"id": str(i), "name": str(i)} for i in range(7)]
+    assert namer._process_concurrently(files, "/tmp") == (7, 0)
+    assert sorted(batches) == [1, 3, 3]
+
+
+def test_log_records_are_written_by_a_listener_thread(config_factory, tmp_path, monkeypatch):
+    log_file = tmp_path / "run.log"
+    cfg = {**MINIMAL_CONFIG, "logging": {**MINIMAL_CONFIG["logging"], "file": str(log_file)}}
+    monkeypatch.setattr(logging.root, "handlers", [])
+    namer = object.__new__(scan_namer.ScanNamer)
+    namer.config = config_factory(cfg)
+    namer._setup_logging()
+    try:
+        (handler,) = logging.root.handlers
+        assert isinstance(handler, logging.handlers.QueueHandler)
+        logging.info("queued message")
+    finally:
+        atexit.unregister(namer._log_listener.stop)
+        namer._log_listener.stop()
+    assert "queued message" in log_file.read_text()
+
+
+def test_logging_setup_starts_no_listener_when_already_configured(config_factory, tmp_path, monkeypatch):
+    cfg = {**MINIMAL_CONFIG, "logging": {**MINIMAL_CONFIG["logging"], "file": str(tmp_path / "run.log")}}
+    existing = logging.NullHandler()
+    monkeypatch.setattr(logging.root, "handlers", [existing])
+    threads = threading.active_count()
+    namer = object.__new__(scan_namer.ScanNamer)
+    namer.config = config_factory(cfg)
+    namer._setup_logging()
+    assert namer._log_listener is None
+    assert logging.root.handlers == [existing]
+    assert threading.active_count() == threads
+
+
+def _slow_second_namer(monkeypatch, second):
+    namer = object.__new__(scan_namer.ScanNamer)
+    namer.max_workers = 2
+    monkeypatch.setattr(scan_namer.ScanNamer, "RENAME_BATCH_SIZE", 100)
+    batches = []
+
+    def name_document(file_info, temp_dir):
+        if file_info["id"] == "b":
+            return second()
+        return "A.pdf"
+
+    namer._name_document = name_document
+    namer._rename_documents = lambda renames: batches.append(
+        [name for _, name in renames]
+    ) or (len(renames), 0)
+    return namer, batches
+
+
+def test_waiting_renames_are_flushed_after_a_delay(monkeypatch):
+    monkeypatch.setattr(scan_namer.ScanNamer, "RENAME_FLUSH_SECONDS", 0.05)
+    namer, batches = _slow_second_namer(
+        monkeypatch, lambda: time.sleep(0.5) or "B.pdf"
+    )
+    files = [{"id": key, "name": key} for key in "ab"]
+    assert namer._process_concurrently(files, "/tmp") == (2, 0)
+    assert batches == [["A.pdf"], ["B.pdf"]]
+
+
+def test_queued_renames_are_applied_when_interrupted(monkeypatch):
+    monkeypatch.setattr(scan_namer.ScanNamer, "RENAME_FLUSH_SECONDS", 60)
+
+    def interrupted():
+        time.sleep(0.2)
+        raise KeyboardInterrupt
+
+    namer, batches = _slow_second_namer(monkeypatch, interrupted)
+    files = [{"id": key, "name": key} for key in "ab"]
+    with pytest.raises(KeyboardInterrupt):
+        namer._process_concurrently(files, "/tmp")
+    assert batches == [["A.pdf"]]
@@ -1,4 +1,9 @@
-import scan_namer  # noqa: F401  (kept for symmetry / future use)
+import json
+
+import pytest
+
+import scan_namer
+from conftest import MINIMAL_CONFIG
 
 
 def test_env_override_wins_for_string(config, monkeypatch):
@@ -43,3 +48,42 @@ def test_convert_bool_true_values(config):
 
 def test_convert_bool_false_value(config):
     assert config._convert_env_value("false", "auto_select_first_folder") is False
+
+
+def test_download_chunk_size_int_conversion(config, monkeypatch):
+    monkeypatch.setenv("GOOGLE_DRIVE_DOWNLOAD_CHUNK_SIZE", "1048576")
+    assert config.get("google_drive.download_chunk_size") == 1048576
+
+
+def test_get_returns_nested_sections_and_leaves(config):
+    assert config.get("llm.providers.openai.default_model") == "gpt-5.5"
+    assert config.get("llm.providers.openai")["default_model"] == "gpt-5.5"
+    assert config.get("llm.providers.missing.default_model", "dflt") == "dflt"
+    assert config.get("llm.max_tokens.nope") is None
+
+
+def test_get_does_not_reach_keys_containing_dots(config_factory):
+    cfg = json.loads(json.dumps(MINIMAL_CONFIG))
+    cfg["llm"]["providers"]["openai"]["pdf_strategy"] = {"gpt-4.1": "none"}
+    config = config_factory(cfg)
+    assert config.get("llm.providers.openai.pdf_strategy.gpt-4.1") is None
+    assert config.get("llm.providers.openai.pdf_strategy") == {"gpt-4.1": "none"}
+
+
+def test_concurrency_env_overrides_max_workers(config, monkeypatch):
+    monkeypatch.setenv("SCAN_NAMER_CONCURRENCY", "8")
+    assert config.get("processing.max_workers") == 8
+
+
+def test_config_is_parsed_with_orjson(config_factory, monkeypatch):
+    real_loads = pytest.importorskip("orjson").loads
+    parsed = []
+
+    def spy_loads(data):
+        parsed.append(data)
+        return real_loads(data)
+
+    monkeypatch.setattr(scan_namer.orjson, "loads", spy_loads)
+    cfg = config_factory(MINIMAL_CONFIG)
+    assert cfg.get("llm.provider") == "openai"
+    assert len(parsed) == 1 and isinstance(parsed[0], bytes)
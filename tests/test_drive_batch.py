@@ -0,0 +1,67 @@
+import threading
+
+import scan_namer
+
+
+class FakeBatch:
+    def __init__(self, callback, fail_ids, log):
+        self.callback = callback
+        self.fail_ids = fail_ids
+        self.log = log
+        self.requests = []
+
+    def add(self, request, request_id):
+        self.requests.append(request_id)
+
+    def execute(self):
+        self.log.append(list(self.requests))
+        for request_id in self.requests:
+            if request_id in self.fail_ids:
+                self.callback(request_id, None, RuntimeError("boom"))
+            else:
+                self.callback(request_id, {"id": request_id}, None)
+
+
+class FakeFiles:
+    def update(self, fileId, body, fields=None):
+        return (fileId, body["name"])
+
+
+class FakeService:
+    def __init__(self, fail_ids=()):
+        self.fail_ids = set(fail_ids)
+        self.executed = []
+
+    def files(self):
+        return FakeFiles()
+
+    def new_batch_http_request(self, callback):
+        return FakeBatch(callback, self.fail_ids, self.executed)
+
+
+def _manager(service):
+    mgr = object.__new__(scan_namer.GoogleDriveManager)
+    mgr.service = service
+    mgr._local = threading.local()
+    mgr._local.service = service
+    mgr._write_limiter = None
+    return mgr
+
+
+def test_renames_are_chunked_per_batch_limit():
+    service = FakeService()
+    mgr = _manager(service)
+    renames = [(f"id{i}", f"name{i}.pdf") for i in range(250)]
+    results = mgr.rename_files_batch(renames)
+    assert [len(batch) for batch in service.executed] == [100, 100, 50]
+    assert all(results[file_id] for file_id, _ in renames)
+
+
+def test_failed_items_fall_back_to_single_rename():
+    service = FakeService(fail_ids={"id1"})
+    mgr = _manager(service)
+    retried = []
+    mgr.rename_file = lambda file_id, name: retried.append((file_id, name)) or False
+    results = mgr.rename_files_batch([("id0", "a.pdf"), ("id1", "b.pdf")])
+    assert retried == [("id1", "b.pdf")]
+    assert results == {"id0": True, "id1": False}
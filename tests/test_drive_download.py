@@ -0,0 +1,95 @@
+import threading
+
+import requests
+
+import scan_namer
+
+
+class FakeResponse:
+    def __init__(self, chunks, status_error=None):
+        self.chunks = chunks
+        self.status_error = status_error
+        self.closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.closed = True
+
+    def raise_for_status(self):
+        if self.status_error:
+            raise self.status_error
+
+    def iter_content(self, chunk_size):
+        self.chunk_size = chunk_size
+        return iter(self.chunks)
+
+
+class FakeSession:
+    def __init__(self, response):
+        self.response = response
+        self.calls = []
+
+    def get(self, url, **kwargs):
+        self.calls.append((url, kwargs))
+        return self.response
+
+
+def _manager(config, session):
+    mgr = object.__new__(scan_namer.GoogleDriveManager)
+    mgr.config = config
+    mgr.service = object()
+    mgr._local = threading.local()
+    mgr._local.http_session = session
+    return mgr
+
+
+def test_download_streams_alt_media_to_disk(config, tmp_path):
+    response = FakeResponse([b"%PDF-", b"1.7"])
+    session = FakeSession(response)
+    out = tmp_path / "out.pdf"
+    assert _manager(config, session).download_file("abc", str(out)) is True
+    assert out.read_bytes() == b"%PDF-1.7"
+    url, kwargs = session.calls[0]
+    assert url.endswith("/drive/v3/files/abc")
+    assert kwargs["params"] == {"alt": "media"} and kwargs["stream"] is True
+    assert response.chunk_size == scan_namer.GoogleDriveManager.DEFAULT_DOWNLOAD_CHUNK_SIZE
+    assert response.closed
+
+
+def test_download_http_error_returns_false(config, tmp_path):
+    response = FakeResponse([], status_error=requests.HTTPError("404"))
+    mgr = _manager(config, FakeSession(response))
+    assert mgr.download_file("missing", str(tmp_path / "out.pdf")) is False
+
+
+def test_download_bytes_keeps_body_in_memory(config):
+    response = FakeResponse([b"%PDF-", b"1.7"])
+    assert _manager(config, FakeSession(response)).download_bytes("abc") == b"%PDF-1.7"
+
+
+def test_failed_download_leaves_no_file(config, tmp_path):
+    response = FakeResponse([], status_error=requests.HTTPError("404"))
+    out = tmp_path / "out.pdf"
+    assert _manager(config, FakeSession(response)).download_file("missing", str(out)) is False
+    assert not out.exists()
+
+
+def test_drive_service_http_keeps_build_http_defaults(config, monkeypatch):
+    import googleapiclient.discovery
+    import googleapiclient.http
+
+    built = {}
+
+    def fake_build(api, version, http):
+        built["http"] = http
+        return object()
+
+    monkeypatch.setattr(googleapiclient.discovery, "build", fake_build)
+    mgr = _manager(config, None)
+    mgr._credentials = object()
+    mgr._get_service()
+    inner = built["http"].http
+    assert inner.timeout == googleapiclient.http.DEFAULT_HTTP_TIMEOUT_SEC
+    assert 308 not in inner.redirect_codes
@@ -41,3 +41,23 @@ def test_generic_env_patterns_override(monkeypatch):
     sn = _scan_namer()
     assert sn._is_generic_filename("Invoice_001.pdf") is True
     assert sn._is_generic_filename("20240108_Raven_Scan.pdf") is False
+
+
+def test_generic_patterns_are_lowercased_and_skip_empty_entries(monkeypatch):
+    monkeypatch.setenv("GENERIC_FILENAME_PATTERNS", "Invoice, ,RECEIPT,")
+    sn = _scan_namer()
+    assert sn._generic_patterns == ("invoice", "receipt")
+    assert sn._is_generic_filename("receipt_17.pdf") is True
+    assert sn._is_generic_filename("Tax_Return_2023.pdf") is False
+
+
+def test_generic_patterns_are_matched_literally(monkeypatch):
+    monkeypatch.setenv("GENERIC_FILENAME_PATTERNS", "scan(1),img_")
+    sn = _scan_namer()
+    assert sn._is_generic_filename("Scan(1).pdf") is True
+    assert sn._is_generic_filename("scan1.pdf") is False
+
+
+def test_only_empty_generic_patterns_match_nothing(monkeypatch):
+    monkeypatch.setenv("GENERIC_FILENAME_PATTERNS", " , ")
+    assert _scan_namer()._is_generic_filename("20240108_Raven_Scan.pdf") is False
@@ -0,0 +1,209 @@
+import threading
+from types import SimpleNamespace
+
+import pytest
+from google import genai
+
+import scan_namer
+from conftest import MINIMAL_CONFIG
+
+GOOGLE_CONFIG = {
+    **MINIMAL_CONFIG,
+    "llm": {
+        **MINIMAL_CONFIG["llm"],
+        "providers": {
+            "google": {
+                "api_key_env": "GOOGLE_API_KEY",
+                "project_id_env": "GOOGLE_PROJECT_ID",
+                "location": "europe-west4",
+                "available_models": ["gemini-2.5-flash"],
+            },
+        },
+    },
+}
+
+
+@pytest.fixture
+def created_clients(monkeypatch):
+    created = []
+
+    def fake_client(**kwargs):
+        created.append(kwargs)
+        return object()
+
+    monkeypatch.setattr(genai, "Client", fake_client)
+    monkeypatch.setattr(scan_namer.GoogleClient, "_clients", {})
+    return created
+
+
+def test_google_clients_share_one_genai_client(created_clients):
+    created = created_clients
+    clients = []
+    for _ in range(2):
+        client = object.__new__(scan_namer.GoogleClient)
+        client.api_key = None
+        client.project_id, client.location = "proj", "us-central1"
+        client._setup_client()
+        clients.append(client)
+    assert len(created) == 1
+    assert created[0]["http_options"].timeout == scan_namer.GoogleClient.HTTP_TIMEOUT_MS
+    assert clients[0].client is clients[1].client
+
+
+def test_api_key_selects_the_developer_api(config_factory, created_clients, monkeypatch):
+    monkeypatch.setenv("GOOGLE_API_KEY", "key")
+    monkeypatch.delenv("GOOGLE_PROJECT_ID", raising=False)
+    scan_namer.GoogleClient(config_factory(GOOGLE_CONFIG), "google", "gemini-2.5-flash")
+    (options,) = created_clients
+    assert options["api_key"] == "key"
+    assert "vertexai" not in options
+
+
+def test_without_api_key_uses_vertex_ai(config_factory, created_clients, monkeypatch):
+    monkeypatch.delenv("GOOGLE_API_KEY", raising=False)
+    monkeypatch.setenv("GOOGLE_PROJECT_ID", "proj")
+    scan_namer.GoogleClient(config_factory(GOOGLE_CONFIG), "google", "gemini-2.5-flash")
+    (options,) = created_clients
+    assert options["vertexai"] is True
+    assert (options["project"], options["location"]) == ("proj", "europe-west4")
+
+
+class FakeFiles:
+    def __init__(self, state="ACTIVE"):
+        self.uploaded = []
+        self.deleted = []
+        self.state = state
+
+    def upload(self, file):
+        self.uploaded.append(file)
+        return SimpleNamespace(name=f"files/{len(self.uploaded)}")
+
+    def delete(self, name):
+        self.deleted.append(name)
+
+    def get(self, name):
+        return SimpleNamespace(name=name, state=SimpleNamespace(name=self.state))
+
+
+def _uploading_google_client(config, vertexai=False):
+    client = object.__new__(scan_namer.GoogleClient)
+    client.config = config
+    client.provider = "google"
+    client.model = "gemini-2.5-flash"
+    client._pdf_strategy = "genai_files_upload"
+    client._prefetched = {}
+    client._prefetch_lock = threading.Lock()
+    client.client = SimpleNamespace(files=FakeFiles(), vertexai=vertexai)
+    return client
+
+
+def test_gemini_prefetched_upload_is_reused(config):
+    client = _uploading_google_client(config)
+    client.prefetch_upload("scan.pdf")
+    contents, _ = client._contents("sys", [{"type": "pdf", "path": "scan.pdf"}])
+    assert [c.name for c in contents] == ["files/1"]
+    assert client.client.files.uploaded == ["scan.pdf"]
+
+
+def test_gemini_discarded_prefetch_is_deleted(config):
+    client = _uploading_google_client(config)
+    client.prefetch_upload("scan.pdf")
+    client.discard_prefetch("scan.pdf")
+    client._prefetch_pool.shutdown(wait=True)
+    assert client.client.files.deleted == ["files/1"]
+    assert client._prefetched == {}
+
+
+def test_gemini_discard_waits_for_an_upload_in_progress(config):
+    client = _uploading_google_client(config)
+    started, release = threading.Event(), threading.Event()
+    upload = client.client.files.upload
+
+    def slow_upload(file):
+        started.set()
+        release.wait(5)
+        return upload(file)
+
+    client.client.files.upload = slow_upload
+    client.prefetch_upload("scan.pdf")
+    assert started.wait(5)
+    discarding = threading.Thread(target=client.discard_prefetch, args=("scan.pdf",))
+    discarding.start()
+    discarding.join(0.05)
+    assert discarding.is_alive()
+    release.set()
+    discarding.join(5)
+    assert client.client.files.deleted == ["files/1"]
+
+
+class CountingLimiter:
+    def __init__(self):
+        self.acquired = 0
+
+    def acquire(self):
+        self.acquired += 1
+
+
+def test_gemini_prefetch_takes_a_rate_limit_token_only_when_used(config):
+    client = _uploading_google_client(config)
+    client.limiter = CountingLimiter()
+    client.prefetch_upload("unused.pdf")
+    client._prefetched["unused.pdf"].result()
+    client.discard_prefetch("unused.pdf")
+    assert client.client.files.uploaded == ["unused.pdf"]
+    assert client.limiter.acquired == 0
+    client.prefetch_upload("scan.pdf")
+    client._contents("sys", [{"type": "pdf", "path": "scan.pdf"}])
+    assert client.limiter.acquired == 1
+
+
+def test_gemini_prefetch_is_skipped_without_files_api(config):
+    client = _uploading_google_client(config, vertexai=True)
+    client.prefetch_upload("scan.pdf")
+    assert client._prefetched == {}
+    assert client.client.files.uploaded == []
+
+
+def test_gemini_upload_is_reused_while_active(config, tmp_path):
+    pdf = tmp_path / "scan.pdf"
+    pdf.write_bytes(b"%PDF-1.4")
+    cache = scan_namer.NameCache(str(tmp_path / "cache.db"))
+    client = _uploading_google_client(config)
+    client.upload_cache = cache
+    parts = [{"type": "pdf", "path": str(pdf)}]
+    assert client._contents("sys", parts)[0][0].name == "files/1"
+    assert client._contents("sys", parts)[0][0].name == "files/1"
+    assert client.client.files.uploaded == [str(pdf)]
+
+    client.client.files.state = "FAILED"
+    assert client._contents("sys", parts)[0][0].name == "files/2"
+    cache.close()
+
+
+def test_gemini_prefetch_reuses_and_records_cached_uploads(config, tmp_path):
+    first, second = tmp_path / "a.pdf", tmp_path / "b.pdf"
+    for pdf in (first, second):
+        pdf.write_bytes(b"%PDF-1.4")
+    cache = scan_namer.NameCache(str(tmp_path / "cache.db"))
+    client = _uploading_google_client(config)
+    client.upload_cache = cache
+    client.prefetch_upload(str(first))
+    client._prefetched[str(first)].result()
+    client.discard_prefetch(str(first))
+    assert client.client.files.deleted == []
+
+    client.prefetch_upload(str(second))
+    contents, _ = client._contents("sys", [{"type": "pdf", "path": str(second)}])
+    assert [c.name for c in contents] == ["files/1"]
+    assert client.client.files.uploaded == [str(first)]
+    cache.close()
+
+
+def test_vertex_sends_pdfs_inline(config, tmp_path):
+    pdf = tmp_path / "scan.pdf"
+    pdf.write_bytes(b"%PDF-1.4")
+    client = _uploading_google_client(config, vertexai=True)
+    (part,), _ = client._contents("sys", [{"type": "pdf", "path": str(pdf)}])
+    assert part.inline_data.data == b"%PDF-1.4"
+    assert part.inline_data.mime_type == "application/pdf"
+    assert client.client.files.uploaded == []
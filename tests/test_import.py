@@ -1,3 +1,7 @@
+import os
+import subprocess
+import sys
+
 import scan_namer
 
 
@@ -8,3 +12,19 @@ def test_module_imports():
 def test_app_dir_is_set():
     assert isinstance(scan_namer.APP_DIR, str)
     assert scan_namer.APP_DIR
+
+
+def test_import_defers_heavy_dependencies():
+    code = (
+        "import sys, scan_namer; "
+        "loaded = {'pypdf', 'pypdfium2', 'requests', 'googleapiclient.discovery', "
+        "'anthropic', 'openai'} & set(sys.modules); "
+        "assert not loaded, loaded"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        capture_output=True,
+        text=True,
+    )
+    assert result.returncode == 0, result.stderr
@@ -0,0 +1,36 @@
+import scan_namer
+
+
+def test_first_matching_rule_fills_named_groups():
+    classifier = scan_namer.LocalClassifier(
+        [
+            {"pattern": r"acme power.*?statement date:\s*(?P<date>\d{4}-\d{2}-\d{2})",
+             "name": "Acme-Power-Bill-{date}"},
+            {"pattern": r"acme", "name": "Acme-Document"},
+        ]
+    )
+    text = "ACME Power Company\nStatement Date: 2026-03-01\nAmount due"
+    assert classifier.classify(text) == "Acme-Power-Bill-2026-03-01"
+    assert classifier.classify("Acme widgets") == "Acme-Document"
+
+
+def test_no_match_returns_none():
+    classifier = scan_namer.LocalClassifier([{"pattern": r"invoice", "name": "Invoice"}])
+    assert classifier.classify("a letter from grandma") is None
+
+
+def test_rule_with_missing_placeholder_is_skipped():
+    classifier = scan_namer.LocalClassifier(
+        [
+            {"pattern": r"receipt", "name": "Receipt-{date}"},
+            {"pattern": r"receipt", "name": "Receipt"},
+        ]
+    )
+    assert classifier.classify("store receipt") == "Receipt"
+
+
+def test_malformed_and_invalid_rules_are_ignored():
+    classifier = scan_namer.LocalClassifier(
+        [{"pattern": "("}, {"pattern": "(", "name": "Bad"}, "nope"]
+    )
+    assert classifier.rules == []
@@ -0,0 +1,192 @@
+import threading
+
+import pytest
+
+import scan_namer
+
+PROMPT = {"system_prompt": "s", "user_prompt": "u"}
+
+
+def test_round_trip_and_key_sensitivity(tmp_path):
+    cache = scan_namer.NameCache(str(tmp_path / "cache.db"))
+    h = scan_namer.NameCache.content_hash(document_text="hello")
+    version = scan_namer.NameCache.prompt_version(PROMPT)
+    cache.put(h, "openai", "gpt-5.5", version, "Hello-Letter", {"prompt_tokens": 3})
+    assert cache.get(h, "openai", "gpt-5.5", version) == "Hello-Letter"
+    assert cache.get(h, "openai", "gpt-4o", version) is None
+    other_prompt = scan_namer.NameCache.prompt_version({**PROMPT, "user_prompt": "v"})
+    assert cache.get(h, "openai", "gpt-5.5", other_prompt) is None
+    cache.close()
+
+    reopened = scan_namer.NameCache(str(tmp_path / "cache.db"))
+    assert reopened.get(h, "openai", "gpt-5.5", version) == "Hello-Letter"
+    reopened.close()
+
+
+def test_content_hash_distinguishes_text_from_pdf_bytes(tmp_path):
+    pdf = tmp_path / "doc.pdf"
+    pdf.write_bytes(b"hello")
+    by_text = scan_namer.NameCache.content_hash(document_text="hello")
+    by_pdf = scan_namer.NameCache.content_hash(pdf_path=str(pdf))
+    assert by_text != by_pdf
+    assert by_pdf == scan_namer.NameCache.content_hash(pdf_path=str(pdf))
+
+
+class CountingClient:
+    provider = "openai"
+    model = "gpt-5.5"
+
+    def __init__(self):
+        self.calls = 0
+
+    def analyze_document(self, document_text=None, prompt_config=None, pdf_path=None):
+        self.calls += 1
+        return "Suggested-Name", {"prompt_tokens": 10, "completion_tokens": 2}
+
+
+def _namer(tmp_path, client):
+    namer = object.__new__(scan_namer.ScanNamer)
+    namer.llm_client = client
+    namer.name_cache = scan_namer.NameCache(str(tmp_path / "cache.db"))
+    namer._llm_slots = threading.BoundedSemaphore(1)
+    namer._run_names = {}
+    namer._inflight = {}
+    namer._inflight_lock = threading.Lock()
+    return namer
+
+
+def test_second_identical_document_is_served_from_cache(tmp_path):
+    client = CountingClient()
+    namer = _namer(tmp_path, client)
+
+    first = {"document_text": "same text", "pdf_path": None}
+    assert namer._analyze(first, PROMPT) == (
+        "Suggested-Name",
+        {"prompt_tokens": 10, "completion_tokens": 2},
+    )
+    second = {"document_text": "same text", "pdf_path": None}
+    assert namer._analyze(second, PROMPT) == ("Suggested-Name.pdf", {})
+    assert client.calls == 1
+
+
+def test_failed_suggestions_are_not_cached(tmp_path):
+    client = CountingClient()
+    client.analyze_document = lambda **kwargs: (None, {})
+    namer = _namer(tmp_path, client)
+    namer._analyze({"document_text": "t", "pdf_path": None}, PROMPT)
+    key = namer._cache_key({"document_text": "t", "pdf_path": None}, PROMPT)
+    assert namer.name_cache.get(*key) is None
+
+
+def test_suggestions_that_fail_validation_are_not_cached(tmp_path):
+    client = CountingClient()
+    client.analyze_document = lambda **kwargs: ("???", {})
+    namer = _namer(tmp_path, client)
+    prepared = {"document_text": "t", "pdf_path": None}
+    namer._analyze(prepared, PROMPT)
+    assert namer.name_cache.get(*namer._cache_key(prepared, PROMPT)) is None
+    assert namer._run_names == {}
+
+
+def test_concurrent_duplicates_share_one_call_without_disk_cache(tmp_path):
+    client = CountingClient()
+    namer = _namer(tmp_path, client)
+    namer.name_cache = None
+    namer._llm_slots = threading.BoundedSemaphore(4)
+    barrier = threading.Barrier(4)
+    results = []
+
+    def worker():
+        barrier.wait()
+        results.append(namer._analyze({"document_text": "dup", "pdf_path": None}, PROMPT))
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert client.calls == 1
+    # The first caller gets the raw suggestion, the rest its validated name.
+    assert sorted(name for name, _ in results) == ["Suggested-Name"] + ["Suggested-Name.pdf"] * 3
+
+
+def test_duplicates_retry_after_an_unusable_suggestion(tmp_path):
+    client = CountingClient()
+    replies = iter(["???", "Good-Name"])
+
+    def analyze_document(**kwargs):
+        client.calls += 1
+        return next(replies), {}
+
+    client.analyze_document = analyze_document
+    namer = _namer(tmp_path, client)
+    namer.name_cache = None
+    namer._llm_slots = threading.BoundedSemaphore(2)
+    barrier = threading.Barrier(2)
+    results = []
+
+    def worker():
+        barrier.wait()
+        results.append(namer._analyze({"document_text": "dup", "pdf_path": None}, PROMPT))
+
+    threads = [threading.Thread(target=worker) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert client.calls == 2
+    assert sorted(name for name, _ in results) == ["???", "Good-Name"]
+
+
+def _uploading_client(tmp_path, use_cache):
+    client = object.__new__(scan_namer.BaseLLMClient)
+    client.provider = "anthropic"
+    client.upload_cache = (
+        scan_namer.NameCache(str(tmp_path / "cache.db")) if use_cache else None
+    )
+    pdf = tmp_path / "scan.pdf"
+    pdf.write_bytes(b"%PDF-1.4 same bytes")
+    return client, str(pdf)
+
+
+def test_uploaded_file_id_is_reused_across_requests(tmp_path):
+    client, pdf = _uploading_client(tmp_path, use_cache=True)
+    uploads, deleted = [], []
+
+    def upload():
+        uploads.append(pdf)
+        return f"file-{len(uploads)}"
+
+    for _ in range(2):
+        with client._uploaded(pdf, upload, deleted.append) as file_id:
+            assert file_id == "file-1"
+    assert len(uploads) == 1
+    assert deleted == []
+
+
+def test_failed_request_forgets_reused_file_id(tmp_path):
+    client, pdf = _uploading_client(tmp_path, use_cache=True)
+    h = scan_namer.NameCache.content_hash(pdf_path=pdf)
+    client.upload_cache.put_upload(h, "anthropic", "file-gone")
+    with pytest.raises(RuntimeError):
+        with client._uploaded(pdf, lambda: "file-new", lambda file_id: None):
+            raise RuntimeError("file not found")
+    assert client.upload_cache.get_upload(h, "anthropic") is None
+
+
+def test_uploads_are_deleted_without_cache(tmp_path):
+    client, pdf = _uploading_client(tmp_path, use_cache=False)
+    deleted = []
+    with client._uploaded(pdf, lambda: "file-1", deleted.append) as file_id:
+        assert file_id == "file-1"
+    assert deleted == ["file-1"]
+
+
+def test_get_upload_ignores_ids_older_than_max_age(tmp_path, monkeypatch):
+    cache = scan_namer.NameCache(str(tmp_path / "cache.db"))
+    cache.put_upload(b"h", "google", "files/abc")
+    assert cache.get_upload(b"h", "google", max_age=3600) == "files/abc"
+    monkeypatch.setattr(scan_namer.time, "time", lambda: 10**10)
+    assert cache.get_upload(b"h", "google", max_age=3600) is None
+    assert cache.get_upload(b"h", "google") == "files/abc"
+    cache.close()
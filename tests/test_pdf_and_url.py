@@ -1,3 +1,7 @@
+import base64
+import io
+import tracemalloc
+
 import pypdf
 
 import scan_namer
@@ -70,3 +74,171 @@ def test_files_url_without_suffix():
     client = object.__new__(scan_namer.XAIClient)
     client.endpoint = "https://api.x.ai/v1"
     assert client._files_url() == "https://api.x.ai/v1/files"
+
+
+def test_extract_pages_bytes_from_reader(config, tmp_path):
+    # An already-parsed reader is reused; the result never touches disk.
+    src = _write_pdf(tmp_path / "src.pdf", 5)
+    proc = scan_namer.PDFProcessor(config)
+    data = proc.extract_pages_bytes(pypdf.PdfReader(src), 2)
+    assert len(pypdf.PdfReader(io.BytesIO(data)).pages) == 2
+
+
+def test_encode_pdf_to_base64_accepts_bytes_and_path(tmp_path):
+    src = _write_pdf(tmp_path / "src.pdf", 1)
+    client = object.__new__(scan_namer.BaseLLMClient)
+    with open(src, "rb") as f:
+        raw = f.read()
+    assert client._encode_pdf_to_base64(raw) == client._encode_pdf_to_base64(src)
+    assert base64.b64decode(client._encode_pdf_to_base64(raw)) == raw
+
+
+def test_pdf_context_parses_once(config, tmp_path, monkeypatch):
+    src = _write_pdf(tmp_path / "src.pdf", 5)
+    parses = []
+    real_reader = pypdf.PdfReader
+
+    def counting_reader(*args, **kwargs):
+        parses.append(1)
+        return real_reader(*args, **kwargs)
+
+    monkeypatch.setattr(pypdf, "PdfReader", counting_reader)
+    proc = scan_namer.PDFProcessor(config)
+    with scan_namer.PDFContext(src) as pdf:
+        assert proc.get_page_count(pdf) == 5
+        assert proc.extract_text(pdf) == ""
+        assert proc.extract_pages(pdf, str(tmp_path / "out.pdf"), 2) is True
+    assert len(parses) == 1
+
+
+def test_pdf_context_from_memory_writes_file_only_on_demand(config, tmp_path):
+    src = _write_pdf(tmp_path / "src.pdf", 5)
+    data = open(src, "rb").read()
+    target = tmp_path / "temp_1.pdf"
+    proc = scan_namer.PDFProcessor(config)
+    with scan_namer.PDFContext(str(target), data) as pdf:
+        assert proc.get_page_count(pdf) == 5
+        assert proc.extract_text(pdf, 2) == ""
+        assert proc.extract_pages(pdf, str(tmp_path / "short.pdf"), 2) is True
+        assert not target.exists()
+        prepared = {"temp_paths": []}
+        assert scan_namer.ScanNamer._pdf_file(pdf, prepared) == str(target)
+        assert scan_namer.ScanNamer._pdf_file(pdf, prepared) == str(target)
+    assert target.read_bytes() == data
+    assert prepared["temp_paths"] == [str(target)]
+
+
+def test_pdf_context_bad_file_reports_zero_pages(config, tmp_path):
+    bad = tmp_path / "not.pdf"
+    bad.write_text("this is not a pdf")
+    proc = scan_namer.PDFProcessor(config)
+    with scan_namer.PDFContext(str(bad)) as pdf:
+        assert proc.get_page_count(pdf) == 0
+
+
+def test_encode_pdf_to_base64_streams_across_chunks(tmp_path, monkeypatch):
+    data = bytes(range(256)) * 50  # not a multiple of the chunk size
+    path = tmp_path / "blob.pdf"
+    path.write_bytes(data)
+    monkeypatch.setattr(scan_namer.BaseLLMClient, "BASE64_CHUNK_SIZE", 3 * 7)
+    client = object.__new__(scan_namer.BaseLLMClient)
+    assert client._encode_pdf_to_base64(str(path)) == base64.b64encode(data).decode()
+
+
+def test_encode_pdf_to_base64_peaks_below_one_shot_encoding(tmp_path):
+    path = tmp_path / "big.pdf"
+    path.write_bytes(b"%PDF" * (1 << 20))
+    client = object.__new__(scan_namer.BaseLLMClient)
+    tracemalloc.start()
+    try:
+        encoded = client._encode_pdf_to_base64(str(path))
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    # One-shot b64encode(...).decode() holds the raw bytes plus two encodings.
+    assert peak < 2.5 * len(encoded)
+
+
+def test_xai_session_reuses_pool_and_retries_posts():
+    client = object.__new__(scan_namer.XAIClient)
+    client.api_key = "sk-test"
+    session = client._create_session()
+    assert session.headers["Authorization"] == "Bearer sk-test"
+    retry = session.get_adapter("https://api.x.ai").max_retries
+    assert 429 in retry.status_forcelist
+    assert retry.is_retry("POST", 429)
+
+
+def test_extract_text_falls_back_to_pypdf_without_pdfium(config, tmp_path, monkeypatch):
+    monkeypatch.setattr(scan_namer, "_load_pdfium", lambda: None)
+    pdf_path = _write_pdf(tmp_path / "blank.pdf", 2)
+    proc = scan_namer.PDFProcessor(config)
+    assert proc.extract_text(pdf_path) == ""
+
+
+def test_extract_text_bad_file_returns_empty(config, tmp_path):
+    bad = tmp_path / "not.pdf"
+    bad.write_text("this is not a pdf")
+    proc = scan_namer.PDFProcessor(config)
+    assert proc.extract_text(str(bad)) == ""
+
+
+def test_xai_post_json_closes_response_and_parses_bytes():
+    class FakeResponse:
+        content = b'{"choices": [{"message": {"content": "name"}}]}'
+        closed = False
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc_info):
+            self.closed = True
+
+        def raise_for_status(self):
+            pass
+
+    response = FakeResponse()
+    client = object.__new__(scan_namer.XAIClient)
+    client.limiter = None
+    client.session = type("S", (), {"post": lambda self, url, **kw: response})()
+    result = client._post_json("https://api.x.ai/v1/chat/completions", json={})
+    assert result["choices"][0]["message"]["content"] == "name"
+    assert response.closed
+
+
+def test_xai_post_json_serializes_payload_to_bytes():
+    class FakeResponse:
+        content = b"{}"
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc_info):
+            pass
+
+        def raise_for_status(self):
+            pass
+
+    sent = {}
+
+    def post(self, url, **kwargs):
+        sent.update(kwargs)
+        return FakeResponse()
+
+    client = object.__new__(scan_namer.XAIClient)
+    client.limiter = None
+    client.session = type("S", (), {"post": post})()
+    client._post_json("https://api.x.ai/v1/chat/completions", {"model": "grok", "n": 1})
+    assert scan_namer.loads_json(sent["data"]) == {"model": "grok", "n": 1}
+    assert isinstance(sent["data"], bytes)
+    assert sent["headers"] == {"Content-Type": "application/json"}
+    assert "json" not in sent
+
+
+def test_cleanup_prepared_tolerates_already_removed_files(tmp_path):
+    kept = tmp_path / "temp_1.pdf"
+    kept.write_bytes(b"%PDF-1.4")
+    namer = object.__new__(scan_namer.ScanNamer)
+    namer.llm_client = object.__new__(scan_namer.BaseLLMClient)
+    namer._cleanup_prepared({"temp_paths": [str(kept), str(tmp_path / "gone.pdf")]})
+    assert not kept.exists()
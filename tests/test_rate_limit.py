@@ -0,0 +1,65 @@
+import json
+import threading
+
+import scan_namer
+from conftest import MINIMAL_CONFIG
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def _patch_clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(scan_namer.time, "monotonic", clock.monotonic)
+    monkeypatch.setattr(scan_namer.time, "sleep", clock.sleep)
+    return clock
+
+
+def test_burst_is_free_then_requests_are_spaced(monkeypatch):
+    clock = _patch_clock(monkeypatch)
+    limiter = scan_namer.RateLimiter(rate_per_sec=2, burst=3)
+    for _ in range(3):
+        limiter.acquire()
+    assert clock.sleeps == []
+    limiter.acquire()
+    limiter.acquire()
+    assert clock.sleeps == [0.5, 0.5]
+
+
+def test_tokens_refill_over_time(monkeypatch):
+    clock = _patch_clock(monkeypatch)
+    limiter = scan_namer.RateLimiter(rate_per_sec=10, burst=1)
+    limiter.acquire()
+    clock.now += 1.0
+    limiter.acquire()
+    assert clock.sleeps == []
+
+
+def test_from_config_disabled_for_missing_or_nonpositive_rate():
+    assert scan_namer.RateLimiter.from_config(None) is None
+    assert scan_namer.RateLimiter.from_config(0) is None
+    assert scan_namer.RateLimiter.from_config("5") is None
+    assert scan_namer.RateLimiter.from_config(5, 8).capacity == 8
+
+
+def test_provider_rate_limit_applies_to_retried_calls(monkeypatch, config_factory):
+    clock = _patch_clock(monkeypatch)
+    cfg = json.loads(json.dumps(MINIMAL_CONFIG))
+    cfg["llm"]["providers"]["openai"]["rate_limit_rps"] = 1
+    client = object.__new__(scan_namer.BaseLLMClient)
+    client.config = config_factory(cfg)
+    client.provider = "openai"
+    client._costs_lock = threading.Lock()
+    for _ in range(3):
+        assert client._call_with_retry(lambda: "ok") == "ok"
+    assert clock.sleeps == [1.0, 1.0]
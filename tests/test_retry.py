@@ -0,0 +1,68 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+import scan_namer
+from conftest import MINIMAL_CONFIG
+
+
+class FakeStatusError(Exception):
+    def __init__(self, status_code, headers=None):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.response = SimpleNamespace(status_code=status_code, headers=headers or {})
+
+
+class RateLimitError(Exception):
+    """Named like the openai/anthropic SDK class; carries no status."""
+
+
+@pytest.fixture
+def client(config, monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(scan_namer.time, "sleep", sleeps.append)
+    c = object.__new__(scan_namer.BaseLLMClient)
+    c.config = config
+    c.provider = "openai"
+    c.sleeps = sleeps
+    return c
+
+
+def _flaky(errors, result="ok"):
+    errors = list(errors)
+
+    def call():
+        if errors:
+            raise errors.pop(0)
+        return result
+
+    return call
+
+
+def test_retries_429_honoring_retry_after(client):
+    call = _flaky([FakeStatusError(429, {"retry-after": "7"})])
+    assert client._call_with_retry(call) == "ok"
+    assert client.sleeps == [7.0]
+
+
+def test_retries_sdk_rate_limit_by_name_with_backoff(client):
+    call = _flaky([RateLimitError(), RateLimitError()])
+    assert client._call_with_retry(call) == "ok"
+    assert len(client.sleeps) == 2
+    assert 1 <= client.sleeps[0] < 2 and 2 <= client.sleeps[1] < 3
+
+
+def test_non_retryable_error_propagates_immediately(client):
+    with pytest.raises(FakeStatusError):
+        client._call_with_retry(_flaky([FakeStatusError(400)]))
+    assert client.sleeps == []
+
+
+def test_gives_up_after_max_retries(client, config_factory):
+    cfg = json.loads(json.dumps(MINIMAL_CONFIG))
+    cfg["llm"]["max_retries"] = 2
+    client.config = config_factory(cfg)
+    with pytest.raises(FakeStatusError):
+        client._call_with_retry(_flaky([FakeStatusError(503)] * 5))
+    assert len(client.sleeps) == 2
@@ -1,12 +1,16 @@
 """Unit tests for scan_namer.py pure helpers."""
+import json
 import os
 import socket
 import sys
+import tempfile
 import unittest
+from unittest import mock
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
 
 import scan_namer
+from conftest import MINIMAL_CONFIG
 
 
 class PreferIPv4Tests(unittest.TestCase):
@@ -34,3 +38,31 @@ class PreferIPv4Tests(unittest.TestCase):
 
 if __name__ == "__main__":
     unittest.main()
+
+
+class MainTests(unittest.TestCase):
+    def setUp(self):
+        scan_namer._load_config.cache_clear()
+        self.addCleanup(scan_namer._load_config.cache_clear)
+
+    def test_passes_its_config_into_scan_namer(self):
+        created = []
+
+        class FakeScanNamer:
+            def __init__(self, **kwargs):
+                created.append(kwargs)
+
+            def run(self):
+                pass
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "config.json")
+            with open(path, "w") as f:
+                json.dump(MINIMAL_CONFIG, f)
+            argv = ["scan_namer.py", "--config", path, "--dry-run"]
+            with mock.patch.object(scan_namer, "ScanNamer", FakeScanNamer), \
+                    mock.patch.object(sys, "argv", argv):
+                scan_namer.main()
+            (kwargs,) = created
+            self.assertIs(kwargs["config"], scan_namer._load_config(path))
+            self.assertNotIn("config_file", kwargs)
@@ -91,3 +91,18 @@ def test_get_api_key_resolves_from_file(tmp_path, monkeypatch, config):
     client.config = config
     client.provider = "anthropic"
     assert client._get_api_key() == "sk-file"
+
+
+def test_base_init_resolves_api_key_once(monkeypatch, config):
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "sk-env")
+    client = scan_namer.BaseLLMClient(config, "anthropic", "claude-sonnet-4-6")
+    assert client.api_key == "sk-env"
+
+
+def test_google_client_does_not_require_api_key(tmp_path, monkeypatch, config):
+    monkeypatch.setattr(scan_namer, "APP_DIR", str(tmp_path))
+    monkeypatch.delenv("GOOGLE_API_KEY", raising=False)
+    monkeypatch.setattr(scan_namer.GoogleClient, "_get_project_id", lambda self: "p")
+    monkeypatch.setattr(scan_namer.GoogleClient, "_setup_client", lambda self: None)
+    client = scan_namer.GoogleClient(config, "google", "gemini-2.5-flash")
+    assert client.api_key is None
@@ -0,0 +1,128 @@
+import json
+import threading
+from types import SimpleNamespace
+
+import scan_namer
+from conftest import MINIMAL_CONFIG
+
+
+def _streaming_config(config_factory):
+    cfg = json.loads(json.dumps(MINIMAL_CONFIG))
+    cfg["llm"]["stream"] = True
+    return config_factory(cfg)
+
+
+def _client(cls, config, provider):
+    client = object.__new__(cls)
+    client.config = config
+    client.provider = provider
+    client._costs_lock = threading.Lock()
+    return client
+
+
+def test_read_first_line_stops_at_newline():
+    deltas = iter(["\n", "Invoice-", "Acme\nSure, here", " is more"])
+    assert scan_namer.BaseLLMClient._read_first_line(deltas) == ("Invoice-Acme", True)
+    assert list(deltas) == [" is more"]
+
+
+def test_read_first_line_without_newline_consumes_everything():
+    assert scan_namer.BaseLLMClient._read_first_line(["Bank-", "Statement"]) == (
+        "Bank-Statement",
+        False,
+    )
+
+
+class FakeOpenAIStream:
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.closed = False
+
+    def __iter__(self):
+        return iter(self.chunks)
+
+    def close(self):
+        self.closed = True
+
+
+def _chunk(text=None, usage=None):
+    choices = [SimpleNamespace(delta=SimpleNamespace(content=text))] if text else []
+    return SimpleNamespace(choices=choices, usage=usage)
+
+
+def test_openai_stream_reports_usage_from_final_chunk(config_factory):
+    usage = SimpleNamespace(prompt_tokens=50, completion_tokens=4, total_tokens=54)
+    stream = FakeOpenAIStream([_chunk("Tax-"), _chunk("Return-2025"), _chunk(usage=usage)])
+    client = _client(scan_namer.OpenAIClient, _streaming_config(config_factory), "openai")
+    calls = []
+    client.client = SimpleNamespace(
+        chat=SimpleNamespace(
+            completions=SimpleNamespace(
+                create=lambda **kw: calls.append(kw) or stream
+            )
+        )
+    )
+    text, cost = client._create_chat_completion(
+        model="gpt-5.5", messages=[{"role": "user", "content": "doc"}]
+    )
+    assert text == "Tax-Return-2025"
+    assert cost == {"prompt_tokens": 50, "completion_tokens": 4, "total_tokens": 54}
+    assert calls[0]["stream"] is True
+    assert stream.closed
+
+
+def test_openai_stream_aborts_early_and_estimates_usage(config_factory):
+    stream = FakeOpenAIStream([_chunk("Lease-Agreement\nExplanation"), _chunk("...")])
+    client = _client(scan_namer.OpenAIClient, _streaming_config(config_factory), "openai")
+    client.model = "gpt-5.5"
+    # Pin the CHARS_PER_TOKEN estimate so the count doesn't depend on tiktoken.
+    client._tokenizer = None
+    client.client = SimpleNamespace(
+        chat=SimpleNamespace(completions=SimpleNamespace(create=lambda **kw: stream))
+    )
+    text, cost = client._create_chat_completion(
+        model="gpt-5.5", messages=[{"role": "user", "content": "x" * 400}]
+    )
+    assert text == "Lease-Agreement"
+    assert cost["prompt_tokens"] == 100 and cost["completion_tokens"] >= 1
+    assert stream.closed
+
+
+def test_openai_stream_estimate_counts_with_tokenizer(config_factory):
+    stream = FakeOpenAIStream([_chunk("Lease-Agreement\nExplanation")])
+    client = _client(scan_namer.OpenAIClient, _streaming_config(config_factory), "openai")
+    client.model = "gpt-5.5"
+    # One token per character, standing in for a tiktoken encoding.
+    client._tokenizer = SimpleNamespace(encode=list)
+    client.client = SimpleNamespace(
+        chat=SimpleNamespace(completions=SimpleNamespace(create=lambda **kw: stream))
+    )
+    _, cost = client._create_chat_completion(
+        model="gpt-5.5", messages=[{"role": "user", "content": "x" * 400}]
+    )
+    assert cost["prompt_tokens"] == 400
+    assert cost["completion_tokens"] == len("Lease-Agreement")
+
+
+def test_anthropic_stream_uses_snapshot_usage(config_factory):
+    class FakeStream:
+        text_stream = iter(["Medical-", "Bill\n", "extra"])
+        current_message_snapshot = SimpleNamespace(
+            usage=SimpleNamespace(input_tokens=30, output_tokens=3)
+        )
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc_info):
+            pass
+
+    client = _client(
+        scan_namer.AnthropicClient, _streaming_config(config_factory), "anthropic"
+    )
+    client.client = SimpleNamespace(
+        messages=SimpleNamespace(stream=lambda **kw: FakeStream())
+    )
+    text, cost = client._create_message(model="claude-sonnet-4-6", messages=[])
+    assert text == "Medical-Bill"
+    assert cost == {"prompt_tokens": 30, "completion_tokens": 3, "total_tokens": 33}
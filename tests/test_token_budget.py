@@ -0,0 +1,89 @@
+import json
+import sys
+from types import SimpleNamespace
+
+import scan_namer
+from conftest import MINIMAL_CONFIG
+
+
+def _client(config, provider="anthropic", model="claude-sonnet-4-6"):
+    client = object.__new__(scan_namer.BaseLLMClient)
+    client.config = config
+    client.provider = provider
+    client.model = model
+    return client
+
+
+def test_short_text_is_unchanged(config):
+    assert _client(config).fit_input_budget("a short letter") == "a short letter"
+
+
+def test_heuristic_truncation_respects_budget_and_word_boundary(config):
+    text = "word " * 10000
+    truncated = _client(config)._truncate_to_tokens(text, 100)
+    assert len(truncated) <= 100 * scan_namer.BaseLLMClient.CHARS_PER_TOKEN
+    assert truncated.endswith("word")
+
+
+def test_budget_comes_from_config_and_env(config_factory, monkeypatch):
+    cfg = json.loads(json.dumps(MINIMAL_CONFIG))
+    cfg["llm"]["max_input_tokens"] = 10
+    client = _client(config_factory(cfg))
+    assert len(client.fit_input_budget("x" * 1000)) == 40
+
+    monkeypatch.setenv("LLM_MAX_INPUT_TOKENS", "0")
+    assert len(client.fit_input_budget("x" * 1000)) == 1000
+
+
+class FakeEncoding:
+    """One token per character, so counts are easy to check."""
+
+    def encode(self, text):
+        return list(text)
+
+    def decode(self, tokens):
+        return "".join(tokens)
+
+
+def test_openai_uses_tiktoken_encoding(config, monkeypatch):
+    fake = SimpleNamespace(encoding_for_model=lambda model: FakeEncoding())
+    monkeypatch.setitem(sys.modules, "tiktoken", fake)
+    client = _client(config, provider="openai", model="gpt-5.5")
+    assert client.count_tokens("abcdef") == 6
+    assert client._truncate_to_tokens("abcdef", 4) == "abcd"
+
+
+def test_unloadable_tiktoken_encoding_falls_back_to_estimate(config, monkeypatch):
+    def offline(name):
+        raise ConnectionError("no network")
+
+    fake = SimpleNamespace(encoding_for_model=lambda model: offline(model))
+    monkeypatch.setitem(sys.modules, "tiktoken", fake)
+    client = _client(config, provider="openai", model="gpt-5.5")
+    assert client.count_tokens("x" * 40) == 10
+
+
+def _google_client(config):
+    client = object.__new__(scan_namer.GoogleClient)
+    client.config = config
+    client.provider = "google"
+    client.model = "gemini-2.5-flash"
+    return client
+
+
+def test_google_cost_uses_usage_metadata(config):
+    usage = SimpleNamespace(
+        prompt_token_count=812, candidates_token_count=9, thoughts_token_count=40
+    )
+    response = SimpleNamespace(text="Water-Bill-2025-03", usage_metadata=usage)
+    assert _google_client(config)._response_cost(response, 5) == {
+        "prompt_tokens": 812,
+        "completion_tokens": 49,
+        "total_tokens": 861,
+    }
+
+
+def test_google_cost_falls_back_to_estimate_without_usage(config):
+    response = SimpleNamespace(text="x" * 40, usage_metadata=None)
+    cost = _google_client(config)._response_cost(response, 300)
+    assert cost == {"prompt_tokens": 300, "completion_tokens": 10, "total_tokens": 310}